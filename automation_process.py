@@ -2,18 +2,31 @@ from standard_response import StandardResponse
 from dotenv import load_dotenv
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple, Union, Deque
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from functools import partial
 from mongo_db import MongoDBHandler
-from decompress import TarDecompressor
+from decompress import TarDecompressor, TarMember
 from file_reader import FileProcessor
-from xml_to_dict import XMLConverter
-from json_matcher import JsonMatcher
-from metadata_extractor import MetadataExtractor
-from pymongo.errors import PyMongoError, ConnectionFailure, ServerSelectionTimeoutError, OperationFailure
+from xml_to_dict import XMLConverter, FusionItem
+from document_processor import DocumentProcessor, init_worker, process_in_worker, MOTOR_XMLTODICT, MOTOR_FUSIONADO
+from content_codec import CODECS
+from pipeline import StagedPipeline
+from document_writer import DocumentWriter
+from batch_sizer import AdaptiveBatchSizer
+from disk_dictionary import DiskCodeDictionary
+from stage_metrics import StageMetrics
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+import multiprocessing
+import json
+import signal
+import threading
+import random
 import time
 import logging
 import sys
-import json
+import tarfile
 import shutil
 import os
 
@@ -22,14 +35,79 @@ BASE_DIR = Path.cwd()
 DIR_COMPRIMIDOS = BASE_DIR / "COMPRIMIDOS"
 DIR_DESCOMPRIMIDOS = BASE_DIR / "DESCOMPRIMIDOS"
 DIR_COMPLEMENTOS = BASE_DIR / "COMPLEMENTOS"
+DIR_CACHE = Path(os.getenv("DIR_CACHE", BASE_DIR / "CACHE")) # generado en cada ejecucion (pickles): debe quedar fuera del control de versiones
+DIR_REPORTES = Path(os.getenv("DIR_REPORTES", BASE_DIR / "REPORTES"))
 #DIR_JSON = Path.cwd() / "JSON"
 DB_NAME = os.getenv("DB_NAME", "BOA_VUELOS")
 TAR_COLLECTION = "TAR_PROCESADOS"
 JSON_COLLECTION = "JSON_PROCESADOS"
+MEMBER_COLLECTION = "MIEMBROS_PROCESADOS"
+RUN_COLLECTION = "EJECUCIONES"
+CHECKPOINT_COLLECTION = "PUNTOS_CONTROL"
 MONGO_URL = os.getenv("CONNECTION_URL_MONGO", "")
-BUFFER_SIZE = int(os.getenv("BUFFER_SIZE_LOGS", 40))
+BUFFER_SIZE = int(os.getenv("BUFFER_SIZE_DOCS", 40))
+LOTE_ADAPTATIVO = os.getenv("LOTE_ADAPTATIVO", "true").strip().lower() in ("1", "true", "si")
+LOTE_MIN_DOCS = int(os.getenv("LOTE_MIN_DOCS", 10))
+LOTE_MAX_DOCS = int(os.getenv("LOTE_MAX_DOCS", 5000))
+LOTE_MAX_MB = float(os.getenv("LOTE_MAX_MB", 16))
+LOTE_LATENCIA_OBJETIVO = float(os.getenv("LOTE_LATENCIA_OBJETIVO", 1.0))
 WAITING_TIME = float(os.getenv("WAITING_TIME", 1))
+WAITING_TIME_MAX = float(os.getenv("WAITING_TIME_MAX", 30))
 MAX_ATTEMPTS = int(os.getenv("MAX_ATTEMPTS", 3))
+STREAMING_TAR = os.getenv("STREAMING_TAR", "false").strip().lower() in ("1", "true", "si")
+NUM_WORKERS = int(os.getenv("NUM_WORKERS", 1))
+UMBRAL_STREAMING_XML_MB = float(os.getenv("UMBRAL_STREAMING_XML_MB", 0))
+XML_ITEM_DEPTH = int(os.getenv("XML_ITEM_DEPTH", 2))
+XML_CHUNK_SIZE = int(os.getenv("XML_CHUNK_SIZE", 1000))
+LEDGER_HASH = os.getenv("LEDGER_HASH", "true").strip().lower() in ("1", "true", "si")
+LEDGER_BATCH_SIZE = 200
+PIPELINE = os.getenv("PIPELINE", "false").strip().lower() in ("1", "true", "si")
+PIPELINE_LECTORES = int(os.getenv("PIPELINE_LECTORES", 1))
+PIPELINE_ESCRITORES = int(os.getenv("PIPELINE_ESCRITORES", 1))
+PIPELINE_TAMANIO_COLA = int(os.getenv("PIPELINE_TAMANIO_COLA", 100))
+ESCRITOR_SEGUNDO_PLANO = os.getenv("ESCRITOR_SEGUNDO_PLANO", "false").strip().lower() in ("1", "true", "si")
+ESCRITOR_TAMANIO_COLA = int(os.getenv("ESCRITOR_TAMANIO_COLA", 4))
+CACHE_COMPLEMENTOS = os.getenv("CACHE_COMPLEMENTOS", "true").strip().lower() in ("1", "true", "si")
+CODIGOS_EN_DISCO = os.getenv("CODIGOS_EN_DISCO", "false").strip().lower() in ("1", "true", "si")
+CODIGOS_CACHE_LRU = int(os.getenv("CODIGOS_CACHE_LRU", 100000))
+MOTOR_XML = os.getenv("MOTOR_XML", MOTOR_XMLTODICT).strip().lower()
+COMPRESION_CONTENIDO = os.getenv("COMPRESION_CONTENIDO", "").strip().lower()
+COMPRESION_NIVEL = int(os.getenv("COMPRESION_NIVEL", -1))
+MODO_VIGILANCIA = os.getenv("MODO_VIGILANCIA", "false").strip().lower() in ("1", "true", "si")
+VIGILANCIA_INTERVALO = float(os.getenv("VIGILANCIA_INTERVALO", 2))
+VIGILANCIA_ESTABILIDAD = float(os.getenv("VIGILANCIA_ESTABILIDAD", 3))
+VIGILANCIA_REINTENTOS = int(os.getenv("VIGILANCIA_REINTENTOS", 3))
+PUNTOS_CONTROL = os.getenv("PUNTOS_CONTROL", "true").strip().lower() in ("1", "true", "si")
+LOGS_ESTRUCTURADOS = os.getenv("LOGS_ESTRUCTURADOS", "false").strip().lower() in ("1", "true", "si")
+ETIQUETAS_FECHAS = {
+    "fecha_creacion": "Fecha de creacion",
+    "fecha_modificacion": "Fecha de ultima modificacion",
+    "fecha_acceso": "Fecha de ultimo acceso"
+}
+
+DataItem = Union[Path, TarMember, FusionItem]
+
+def _item_name(item: DataItem) -> str:
+    """Nombre del archivo (o documento fusionado) de un elemento a procesar."""
+    return item.name if isinstance(item, Path) else item.nombre
+
+def _document_id(nombre_tar: str, documento: Dict[str, Any]) -> str:
+    """'_id' determinista de un documento: TAR, archivo y, si se parseo por bloques, numero de parte."""
+    identificador = f"{nombre_tar}/{documento.get('nombre_archivo')}"
+    return f"{identificador}#{documento['parte']}" if "parte" in documento else identificador
+
+def _ledger_records(item: DataItem) -> Dict[str, Dict[str, Any]]:
+    """Registros del ledger de miembros (MIEMBROS_PROCESADOS) de un elemento, indexados por hash."""
+    nombre = _item_name(item)
+    return {hash_miembro: {"hash": hash_miembro, "nombre": nombre, "fecha_procesado": datetime.now()} for hash_miembro in _item_hashes(item)}
+
+def _item_hashes(item: DataItem) -> List[str]:
+    """Hashes de los miembros leidos en streaming que forman un elemento (vacio para archivos en disco)."""
+    if isinstance(item, FusionItem):
+        return _item_hashes(item.original) + _item_hashes(item.complemento)
+    if isinstance(item, TarMember) and item.hash:
+        return [item.hash]
+    return []
 
 class AutomationProcess:
     """
@@ -43,6 +121,14 @@ class AutomationProcess:
         db_name: Nombre de la base de datos.
         json_collection: str = Nombre de la coleccion para JSON procesados.
         tar_collection: str = Nombre de la coleccion para TAR procesados.
+        streaming: Lee los TAR en modo streaming sin extraerlos a DESCOMPRIMIDOS.
+        workers: Numero de procesos para convertir y enriquecer los .DATA (1 = en serie).
+        umbral_streaming_xml_mb: Tamanio en MB a partir del cual un .DATA se parsea por bloques (0 = nunca).
+        ledger_hash: Omite los TAR y miembros .DATA cuyo contenido (hash) ya fue ingerido.
+        pipeline: Ejecuta lectura, conversion y escritura como etapas concurrentes unidas por colas acotadas.
+        lectores: Numero de archivos TAR que se leen/descomprimen a la vez en modo pipeline.
+        escritores: Numero de lotes que se insertan a la vez en MongoDB en modo pipeline.
+        tamanio_cola: Numero maximo de elementos en cada cola entre etapas del pipeline.
     """
     def __init__(self,
                 dir_comprimidos: Path = DIR_COMPRIMIDOS,
@@ -52,7 +138,15 @@ class AutomationProcess:
                 mongo_uri: str = MONGO_URL,
                 db_name: str = DB_NAME,
                 json_collection: str = JSON_COLLECTION,
-                tar_collection: str = TAR_COLLECTION
+                tar_collection: str = TAR_COLLECTION,
+                streaming: bool = STREAMING_TAR,
+                workers: int = NUM_WORKERS,
+                umbral_streaming_xml_mb: float = UMBRAL_STREAMING_XML_MB,
+                ledger_hash: bool = LEDGER_HASH,
+                pipeline: bool = PIPELINE,
+                lectores: int = PIPELINE_LECTORES,
+                escritores: int = PIPELINE_ESCRITORES,
+                tamanio_cola: int = PIPELINE_TAMANIO_COLA
                 ) -> None:
         """
         Constructor para la clase AutomationProcess
@@ -65,6 +159,14 @@ class AutomationProcess:
             db_name: Nombre de la base de datos.
             json_collection: str = Nombre de la coleccion para JSON procesados.
             tar_collection: str = Nombre de la coleccion para TAR procesados.
+            streaming: Lee los TAR en modo streaming sin extraerlos a DESCOMPRIMIDOS.
+            workers: Numero de procesos para convertir y enriquecer los .DATA (1 = en serie).
+            umbral_streaming_xml_mb: Tamanio en MB a partir del cual un .DATA se parsea por bloques (0 = nunca).
+            ledger_hash: Omite los TAR y miembros .DATA cuyo contenido (hash) ya fue ingerido.
+            pipeline: Ejecuta lectura, conversion y escritura como etapas concurrentes unidas por colas acotadas.
+            lectores: Numero de archivos TAR que se leen/descomprimen a la vez en modo pipeline.
+            escritores: Numero de lotes que se insertan a la vez en MongoDB en modo pipeline.
+            tamanio_cola: Numero maximo de elementos en cada cola entre etapas del pipeline.
         """
         self.dir_comprimidos = dir_comprimidos
         self.dir_descomprimidos = dir_descomprimidos
@@ -74,6 +176,28 @@ class AutomationProcess:
         self.db_name = db_name
         self.json_collection = json_collection
         self.tar_collection = tar_collection
+        self.streaming = streaming
+        self.workers = max(1, workers)
+        self.umbral_streaming_xml = int(umbral_streaming_xml_mb * 1024 * 1024)
+        self.ledger_hash = ledger_hash
+        self.pipeline = pipeline
+        self.lectores = max(1, lectores)
+        self.escritores = max(1, escritores)
+        self.tamanio_cola = max(1, tamanio_cola)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._batch_sizer = AdaptiveBatchSizer(
+            BUFFER_SIZE,
+            min_docs=LOTE_MIN_DOCS,
+            max_docs=LOTE_MAX_DOCS,
+            max_bytes=int(LOTE_MAX_MB * 1024 * 1024),
+            latencia_objetivo=LOTE_LATENCIA_OBJETIVO,
+            adaptativo=LOTE_ADAPTATIVO
+        )
+        self._tar_hashes: Dict[str, str] = {}
+        self._reglas_enriquecimiento: List[Dict[str, Any]] = []
+        self._codigos_por_nombre: Optional[Dict[str, Dict[str, Any]]] = None
+        self._metrics = StageMetrics()
+        self._detener = threading.Event()
         #self._mongo_client: Optional[MongoDBHandler] = None
 
     def ejecutar(self) -> Dict[str,Any]:
@@ -87,6 +211,7 @@ class AutomationProcess:
             "num_tar": 0,
             "num_dict": 0,
         }
+        fecha_inicio = datetime.now()
 
         # --- creacion de directorios ---
         self._create_directories()
@@ -98,6 +223,7 @@ class AutomationProcess:
 
         # --- cargar archivos complementarios ---
         dict_codigos = self._load_plugins(self.dir_complementos)
+        self._reglas_enriquecimiento = self._load_enrichment_rules(self.dir_complementos, dict_codigos)
 
         # --- conexion a MongoDB ---
         if not self._connect_to_mongodb():
@@ -105,6 +231,25 @@ class AutomationProcess:
             shutil.rmtree(self.dir_descomprimidos)
             return datos_proceso
 
+        # --- procesamiento por etapas concurrentes o en streaming (sin descomprimir antes todo) ---
+        if self.pipeline or self.streaming:
+            try:
+                self._start_document_processing(dict_codigos)
+                if self.pipeline:
+                    datos_proceso = self._process_pipeline(datos_proceso)
+                else:
+                    datos_proceso = self._process_compressed_files_streaming(dict_codigos, datos_proceso)
+            except Exception as e:
+                logging.error(f"Error inesperado durante el procesamiento: {e}")
+            finally:
+                self._stop_document_processing()
+                self._report_code_stats(dict_codigos)
+                self._save_run_report(datos_proceso, fecha_inicio)
+                shutil.rmtree(self.dir_descomprimidos, ignore_errors=True)
+                resultado = self._mongo_client.disconnect()
+                logging.info(resultado.message)
+            return datos_proceso
+
         # --- descompresion de archivos ---
         if not self._unzip_files(self.dir_descomprimidos):
             resultado = self._mongo_client.disconnect()
@@ -113,11 +258,15 @@ class AutomationProcess:
 
         # --- procesamiento de archivos ---
         try:
+            self._start_document_processing(dict_codigos)
             datos_proceso = self._process_uncompressed_files(self.dir_descomprimidos, dict_codigos, datos_proceso)
         except Exception as e:
             logging.error(f"Error inesperado durante el procesamiento: {e}")
             shutil.rmtree(self.dir_descomprimidos) # cuidado
         finally:
+            self._stop_document_processing()
+            self._report_code_stats(dict_codigos)
+            self._save_run_report(datos_proceso, fecha_inicio)
             if self._mongo_client:
                 resultado = self._mongo_client.disconnect()
                 logging.info(resultado.message)
@@ -125,13 +274,198 @@ class AutomationProcess:
 
         return datos_proceso
 
+    def vigilar(self, intervalo: float = VIGILANCIA_INTERVALO, estabilidad: float = VIGILANCIA_ESTABILIDAD) -> Dict[str, Any]:
+        """
+        Ejecuta el proceso en modo de vigilancia: se conecta a MongoDB y carga COMPLEMENTOS una sola vez
+        y revisa 'dir_comprimidos' cada 'intervalo' segundos. Un TAR.GZ nuevo se procesa cuando su
+        tamanio y fecha de modificacion no cambiaron durante 'estabilidad' segundos (ya termino de
+        copiarse); si no queda registrado en TAR_PROCESADOS, se vuelve a intentar en una revision posterior,
+        hasta VIGILANCIA_REINTENTOS veces (o hasta que el archivo cambie). Si cambian los archivos de
+        COMPLEMENTOS, se recargan los codigos y las reglas.
+
+        Los tiempos por etapa se guardan en un reporte por cada grupo de archivos procesados y luego
+        se reinician, para que la memoria no crezca mientras el proceso sigue vigilando.
+
+        Termina con Ctrl+C, SIGTERM o 'detener()'.
+
+        Parameters:
+            intervalo (float): Segundos entre revisiones de los directorios.
+            estabilidad (float): Segundos que un TAR.GZ debe mantener su tamanio antes de procesarse.
+
+        Returns:
+            Dict[str,Any]: Diccionario con los datos acumulados del proceso.
+        """
+        datos_proceso: Dict[str, Any] = {
+            "num_tar": 0,
+            "num_dict": 0,
+        }
+        self._create_directories()
+        if not self._connect_to_mongodb():
+            logging.warning("No se pudo conectar con MongoDB.")
+            return datos_proceso
+
+        self._detener.clear()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self._detener.set())
+        logging.info(f"Modo de vigilancia: revisando '{self.dir_comprimidos}' cada {intervalo}s (estabilidad {estabilidad}s).")
+
+        dict_codigos: Any = {}
+        firma_complementos = None
+        candidatos: Dict[Path, Tuple[int, int, float]] = {}
+        conocidos: Dict[str, Tuple[int, int]] = {}
+        intentos: Dict[str, int] = {}
+        try:
+            while not self._detener.is_set():
+                firma = self._complements_signature()
+                if firma != firma_complementos:
+                    if firma_complementos is not None:
+                        logging.info("Cambiaron los archivos de COMPLEMENTOS; se recargan los codigos y las reglas.")
+                    self._stop_document_processing()
+                    self._report_code_stats(dict_codigos)
+                    dict_codigos = self._load_plugins(self.dir_complementos)
+                    self._reglas_enriquecimiento = self._load_enrichment_rules(self.dir_complementos, dict_codigos)
+                    self._start_document_processing(dict_codigos)
+                    firma_complementos = firma
+
+                listos = self._stable_tar_files(candidatos, conocidos, estabilidad)
+                if listos:
+                    logging.info(f"Archivos TAR listos para procesar: {', '.join(archivo.name for archivo in listos)}")
+                    self._process_watched_batch(dict_codigos, datos_proceso, listos, conocidos, intentos)
+                self._detener.wait(intervalo)
+        except KeyboardInterrupt:
+            logging.info("Modo de vigilancia interrumpido.")
+        finally:
+            self._stop_document_processing()
+            self._report_code_stats(dict_codigos)
+            logging.info(f"Modo de vigilancia finalizado: {datos_proceso['num_tar']} archivos TAR y {datos_proceso['num_dict']} documentos procesados.")
+            shutil.rmtree(self.dir_descomprimidos, ignore_errors=True)
+            resultado = self._mongo_client.disconnect()
+            logging.info(resultado.message)
+        return datos_proceso
+
+    def detener(self) -> None:
+        """Pide terminar el modo de vigilancia despues del TAR en curso."""
+        self._detener.set()
+
+    def _complements_signature(self) -> Tuple[Tuple[str, int, int], ...]:
+        """Nombre, tamanio y fecha de modificacion de los archivos de COMPLEMENTOS (para detectar cambios)."""
+        firma = []
+        for archivo in self.dir_complementos.iterdir():
+            try:
+                if archivo.is_file():
+                    stats = archivo.stat()
+                    firma.append((archivo.name, stats.st_size, stats.st_mtime_ns))
+            except OSError:
+                continue
+        return tuple(sorted(firma))
+
+    def _stable_tar_files(self,
+                          candidatos: Dict[Path, Tuple[int, int, float]],
+                          conocidos: Dict[str, Tuple[int, int]],
+                          estabilidad: float
+                          ) -> Dict[Path, Tuple[int, int]]:
+        """
+        Devuelve los TAR.GZ nuevos (o modificados) cuyo tamanio y fecha de modificacion no cambiaron
+        durante 'estabilidad' segundos, con su tamanio y fecha. 'candidatos' guarda desde cuando cada
+        archivo no cambia y 'conocidos' los archivos ya procesados, con su tamanio y fecha (los agrega
+        '_mark_watched_files', para que un archivo que fallo se reintente).
+        """
+        ahora = time.monotonic()
+        presentes = set()
+        listos: Dict[Path, Tuple[int, int]] = {}
+        for archivo in sorted(self.dir_comprimidos.glob("*.tar.gz")):
+            try:
+                stats = archivo.stat()
+            except OSError:
+                continue
+            firma = (stats.st_size, stats.st_mtime_ns)
+            presentes.add(archivo)
+            if conocidos.get(archivo.name) == firma:
+                continue
+            anterior = candidatos.get(archivo)
+            if anterior is None or anterior[:2] != firma:
+                candidatos[archivo] = (*firma, ahora)
+            elif stats.st_size > 0 and ahora - anterior[2] >= estabilidad:
+                listos[archivo] = firma
+                del candidatos[archivo]
+
+        for archivo in set(candidatos) - presentes:
+            del candidatos[archivo]
+        return listos
+
+    def _process_watched_batch(self,
+                               dict_codigos: Dict[str, Any],
+                               datos_proceso: Dict[str, Any],
+                               listos: Dict[Path, Tuple[int, int]],
+                               conocidos: Dict[str, Tuple[int, int]],
+                               intentos: Dict[str, int]
+                               ) -> None:
+        """
+        Procesa un grupo de TAR.GZ del modo de vigilancia, guarda el reporte del grupo, reinicia los
+        tiempos por etapa y marca como conocidos los archivos que quedaron registrados ('_mark_watched_files').
+        """
+        fecha_inicio = datetime.now()
+        datos_lote: Dict[str, Any] = {"num_tar": 0, "num_dict": 0}
+        try:
+            self._process_tar_files(dict_codigos, datos_lote, list(listos))
+        except Exception as e:
+            logging.error(f"Error inesperado durante el procesamiento: {e}")
+        finally:
+            datos_proceso["num_tar"] += datos_lote["num_tar"]
+            datos_proceso["num_dict"] += datos_lote["num_dict"]
+            self._save_run_report(datos_lote, fecha_inicio)
+            self._metrics.drain()
+        self._mark_watched_files(listos, conocidos, intentos)
+
+    def _mark_watched_files(self,
+                            listos: Dict[Path, Tuple[int, int]],
+                            conocidos: Dict[str, Tuple[int, int]],
+                            intentos: Dict[str, int]
+                            ) -> None:
+        """
+        Marca como conocidos los TAR.GZ de un grupo que quedaron registrados en TAR_PROCESADOS (lo que
+        hace '_finish_tar', o '_is_duplicated_tar' para un duplicado). Los demas fallaron (aunque el
+        error se haya capturado al leerlos) y se reintentan en una revision posterior, hasta
+        VIGILANCIA_REINTENTOS veces; despues se marcan como conocidos hasta que el archivo cambie.
+        """
+        resultado: Any = self._mongo_client.check_processed_tar_files(archivo.name for archivo in listos)
+        if not resultado.success:
+            logging.warning(f"{resultado.message} Se reintentaran los archivos del grupo.")
+        procesados = resultado.data if resultado.success else set()
+
+        for archivo, firma in listos.items():
+            if archivo.name in procesados:
+                conocidos[archivo.name] = firma
+                intentos.pop(archivo.name, None)
+                continue
+            intentos[archivo.name] = intentos.get(archivo.name, 0) + 1
+            if intentos[archivo.name] < VIGILANCIA_REINTENTOS:
+                logging.warning(f"El archivo '{archivo.name}' no se proceso (intento {intentos[archivo.name]} de {VIGILANCIA_REINTENTOS}); se reintentara.")
+                continue
+            logging.error(f"El archivo '{archivo.name}' no se proceso tras {VIGILANCIA_REINTENTOS} intentos; no se reintentara hasta que cambie.")
+            conocidos[archivo.name] = firma
+            del intentos[archivo.name]
+
+    def _process_tar_files(self, dict_codigos: Dict[str, Any], datos_proceso: Dict[str, Any], archivos: List[Path]) -> Dict[str, Any]:
+        """Procesa los TAR.GZ indicados con el modo configurado (pipeline, streaming o descomprimiendo antes)."""
+        if self.pipeline:
+            return self._process_pipeline(datos_proceso, archivos)
+        if self.streaming:
+            return self._process_compressed_files_streaming(dict_codigos, datos_proceso, archivos)
+        self.dir_descomprimidos.mkdir(parents=True, exist_ok=True)
+        if self._unzip_files(self.dir_descomprimidos, archivos):
+            return self._process_uncompressed_files(self.dir_descomprimidos, dict_codigos, datos_proceso)
+        return datos_proceso
+
     def _connect_to_mongodb(self) -> bool:
-        """Establece la conexion con MongoDB"""
+        """
+        Crea el handler de MongoDB sobre el cliente compartido. No espera al servidor: la conexion se
+        establece en la primera consulta y los indices se verifican antes de la primera escritura que
+        los usa, una sola vez por cliente ('MongoDBHandler._ensure_indexes_once').
+        """
         try:
             logging.info("Conectando a MongoDB.")
-            self._mongo_client = MongoDBHandler(self.mongo_uri, self.db_name, self.tar_collection, self.json_collection)
-            conexion = self._mongo_client.check_connect()
-            logging.info(conexion.message)
+            self._mongo_client = MongoDBHandler(self.mongo_uri, self.db_name, self.tar_collection, self.json_collection, MEMBER_COLLECTION, RUN_COLLECTION, CHECKPOINT_COLLECTION)
             return True
         except Exception as e:
             logging.error(f"Error al conectar con MongoDB: {e}")
@@ -155,52 +489,436 @@ class AutomationProcess:
             return False
         return True
 
+    def _save_run_report(self, datos_proceso: Dict[str, Any], fecha_inicio: datetime) -> None:
+        """
+        Registra los tiempos por etapa de la ejecucion, los guarda como reporte JSON en DIR_REPORTES
+        y como documento de resumen en la coleccion de ejecuciones.
+        """
+        fecha_fin = datetime.now()
+        etapas = self._metrics.report()
+        for etapa, datos in etapas.items():
+            logging.info(
+                f"Etapa '{etapa}': {datos['mediciones']} mediciones, {datos['elementos']} elementos, {datos['bytes'] / 1024 / 1024:.1f} MB, "
+                f"{datos['segundos']:.2f}s (CPU {datos['cpu_segundos']:.2f}s), p50 {datos['p50']:.4f}s, p95 {datos['p95']:.4f}s, max {datos['max']:.4f}s."
+            )
+
+        reporte = {
+            "fecha_inicio": fecha_inicio,
+            "fecha_fin": fecha_fin,
+            "segundos": round((fecha_fin - fecha_inicio).total_seconds(), 3),
+            "num_tar": datos_proceso["num_tar"],
+            "num_dict": datos_proceso["num_dict"],
+            "configuracion": {
+                "pipeline": self.pipeline,
+                "streaming": self.streaming,
+                "workers": self.workers,
+                "motor_xml": MOTOR_XML,
+                "compresion_contenido": COMPRESION_CONTENIDO,
+                "lote_objetivo_final": self._batch_sizer.objetivo
+            },
+            "etapas": etapas
+        }
+
+        try:
+            DIR_REPORTES.mkdir(parents=True, exist_ok=True)
+            archivo_reporte = DIR_REPORTES / f"ejecucion_{fecha_inicio:%Y%m%d_%H%M%S}.json"
+            archivo_reporte.write_text(json.dumps(reporte, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+            logging.info(f"Reporte de la ejecucion guardado en '{archivo_reporte}'.")
+        except OSError as e:
+            logging.error(f"No se pudo guardar el reporte de la ejecucion: {e}")
+
+        if self._mongo_client:
+            resultado = self._mongo_client.save_run_summary(reporte)
+            if resultado.success:
+                logging.info(resultado.message)
+            else:
+                logging.error(f"{resultado.message} {resultado.error_details}")
+
+    def _report_code_stats(self, dict_codigos: Any) -> None:
+        """
+        Registra las estadisticas de la cache LRU del diccionario de codigos en disco: las del proceso
+        principal mas las de los procesos del pool, que llegan con cada resultado ('_worker_result').
+        """
+        if isinstance(dict_codigos, DiskCodeDictionary):
+            logging.info(f"Estadisticas del diccionario de codigos en disco (proceso principal y workers): {dict_codigos.stats()}")
+            dict_codigos.close()
+
     def _load_plugins(self, directorio: Path) -> Dict[str,Any]:
-        """Carga y combina los archivos complementarios"""
+        """
+        Carga y combina los archivos complementarios. Si hay reglas por ruta, los codigos de cada
+        archivo quedan ademas en '_codigos_por_nombre', compartidos con el combinado (sin copiarlos).
+        """
+        self._codigos_por_nombre = None
         if not self._validate_directory(directorio, "complementarios"):
             logging.warning(f"Se encontraron 0 codigos con sus descripciones.")
             return {}
 
         archivos_complementarios = list(directorio.iterdir())
-        dict_codigos: Any = FileProcessor().merge_dictionaries(archivos_complementarios)
+        if CODIGOS_EN_DISCO:
+            indice: Any = DiskCodeDictionary.build(DIR_CACHE / "codigos.sqlite3", archivos_complementarios, CODIGOS_CACHE_LRU)
+            if indice.success:
+                logging.info(indice.message)
+                if indice.error_details:
+                    logging.error(f"Archivos de codigos con errores: {indice.error_details}")
+                logging.info(f"Se encontraron {len(indice.data)} codigos con sus descripciones (en disco, cache LRU de {CODIGOS_CACHE_LRU}).")
+                return indice.data
+            logging.error(f"{indice.message} Se cargan los codigos en memoria. Error: {indice.error_details}")
+
+        self._codigos_por_nombre = {} if any(FileProcessor.is_rules_file(archivo) for archivo in archivos_complementarios) else None
+        if CACHE_COMPLEMENTOS:
+            dict_codigos: Any = FileProcessor().merge_dictionaries_cached(archivos_complementarios, DIR_CACHE / "COMPLEMENTOS", self._codigos_por_nombre)
+        else:
+            dict_codigos = FileProcessor().merge_dictionaries(archivos_complementarios, self._codigos_por_nombre)
         logging.info(dict_codigos.message)
         logging.info(f"Se encontraron {len(dict_codigos.data)} codigos con sus descripciones.")
         return dict_codigos.data
 
-    def _unzip_files(self, directorio: Path) -> bool:
+    def _load_enrichment_rules(self, directorio: Path, dict_codigos: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Carga las reglas de enriquecimiento por ruta ('*.reglas.json') de los archivos complementarios."""
+        if not directorio.is_dir():
+            return []
+
+        reglas: Any = FileProcessor().load_enrichment_rules(list(directorio.iterdir()), dict_codigos, self._codigos_por_nombre)
+        if not reglas.success:
+            logging.error(f"{reglas.message} Errores: {reglas.error_details}")
+        elif reglas.data:
+            logging.info(f"{reglas.message} Solo se buscaran codigos en las rutas configuradas.")
+        return reglas.data
+
+    def _pending_tar_files(self, archivos: Optional[List[Path]] = None) -> List[Path]:
+        """
+        Devuelve los archivos TAR.GZ (todos los de 'dir_comprimidos' o 'archivos') cuyo nombre aun no
+        fue procesado (una sola consulta a MongoDB). Los TAR con el mismo contenido que otro ya procesado
+        se detectan al leerlos ('_is_duplicated_tar'), con el hash calculado durante la lectura.
+        """
+        archivos_tar = list(self.dir_comprimidos.glob("*.tar.gz")) if archivos is None else archivos
+        resultado: Any = self._mongo_client.check_processed_tar_files(archivo.name for archivo in archivos_tar)
+        if not resultado.success:
+            logging.warning(f"{resultado.message} Se procesaran todos los archivos TAR.")
+            return archivos_tar
+
+        logging.info(resultado.message)
+        pendientes = []
+        for archivo_tar in archivos_tar:
+            if archivo_tar.name in resultado.data:
+                logging.info(f"El archivo '{archivo_tar.name}' SI fue procesado previamente. Ignorándolo.")
+                continue
+            pendientes.append(archivo_tar)
+        return pendientes
+
+    def _duplicated_of(self, nombre_tar: str, tar_hash: Optional[str]) -> Optional[str]:
+        """
+        Devuelve (si LEDGER_HASH esta activo) el nombre del TAR ya procesado con el mismo contenido
+        descomprimido que 'nombre_tar', o None si no hay ninguno.
+        """
+        if not self.ledger_hash or not tar_hash:
+            return None
+        resultado: Any = self._mongo_client.check_processed_tar_hash(tar_hash)
+        if not (resultado.success and resultado.data):
+            return None
+
+        logging.info(f"El archivo '{nombre_tar}' tiene el mismo contenido que '{resultado.data['nombre']}', ya procesado. Ignorándolo.")
+        return resultado.data["nombre"]
+
+    def _is_duplicated_tar(self, nombre_tar: str, tar_hash: str) -> bool:
+        """
+        Verifica (si LEDGER_HASH esta activo) si ya se proceso otro TAR con el mismo contenido descomprimido.
+        Si es asi, registra el nuevo nombre en TAR_PROCESADOS para no volver a leerlo.
+        """
+        original = self._duplicated_of(nombre_tar, tar_hash)
+        if original is None:
+            return False
+
+        resultado = self._mongo_client.save_processed_tar_file({
+            "nombre": nombre_tar,
+            "fecha_procesado": datetime.now(),
+            "manifest": None,
+            "hash": tar_hash,
+            "duplicado_de": original
+        })
+        logging.info(resultado.message)
+        return True
+
+    def _skip_ingested_members(self, items: Iterable[DataItem]) -> Iterator[DataItem]:
+        """
+        Omite, antes de parsearlos, los miembros .DATA cuyo hash ya fue ingerido. Los hashes se
+        consultan en bloques de 'LEDGER_BATCH_SIZE' elementos. Un par a fusionar solo se omite si
+        ambos miembros ya fueron ingeridos.
+        """
+        bloque: List[DataItem] = []
+
+        def _filtrar(bloque: List[DataItem]) -> Iterator[DataItem]:
+            resultado: Any = self._mongo_client.check_processed_member_hashes(
+                hash_miembro for item in bloque for hash_miembro in _item_hashes(item)
+            )
+            ingeridos = resultado.data if resultado.success else set()
+            for item in bloque:
+                hashes = _item_hashes(item)
+                if hashes and all(hash_miembro in ingeridos for hash_miembro in hashes):
+                    logging.info(f"Archivo '{_item_name(item)}' ya fue ingerido (mismo contenido). Ignorándolo.")
+                    continue
+                yield item
+
+        for item in items:
+            bloque.append(item)
+            if len(bloque) >= LEDGER_BATCH_SIZE:
+                yield from _filtrar(bloque)
+                bloque = []
+        if bloque:
+            yield from _filtrar(bloque)
+
+    def _unzip_files(self, directorio: Path, archivos: Optional[List[Path]] = None) -> bool:
         """Descomprime los archivos TAR.GZ"""
+        self._tar_hashes.clear()
         try:
             descompresor = TarDecompressor(directorio)
-            for archivo_tar in self.dir_comprimidos.glob("*.tar.gz"):
-                resultado = self._mongo_client.check_processed_tar_file(archivo_tar.name)
-                if resultado.success and resultado.data:
-                    logging.info(f"{resultado.message} Ignorándolo.")
-                    continue
-
+            for archivo_tar in self._pending_tar_files(archivos):
                 logging.info(f"Descomprimiendo '{archivo_tar.name}'.")
-                resultado = descompresor.decompress_tar_gz(archivo_tar)
+                with self._metrics.measure("descompresion", archivo_tar.stat().st_size):
+                    resultado = descompresor.decompress_tar_gz(archivo_tar)
                 logging.info(resultado.message)
+                if not resultado.success or resultado.data is None:
+                    continue
+                if self._is_duplicated_tar(archivo_tar.name, resultado.data["hash"]):
+                    shutil.rmtree(directorio / archivo_tar.name, ignore_errors=True)
+                    continue
+                self._tar_hashes[archivo_tar.name] = resultado.data["hash"]
             return True
         except Exception as e:
             logging.error(f"Error durante la descompresion: {e}")
             return False
 
-    def _process_data_file(self, archivo_xml: Path, dict_codigos: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Procesa un archivo .DATA, lo convierte a diccinario y lo combina con los codigos - descripciones"""
-        resultado: Any = self._xml_converter.transform_xml_to_dict(archivo_xml)
-        if resultado.success:
+    def _start_document_processing(self, dict_codigos: Dict[str, Any]) -> None:
+        """Prepara el procesador de documentos y, si hay mas de un worker, el pool de procesos."""
+        if MOTOR_XML not in (MOTOR_XMLTODICT, MOTOR_FUSIONADO):
+            logging.warning(f"MOTOR_XML '{MOTOR_XML}' no es valido; se usa '{MOTOR_XMLTODICT}'.")
+        elif MOTOR_XML == MOTOR_FUSIONADO and self._reglas_enriquecimiento:
+            logging.warning("El motor XML fusionado no aplica reglas por ruta; con reglas se parsea y enriquece por separado.")
+        compresion = COMPRESION_CONTENIDO
+        if compresion and compresion not in CODECS:
+            logging.warning(f"COMPRESION_CONTENIDO '{compresion}' no es valido ({', '.join(CODECS)}); 'contenido' se guarda sin comprimir.")
+            compresion = ""
+        self._document_processor = DocumentProcessor(
+            dict_codigos, self.umbral_streaming_xml, XML_ITEM_DEPTH, XML_CHUNK_SIZE, self._reglas_enriquecimiento, MOTOR_XML, self._metrics,
+            compresion, COMPRESION_NIVEL
+        )
+        if self.workers > 1:
+            logging.info(f"Iniciando pool de {self.workers} procesos para convertir y enriquecer los archivos .DATA.")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(dict_codigos, self._reglas_enriquecimiento, MOTOR_XML, compresion, COMPRESION_NIVEL)
+            )
+
+    def _stop_document_processing(self) -> None:
+        """Cierra el pool de procesos si existe."""
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _process_documents(self, items: Iterable[DataItem]) -> Iterator[Tuple[DataItem, Any]]:
+        """
+        Convierte y enriquece los archivos .DATA en orden, en serie o repartidos en el pool de procesos.
+        En el pool se mantienen como maximo 'workers * 4' tareas pendientes, para no cargar todo el TAR en memoria.
+        Los archivos que superan el umbral de streaming se parsean por bloques en el proceso principal.
+        """
+        max_pendientes = self.workers * 4
+        pendientes: Deque[Tuple[DataItem, Any]] = deque()
+        for item in items:
+            # los pares a fusionar nunca se parsean por bloques ('is_large' devuelve False)
+            if not isinstance(item, FusionItem) and self._document_processor.is_large(item):
+                while pendientes:
+                    item_listo, futuro = pendientes.popleft()
+                    yield item_listo, self._worker_result(futuro)
+                logging.info(f"Archivo '{_item_name(item)}' supera el umbral, se parsea por bloques.")
+                for resultado in self._document_processor.process_chunks(item):
+                    yield item, resultado
+                continue
+
+            if self._executor is None:
+                yield item, self._document_processor.process(item)
+                continue
+
+            pendientes.append((item, self._executor.submit(process_in_worker, item)))
+            if len(pendientes) >= max_pendientes:
+                item_listo, futuro = pendientes.popleft()
+                yield item_listo, self._worker_result(futuro)
+
+        while pendientes:
+            item_listo, futuro = pendientes.popleft()
+            yield item_listo, self._worker_result(futuro)
+
+    def _worker_result(self, futuro: Future) -> Any:
+        """
+        Devuelve el resultado de un archivo procesado en el pool y agrega los tiempos medidos en el proceso
+        y los contadores de consultas de su diccionario de codigos en disco.
+        """
+        resultado, mediciones, contadores = futuro.result()
+        self._metrics.merge(mediciones)
+        if contadores is not None and isinstance(self._document_processor.dict_codigos, DiskCodeDictionary):
+            self._document_processor.dict_codigos.add_counters(contadores)
+        return resultado
+
+    def _new_writer(self, nombre_tar: str) -> DocumentWriter:
+        """Crea el escritor incremental de documentos de un TAR."""
+        return DocumentWriter(partial(self._save_tar_batch, nombre_tar), lambda: self._batch_sizer.objetivo, ESCRITOR_SEGUNDO_PLANO, ESCRITOR_TAMANIO_COLA)
+
+    def _save_tar_batch(self, nombre_tar: str, documentos: List[Any], num_lote: int = 1) -> List[Any]:
+        """
+        Guarda un lote de documentos de un TAR y, con PUNTOS_CONTROL, registra en el punto de control
+        del TAR los archivos cuyo documento quedo guardado (los parseados por bloques no se registran:
+        al reanudar se vuelven a procesar y sus partes ya guardadas se ignoran como duplicadas).
+        """
+        ids = self.save_documents_in_batch(documentos, num_lote)
+        if not PUNTOS_CONTROL:
+            return ids
+
+        guardados = set(ids)
+        miembros = [
+            documento["nombre_archivo"] for documento in documentos
+            if isinstance(documento, dict) and "parte" not in documento and documento.get("_id") in guardados
+        ]
+        if miembros:
+            resultado = self._mongo_client.save_checkpoint(nombre_tar, miembros)
+            if not resultado.success:
+                logging.warning(f"{resultado.message} {resultado.error_details}")
+        return ids
+
+    def _skip_checkpointed(self, items: Iterable[DataItem], datos_tar: Dict[str, Any]) -> Iterator[DataItem]:
+        """
+        Omite los archivos del TAR que ya se guardaron en una ejecucion anterior que no termino y guarda
+        sus hashes en 'datos_tar' para registrarlos en el ledger de miembros junto con los demas.
+        """
+        resultado: Any = self._mongo_client.load_checkpoint(datos_tar["nombre"])
+        if not resultado.success:
+            logging.warning(f"{resultado.message} Se procesara el TAR completo.")
+        completados = resultado.data
+        if completados:
+            logging.info(f"Reanudando TAR '{datos_tar['nombre']}': {len(completados)} archivos ya guardados en una ejecucion anterior.")
+            datos_tar["num_reanudados"] = len(completados)
+
+        # los hashes de los ya guardados se registran en el ledger de miembros al cerrar el TAR ('_finish_tar')
+        reanudados = datos_tar.setdefault("ledger_reanudados", {})
+        for item in items:
+            if _item_name(item) in completados:
+                reanudados.update(_ledger_records(item))
+                continue
+            yield item
+
+    def _collect_documents(self,
+                           items: Iterable[DataItem],
+                           documentos_procesados: Union[List[Dict[str, Any]], DocumentWriter],
+                           ledger: Optional[Dict[str, Dict[str, Any]]] = None,
+                           nombre_tar: Optional[str] = None
+                           ) -> None:
+        """Procesa los archivos .DATA y agrega los documentos validos al escritor del TAR (y sus hashes al ledger)."""
+        for item, resultado in self._process_documents(items):
+            self._accept_result(item, resultado, documentos_procesados, ledger, nombre_tar)
+
+    def _accept_result(self,
+                       item: DataItem,
+                       resultado: Any,
+                       documentos_procesados: Union[List[Dict[str, Any]], DocumentWriter],
+                       ledger: Optional[Dict[str, Dict[str, Any]]] = None,
+                       nombre_tar: Optional[str] = None
+                       ) -> bool:
+        """
+        Registra el resultado de un .DATA (sin log por archivo con LOGS_ESTRUCTURADOS) y, si es valido,
+        agrega el documento al escritor (o lista) del TAR y sus hashes al ledger. Con PUNTOS_CONTROL el documento recibe un '_id' determinista, para que
+        reinsertarlo al reanudar un TAR no lo duplique.
+        """
+        nombre = _item_name(item)
+        if not resultado.success:
+            if resultado.message:
+                logging.error(resultado.message)
+            return False
+
+        # con LOGS_ESTRUCTURADOS el unico log por archivo es el de '_log_file'
+        if not LOGS_ESTRUCTURADOS:
             logging.info(resultado.message)
-            try:
-                str_contenido = json.loads(resultado.data)
-                dict_combinado =  JsonMatcher().add_description_json(str_contenido, dict_codigos)
-                metadata: Any = self._metadata_extractor.metadata_extractor(archivo_xml)
-                if metadata.success:
-                    metadata.data["contenido"] = dict_combinado
-                return metadata.data
-            except Exception as e:
-                logging.error(f"Error al procesar el archivo '{archivo_xml.name}': {e}")
-                return None
-        return None
+            logging.info(f"Archivo '{nombre}' procesado correctamente.")
+        if PUNTOS_CONTROL and nombre_tar and isinstance(resultado.data, dict):
+            resultado.data.setdefault("_id", _document_id(nombre_tar, resultado.data))
+        documentos_procesados.append(resultado.data)
+        if ledger is not None:
+            ledger.update(_ledger_records(item))
+        return True
+
+    def _new_tar_record(self, nombre_tar: str, tar_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Crea el registro de TAR_PROCESADOS de un archivo TAR. Sin 'tar_hash' se usa (y se descarta
+        de '_tar_hashes') el calculado al descomprimirlo en '_unzip_files'.
+        """
+        return {
+            "nombre": nombre_tar,
+            "fecha_procesado": datetime.now(),
+            "manifest": None,
+            "hash": tar_hash or self._tar_hashes.pop(nombre_tar, None)
+        }
+
+    def _finish_tar(self,
+                    datos_tar: Dict[str, Any],
+                    num_documentos: int,
+                    num_guardados: int,
+                    ledger: Optional[Dict[str, Dict[str, Any]]],
+                    datos_proceso: Dict[str, Any]
+                    ) -> None:
+        """
+        Cierra el procesamiento de un TAR: registra los hashes de sus miembros, incluidos los omitidos
+        al reanudarlo (solo si se guardaron todos sus documentos), y guarda sus metadatos y conteos en
+        TAR_PROCESADOS.
+        """
+        datos_proceso["num_dict"] += num_guardados
+        reanudados = datos_tar.pop("ledger_reanudados", None)
+        if ledger is not None and reanudados:
+            ledger.update(reanudados)
+        datos_tar["num_documentos"] = num_documentos
+        datos_tar["num_guardados"] = num_guardados
+        datos_tar["num_fallidos"] = num_documentos - num_guardados
+        resumen = {"datos": {
+            "tar": datos_tar["nombre"],
+            "num_archivos": datos_tar.get("num_archivos", 0),
+            "bytes_archivos": datos_tar.get("bytes_archivos", 0),
+            "num_documentos": num_documentos,
+            "num_guardados": num_guardados,
+            "num_fallidos": datos_tar["num_fallidos"]
+        }}
+        if datos_tar["num_fallidos"]:
+            logging.error(f"TAR '{datos_tar['nombre']}': {num_guardados} documentos guardados y {datos_tar['num_fallidos']} fallidos de {num_documentos}.", extra=resumen)
+        else:
+            logging.info(f"TAR '{datos_tar['nombre']}': {num_guardados} documentos guardados.", extra=resumen)
+        if ledger and num_guardados == num_documentos:
+            for registro in ledger.values():
+                registro["tar"] = datos_tar["nombre"]
+            resultado = self._mongo_client.save_processed_members(list(ledger.values()))
+            logging.info(resultado.message)
+        resultado = self._mongo_client.save_processed_tar_file(datos_tar)
+        logging.info(resultado.message)
+        if PUNTOS_CONTROL and resultado.success:
+            resultado = self._mongo_client.clear_checkpoint(datos_tar["nombre"])
+            logging.info(resultado.message)
+        datos_proceso["num_tar"] += 1
+
+    def _log_file(self, nombre: str, tamanio: int, datos_tar: Dict[str, Any], **fechas: datetime) -> None:
+        """
+        Registra los datos de un archivo del TAR y los suma a los conteos del TAR. Con
+        LOGS_ESTRUCTURADOS se emite un unico log con los campos tipados en 'datos'; si no,
+        un log por dato.
+        """
+        datos_tar["num_archivos"] = datos_tar.get("num_archivos", 0) + 1
+        datos_tar["bytes_archivos"] = datos_tar.get("bytes_archivos", 0) + tamanio
+        if LOGS_ESTRUCTURADOS:
+            logging.info(
+                f"Procesando archivo '{nombre}' ({tamanio} bytes)",
+                extra={"datos": {"tar": datos_tar["nombre"], "archivo": nombre, "tamanio": tamanio, **fechas}}
+            )
+            return
+
+        logging.info(f"Procesando archivo '{nombre}'")
+        logging.info(f"Tamanio: {tamanio} bytes")
+        for clave, fecha in fechas.items():
+            logging.info(f"{ETIQUETAS_FECHAS[clave]}: {fecha}")
 
     def _process_manifest_file(self, archivo_xml: Path) -> Optional[str]:
         """Procesa un archivo .manifest y extrae su contenido."""
@@ -209,6 +927,32 @@ class AutomationProcess:
             return resultado.data
         return None
 
+    def _iter_data_files(self, lista_archivos: List[Union[Path, FusionItem]], datos_tar: Dict[str, Any]) -> Iterator[DataItem]:
+        """Registra los datos de cada archivo, procesa el .manifest y entrega los archivos .DATA."""
+        for archivo_xml in lista_archivos:
+            if isinstance(archivo_xml, FusionItem):
+                logging.info(f"Procesando archivo '{archivo_xml.nombre}' (fusion de '{_item_name(archivo_xml.original)}' y '{_item_name(archivo_xml.complemento)}')")
+                yield archivo_xml
+                continue
+
+            stats = archivo_xml.stat()
+            self._log_file(
+                archivo_xml.name, stats.st_size, datos_tar,
+                fecha_creacion=datetime.fromtimestamp(stats.st_ctime),
+                fecha_modificacion=datetime.fromtimestamp(stats.st_mtime),
+                fecha_acceso=datetime.fromtimestamp(stats.st_atime)
+            )
+
+            if archivo_xml.suffix.lower() == ".data":
+                yield archivo_xml
+
+            elif archivo_xml.suffix.lower() == ".manifest":
+                contenido_manifest = self._process_manifest_file(archivo_xml)
+                if contenido_manifest:
+                    datos_tar["manifest"] = contenido_manifest
+                    if not LOGS_ESTRUCTURADOS:
+                        logging.info(f"Archivo '{archivo_xml.name}' procesado correctamente.")
+
     def _process_uncompressed_files(self,  dir_descomprimidos: Path, dict_codigos: Dict[str, Any], datos_proceso: Dict[str, Any]) -> Dict[str, Any]:
         """Procesa los archivos XML descomprimidos, los convierte a diccionarios y los guarda en MongoDB."""
         for carpeta in dir_descomprimidos.iterdir():
@@ -216,95 +960,330 @@ class AutomationProcess:
                 logging.info(f"'{carpeta.name}' no es una carpeta, ignorandolo.")
                 continue
 
-            datos_tar: Dict[str, Any] = {
-                "nombre": carpeta.name,
-                "fecha_procesado": datetime.now(),
-                "manifest": None
-            }
-            documentos_procesados: List[Dict[str, Any]] = []
+            datos_tar = self._new_tar_record(carpeta.name)
+            escritor = self._new_writer(carpeta.name)
 
             logging.info(f"Procesando carpeta: '{carpeta.name}'")
             self._xml_converter = XMLConverter()
-            self._metadata_extractor = MetadataExtractor()
 
             # para modificar la forma de clasificar archivos solo modificar 'clasificar_archivos_xml'
-            lista_archivos: Any = self._xml_converter.build_list(carpeta)
-            for archivo_xml in lista_archivos.data:
-                stats = archivo_xml.stat()
-                fecha_creacion = datetime.fromtimestamp(stats.st_ctime)
-                fecha_modificacion = datetime.fromtimestamp(stats.st_mtime)
-                fecha_acceso = datetime.fromtimestamp(stats.st_atime)
-                logging.info(f"Procesando archivo '{archivo_xml.name}'")
-                logging.info(f"Tamanio: {stats.st_size} bytes")
-                logging.info(f"Fecha de creacion: {fecha_creacion}")
-                logging.info(f"Fecha de ultima modificacion: {fecha_modificacion}")
-                logging.info(f"Fecha de ultimo acceso: {fecha_acceso}")
-
-                if archivo_xml.suffix.lower() == ".data":
-                    dict_documento = self._process_data_file(archivo_xml, dict_codigos)
-                    if dict_documento:
-                        logging.info(f"Archivo '{archivo_xml.name}' procesado correctamente.")
-                        documentos_procesados.append(dict_documento)
+            with self._metrics.measure("clasificacion"):
+                lista_archivos: Any = self._xml_converter.build_list(carpeta)
+            items = self._iter_data_files(lista_archivos.data, datos_tar)
+            if PUNTOS_CONTROL:
+                items = self._skip_checkpointed(items, datos_tar)
+            try:
+                self._collect_documents(items, escritor, nombre_tar=carpeta.name)
+            finally:
+                num_guardados = escritor.close()
+            self._finish_tar(datos_tar, escritor.num_documentos, num_guardados, None, datos_proceso)
 
-                elif archivo_xml.suffix.lower() == ".manifest":
-                    contenido_manifest = self._process_manifest_file(archivo_xml)
-                    if contenido_manifest:
-                        datos_tar["manifest"] = contenido_manifest
-                        logging.info(f"Archivo '{archivo_xml.name}' procesado correctamente.")
+        shutil.rmtree(self.dir_descomprimidos)
+        return datos_proceso
 
-            if documentos_procesados:
-                #ids_guardados: Any = self._mongo_client.save_documents(documentos_procesados)
-                ids_guardados = self.save_documents_in_batch(documentos_procesados)
-                datos_proceso["num_dict"] += len(ids_guardados)
-                #logging.info(ids_guardados)
-            resultado = self._mongo_client.save_processed_tar_file(datos_tar)
-            logging.info(resultado.message)
-            datos_proceso["num_tar"] += 1
+    def _iter_data_members(self, resultados: Iterable[Any], datos_tar: Dict[str, Any]) -> Iterator[DataItem]:
+        """Registra los datos de cada miembro leido en streaming, procesa el .manifest y entrega los miembros .DATA."""
+        for resultado in resultados:
+            if not resultado.success:
+                logging.error(resultado.message)
+                continue
+
+            if isinstance(resultado.data, FusionItem):
+                fusion_item: FusionItem = resultado.data
+                logging.info(f"Procesando archivo '{fusion_item.nombre}' (fusion de '{_item_name(fusion_item.original)}' y '{_item_name(fusion_item.complemento)}')")
+                yield fusion_item
+                continue
+
+            miembro: TarMember = resultado.data
+            self._log_file(
+                miembro.nombre, len(miembro.contenido), datos_tar,
+                fecha_modificacion=datetime.fromtimestamp(miembro.tarinfo.mtime)
+            )
+
+            if miembro.suffix.lower() == ".data":
+                yield miembro
+
+            elif miembro.suffix.lower() == ".manifest":
+                resultado_manifest = self._xml_converter.format_manifest_content(
+                    miembro.nombre, miembro.contenido.decode("utf-8")
+                )
+                if resultado_manifest.success and resultado_manifest.data:
+                    datos_tar["manifest"] = resultado_manifest.data
+                    if not LOGS_ESTRUCTURADOS:
+                        logging.info(f"Archivo '{miembro.nombre}' procesado correctamente.")
+
+    def _iter_stream_items(self, archivo_tar: Path, datos_tar: Dict[str, Any], descompresor: TarDecompressor) -> Iterator[DataItem]:
+        """
+        Lee un TAR.GZ en streaming, en una sola pasada, y entrega sus .DATA (omitiendo los ya ingeridos
+        si el ledger esta activo). Los miembros solo se hashean con el ledger activo; el hash del TAR
+        queda en 'descompresor.hash_tar' al terminar (ver '_finish_stream_tar').
+        """
+        miembros = self._metrics.iter_measured(
+            "lectura_streaming",
+            descompresor.iter_tar_gz_members(archivo_tar, hash_miembros=self.ledger_hash),
+            lambda miembro: len(miembro.contenido)
+        )
+        resultados = self._xml_converter.build_list_from_members(miembros)
+        items = self._iter_data_members(resultados, datos_tar)
+        if self.ledger_hash:
+            items = self._skip_ingested_members(items)
+        if PUNTOS_CONTROL:
+            items = self._skip_checkpointed(items, datos_tar)
+        return items
+
+    def _finish_stream_tar(self, datos_tar: Dict[str, Any], descompresor: TarDecompressor) -> None:
+        """
+        Agrega al registro de un TAR leido en streaming el hash calculado en la lectura y, si ya se
+        proceso otro TAR con el mismo contenido, su nombre en 'duplicado_de' (sus miembros ya se
+        omitieron por el ledger de miembros).
+        """
+        datos_tar["hash"] = descompresor.hash_tar
+        original = self._duplicated_of(datos_tar["nombre"], descompresor.hash_tar)
+        if original is not None:
+            datos_tar["duplicado_de"] = original
+
+    def _process_compressed_files_streaming(self,
+                                            dict_codigos: Dict[str, Any],
+                                            datos_proceso: Dict[str, Any],
+                                            archivos: Optional[List[Path]] = None
+                                            ) -> Dict[str, Any]:
+        """Lee los archivos TAR.GZ en streaming, convierte sus miembros a diccionarios y los guarda en MongoDB."""
+        self._xml_converter = XMLConverter()
+        for archivo_tar in self._pending_tar_files(archivos):
+            logging.info(f"Procesando en streaming: '{archivo_tar.name}'")
+            datos_tar = self._new_tar_record(archivo_tar.name)
+            descompresor = TarDecompressor(self.dir_descomprimidos)
+            escritor = self._new_writer(archivo_tar.name)
+            ledger: Optional[Dict[str, Dict[str, Any]]] = {} if self.ledger_hash else None
+            try:
+                self._collect_documents(self._iter_stream_items(archivo_tar, datos_tar, descompresor), escritor, ledger, archivo_tar.name)
+            except (tarfile.TarError, OSError) as e:
+                logging.error(f"Error al leer en streaming '{archivo_tar.name}': {e}")
+                datos_proceso["num_dict"] += escritor.close()
+                continue
+
+            num_guardados = escritor.close()
+            self._finish_stream_tar(datos_tar, descompresor)
+            self._finish_tar(datos_tar, escritor.num_documentos, num_guardados, ledger, datos_proceso)
 
-        shutil.rmtree(self.dir_descomprimidos)
         return datos_proceso
 
-    def save_documents_in_batch(self, documentos_procesados: List[Any]) -> List[Any]:
-        """Guarda los documentos por lotes."""
-        inserted_ids = []
-        global_errors = []
+    def _process_pipeline(self, datos_proceso: Dict[str, Any], archivos: Optional[List[Path]] = None) -> Dict[str, Any]:
+        """
+        Procesa los archivos TAR.GZ como un pipeline de tres etapas unidas por colas acotadas:
+        lectura (descompresion o streaming del TAR, 'lectores' archivos a la vez), conversion y
+        enriquecimiento (en el pool de 'workers' procesos) y escritura en MongoDB ('escritores'
+        lotes a la vez). Mientras se convierte un TAR ya se lee el siguiente y se insertan los
+        documentos del anterior.
+
+        El hash de cada TAR (LEDGER_HASH) se calcula en la etapa de lectura, mientras se descomprime
+        o se recorre el TAR, por lo que no requiere una lectura adicional.
+        """
+        self._xml_converter = XMLConverter()
+        logging.info(f"Iniciando pipeline: {self.lectores} lectores, {self.workers} workers, {self.escritores} escritores, colas de {self.tamanio_cola}.")
+        StagedPipeline(self.tamanio_cola) \
+            .add_stage("lectura", self._stage_read, self.lectores) \
+            .add_stage("conversion", self._stage_process) \
+            .add_stage("escritura", partial(self._stage_write, datos_proceso=datos_proceso)) \
+            .run(self._pending_tar_files(archivos))
+        return datos_proceso
+
+    def _stage_read(self, archivos_tar: Iterator[Path], emitir: Any) -> None:
+        """Etapa de lectura: entrega los .DATA de cada TAR seguidos de una marca de fin (o de error) del TAR."""
+        for archivo_tar in archivos_tar:
+            datos_tar = self._new_tar_record(archivo_tar.name)
+            descompresor: Optional[TarDecompressor] = None
+            try:
+                if self.streaming:
+                    logging.info(f"Procesando en streaming: '{archivo_tar.name}'")
+                    descompresor = TarDecompressor(self.dir_descomprimidos)
+                    items = self._iter_stream_items(archivo_tar, datos_tar, descompresor)
+                else:
+                    logging.info(f"Descomprimiendo '{archivo_tar.name}'.")
+                    with self._metrics.measure("descompresion", archivo_tar.stat().st_size):
+                        resultado: Any = TarDecompressor(self.dir_descomprimidos).decompress_tar_gz(archivo_tar)
+                    logging.info(resultado.message)
+                    if not resultado.success:
+                        emitir(("error", datos_tar, None, None))
+                        continue
+                    if self._is_duplicated_tar(archivo_tar.name, resultado.data["hash"]):
+                        shutil.rmtree(self.dir_descomprimidos / archivo_tar.name, ignore_errors=True)
+                        continue
+                    datos_tar["hash"] = resultado.data["hash"]
+                    with self._metrics.measure("clasificacion"):
+                        lista_archivos: Any = self._xml_converter.build_list(self.dir_descomprimidos / archivo_tar.name)
+                    items = self._iter_data_files(lista_archivos.data, datos_tar)
+                    if PUNTOS_CONTROL:
+                        items = self._skip_checkpointed(items, datos_tar)
 
-        for i in range(0, len(documentos_procesados), BUFFER_SIZE):
-            batch = documentos_procesados[i:i + BUFFER_SIZE]
-            lote_num = i // BUFFER_SIZE + 1
+                for item in items:
+                    emitir(("item", datos_tar, item, None))
+                # el hash del TAR leido en streaming se conoce al terminar de recorrerlo, antes de la marca de fin
+                if descompresor is not None:
+                    self._finish_stream_tar(datos_tar, descompresor)
+            except (tarfile.TarError, OSError) as e:
+                logging.error(f"Error al leer '{archivo_tar.name}': {e}")
+                emitir(("error", datos_tar, None, None))
+                continue
+            emitir(("fin", datos_tar, None, None))
 
-            invalid_documents = [doc for doc in batch if not isinstance(doc, dict)]
-            valid_batch = [doc for doc in batch if isinstance(doc, dict)]
+    def _stage_process(self, mensajes: Iterator[Tuple[str, Dict[str, Any], Any, Any]], emitir: Any) -> None:
+        """
+        Etapa de conversion y enriquecimiento: reparte los .DATA en el pool de procesos y entrega
+        los resultados en el mismo orden en que llegaron, junto con las marcas de fin de cada TAR.
+        """
+        max_pendientes = self.workers * 4
+        pendientes: Deque[Tuple[str, Dict[str, Any], Any, Any]] = deque()
 
-            if invalid_documents:
-                logging.warning(f"Lote {lote_num}: Se ingnoraron {len(invalid_documents)} elementos no validos.")
+        def _emitir_primero() -> None:
+            tipo, datos_tar, item, futuro = pendientes.popleft()
+            emitir((tipo, datos_tar, item, self._worker_result(futuro) if futuro is not None else None))
 
-            if not valid_batch:
-                logging.warning(f"Lote {lote_num}: No quedan documentos validos para insertar.")
+        for tipo, datos_tar, item, _ in mensajes:
+            if tipo == "item" and self._document_processor.is_large(item):
+                while pendientes:
+                    _emitir_primero()
+                logging.info(f"Archivo '{_item_name(item)}' supera el umbral, se parsea por bloques.")
+                for resultado in self._document_processor.process_chunks(item):
+                    emitir(("doc", datos_tar, item, resultado))
                 continue
 
+            if tipo == "item" and self._executor is None:
+                emitir(("doc", datos_tar, item, self._document_processor.process(item)))
+                continue
+
+            if tipo == "item":
+                executor = self._executor
+                assert executor is not None
+                pendientes.append(("doc", datos_tar, item, executor.submit(process_in_worker, item)))
+            elif pendientes:
+                pendientes.append((tipo, datos_tar, None, None))
+            else:
+                emitir((tipo, datos_tar, None, None))
+
+            while len(pendientes) >= max_pendientes:
+                _emitir_primero()
+
+        while pendientes:
+            _emitir_primero()
+
+    def _stage_write(self, mensajes: Iterator[Tuple[str, Dict[str, Any], Any, Any]], emitir: Any, datos_proceso: Dict[str, Any]) -> None:
+        """
+        Etapa de escritura: agrupa los documentos de cada TAR en lotes del tamanio objetivo actual, los inserta
+        con hasta 'escritores' lotes en vuelo y, al recibir la marca de fin, registra el TAR.
+        """
+        estados: Dict[str, Dict[str, Any]] = {}
+        en_vuelo: List[Future] = []
+
+        def _insertar(estado: Dict[str, Any]) -> None:
+            while len(en_vuelo) >= self.escritores * 2:
+                completados, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in completados:
+                    en_vuelo.remove(futuro)
+            estado["num_lote"] += 1
+            futuro = insercion.submit(self._save_tar_batch, estado["nombre"], estado["documentos"], estado["num_lote"])
+            estado["futuros"].append(futuro)
+            en_vuelo.append(futuro)
+            estado["documentos"] = []
+
+        with ThreadPoolExecutor(max_workers=self.escritores, thread_name_prefix="pipeline-insercion") as insercion:
+            for tipo, datos_tar, item, resultado in mensajes:
+                estado = estados.setdefault(datos_tar["nombre"], {
+                    "nombre": datos_tar["nombre"],
+                    "documentos": [],
+                    "futuros": [],
+                    "num_lote": 0,
+                    "num_documentos": 0,
+                    "ledger": {} if self.ledger_hash and self.streaming else None
+                })
+
+                if tipo == "doc":
+                    if self._accept_result(item, resultado, estado["documentos"], estado["ledger"], datos_tar["nombre"]):
+                        estado["num_documentos"] += 1
+                    if len(estado["documentos"]) >= self._batch_sizer.objetivo:
+                        _insertar(estado)
+                    continue
+
+                del estados[datos_tar["nombre"]]
+                if tipo == "fin" and estado["documentos"]:
+                    _insertar(estado)
+                num_guardados = sum(len(futuro.result()) for futuro in estado["futuros"])
+                shutil.rmtree(self.dir_descomprimidos / datos_tar["nombre"], ignore_errors=True)
+                if tipo == "fin":
+                    self._finish_tar(datos_tar, estado["num_documentos"], num_guardados, estado["ledger"], datos_proceso)
+                else:
+                    datos_proceso["num_dict"] += num_guardados
+                    logging.warning(f"El archivo TAR '{datos_tar['nombre']}' no se pudo leer completo; no se registra como procesado.")
+
+    def save_documents_in_batch(self, documentos_procesados: List[Any], num_lote: int = 1) -> List[Any]:
+        """
+        Guarda los documentos por lotes formados por numero de documentos y tamanio BSON estimado.
+        En los logs cada lote se identifica como 'num_lote.k' (k-esimo lote de los documentos recibidos),
+        para no confundirlo con los lotes de otras llamadas. La latencia de cada insercion ajusta el
+        tamanio de los lotes siguientes.
+
+        Si una insercion falla en parte, solo se reenvian los documentos con errores transitorios,
+        con espera exponencial y aleatoria entre intentos; los rechazados de forma definitiva no se reintentan.
+        """
+        inserted_ids = []
+        global_errors = []
+
+        invalid_documents = [doc for doc in documentos_procesados if not isinstance(doc, dict)]
+        valid_documents = [doc for doc in documentos_procesados if isinstance(doc, dict)]
+
+        if invalid_documents:
+            logging.warning(f"Lote {num_lote}: Se ingnoraron {len(invalid_documents)} elementos no validos.")
+
+        if not valid_documents:
+            logging.warning(f"Lote {num_lote}: No quedan documentos validos para insertar.")
+
+        for parte, (valid_batch, bytes_lote) in enumerate(self._batch_sizer.split(valid_documents), start=1):
+            lote_num = f"{num_lote}.{parte}"
+            pendientes = valid_batch
+            num_fallidos = 0
             last_error = None
             for attempt in range(1, MAX_ATTEMPTS + 1):
-                try:
-                    result: Any = self._mongo_client.save_documents(valid_batch)
+                inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+                result: Any = self._mongo_client.save_documents(pendientes)
+                latencia = time.perf_counter() - inicio
+                self._metrics.record("insercion", latencia, time.thread_time() - inicio_cpu, bytes_lote if attempt == 1 else 0, len(pendientes))
+                if result.success:
                     inserted_ids.extend(result.data)
-                    logging.info(f"Lote {lote_num}: {len(result.data)} documentos guardados correctamente (Intento {attempt}/{MAX_ATTEMPTS}).")
+                    objetivo = self._batch_sizer.record(len(pendientes), latencia)
+                    logging.info(
+                        f"Lote {lote_num}: {len(result.data)} documentos guardados correctamente "
+                        f"({bytes_lote / 1024:.1f} KB, {latencia:.3f}s, siguiente objetivo {objetivo}) (Intento {attempt}/{MAX_ATTEMPTS})."
+                    )
                     last_error = None
                     break
-                except (OperationFailure, PyMongoError) as e:
-                    last_error = e
-                    if attempt < MAX_ATTEMPTS:
-                        logging.warning(f"Lote {lote_num}: Error en intento {attempt}/{MAX_ATTEMPTS}. Reintentando en {WAITING_TIME}s ... Error: {e}")
-                        time.sleep(WAITING_TIME)
-                    else:
-                        logging.error(f"Lote {lote_num}: Fallo despues de {MAX_ATTEMPTS} intentos. Error: {e}")
 
-            if last_error:
-                global_errors.append(f"Lote {lote_num}: {last_error}")
+                # --- solo se reenvian los documentos con errores transitorios ---
+                inserted_ids.extend(result.data["inserted_ids"])
+                num_fallidos += len(result.data["failed_indices"])
+                last_error = result.error_details
+                if result.data["failed_indices"]:
+                    logging.error(f"Lote {lote_num}: {len(result.data['failed_indices'])} documentos rechazados sin reintento. Error: {result.error_details}")
+                pendientes = [pendientes[i] for i in result.data["retry_indices"]]
+                if not pendientes:
+                    break
+                if attempt < MAX_ATTEMPTS:
+                    espera = random.uniform(0, min(WAITING_TIME_MAX, WAITING_TIME * 2 ** (attempt - 1)))
+                    logging.warning(
+                        f"Lote {lote_num}: {len(result.data['inserted_ids'])} guardados, {len(pendientes)} por reintentar en intento {attempt}/{MAX_ATTEMPTS}. "
+                        f"Reintentando en {espera:.2f}s ... Error: {result.error_details}"
+                    )
+                    time.sleep(espera)
+                else:
+                    num_fallidos += len(pendientes)
+                    logging.error(f"Lote {lote_num}: {len(pendientes)} documentos fallaron despues de {MAX_ATTEMPTS} intentos. Error: {result.error_details}")
+
+            if num_fallidos:
+                global_errors.append(f"Lote {lote_num}: {num_fallidos} documentos no guardados ({last_error})")
 
         if global_errors:
             error_msg = f"Errores en {len(global_errors)} lotes: {', '.join(global_errors)}"
             logging.error(f"{error_msg}. Documentos insertados con exito: {len(inserted_ids)}")
+            return inserted_ids
 
         logging.info(f"Todos los documentos validos insertados con exito. Total: {len(inserted_ids)}")
         return inserted_ids
@@ -0,0 +1,149 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from content_codec import CAMPO_CODEC
+import threading
+import bson
+
+MUESTREO_TAMANIO = 32
+TAMANIO_METADATOS = 512
+
+class AdaptiveBatchSizer:
+    """
+    Clase para formar lotes de insercion por numero de documentos y por tamanio BSON estimado,
+    ajustando el numero objetivo de documentos segun la latencia observada de cada insercion.
+
+    Si un lote se inserta en menos de la mitad de 'latencia_objetivo', el objetivo se duplica
+    (hasta 'max_docs'); si tarda mas que 'latencia_objetivo', se reduce a la mitad (hasta 'min_docs').
+    Ningun lote supera 'max_bytes' (segun el tamanio estimado), salvo un unico documento que por si
+    solo ya lo supera.
+
+    El tamanio no se calcula codificando cada documento (pymongo lo vuelve a codificar al insertarlo):
+    un documento comprimido se estima por el tamanio de 'contenido' y uno sin comprimir por el tamanio
+    del .DATA de origen ('tamanio_archivo') multiplicado por la relacion BSON/XML medida codificando
+    1 de cada 'MUESTREO_TAMANIO' documentos.
+
+    Attributes:
+        objetivo (int): Numero de documentos por lote actual.
+        min_docs (int): Numero minimo de documentos por lote.
+        max_docs (int): Numero maximo de documentos por lote.
+        max_bytes (int): Tamanio BSON maximo estimado de un lote.
+        latencia_objetivo (float): Segundos que deberia tardar la insercion de un lote.
+        adaptativo (bool): Ajusta el objetivo segun la latencia (False = objetivo fijo).
+    """
+
+    def __init__(self,
+                objetivo: int,
+                min_docs: int = 1,
+                max_docs: int = 5000,
+                max_bytes: int = 16 * 1024 * 1024,
+                latencia_objetivo: float = 1.0,
+                adaptativo: bool = True
+                ) -> None:
+        """
+        Constructor para la clase AdaptiveBatchSizer.
+
+        Parameters:
+            objetivo (int): Numero de documentos por lote inicial.
+            min_docs (int): Numero minimo de documentos por lote.
+            max_docs (int): Numero maximo de documentos por lote.
+            max_bytes (int): Tamanio BSON maximo estimado de un lote.
+            latencia_objetivo (float): Segundos que deberia tardar la insercion de un lote.
+            adaptativo (bool): Ajusta el objetivo segun la latencia (False = objetivo fijo).
+        """
+        self.min_docs = max(1, min_docs)
+        self.max_docs = max(self.min_docs, max_docs)
+        self.objetivo = min(max(objetivo, self.min_docs), self.max_docs)
+        self.max_bytes = max(1, max_bytes)
+        self.latencia_objetivo = latencia_objetivo
+        self.adaptativo = adaptativo
+        self._bloqueo = threading.Lock()
+        self._relacion_bson: Optional[float] = None
+        self._sin_muestrear = 0
+
+    def estimate_size(self, documento: Dict[str, Any]) -> int:
+        """
+        Estima el tamanio BSON de un documento sin codificarlo, salvo 1 de cada 'MUESTREO_TAMANIO'
+        (y los que no tienen 'tamanio_archivo' o son un bloque de un .DATA grande, que se codifican).
+
+        Parameters:
+            documento (Dict[str, Any]): Documento a insertar.
+
+        Returns:
+            int: Tamanio estimado en bytes.
+        """
+        contenido = documento.get("contenido")
+        if CAMPO_CODEC in documento and isinstance(contenido, bytes):
+            return len(contenido) + TAMANIO_METADATOS
+
+        tamanio_xml = documento.get("tamanio_archivo")
+        if not isinstance(tamanio_xml, int) or tamanio_xml <= 0 or "parte" in documento:
+            return self._encoded_size(documento)
+
+        with self._bloqueo:
+            relacion = self._relacion_bson
+            self._sin_muestrear += 1
+            muestrear = relacion is None or self._sin_muestrear >= MUESTREO_TAMANIO
+            if muestrear:
+                self._sin_muestrear = 0
+        if relacion is not None and not muestrear:
+            return int(tamanio_xml * relacion)
+
+        tamanio = self._encoded_size(documento)
+        with self._bloqueo:
+            nueva = tamanio / tamanio_xml
+            self._relacion_bson = nueva if self._relacion_bson is None else self._relacion_bson * 0.75 + nueva * 0.25
+        return tamanio
+
+    @staticmethod
+    def _encoded_size(documento: Dict[str, Any]) -> int:
+        """Tamanio BSON real (aproximado por su representacion en texto si no se puede codificar)."""
+        try:
+            return len(bson.encode(documento))
+        except Exception:
+            return len(str(documento).encode("utf-8"))
+
+    def split(self, documentos: List[Dict[str, Any]]) -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+        """
+        Divide los documentos en lotes que respetan el objetivo de documentos y 'max_bytes'.
+
+        El objetivo se lee al iniciar cada lote, por lo que los ajustes hechos con 'record'
+        entre lotes se aplican a los siguientes.
+
+        Parameters:
+            documentos (List[Dict[str, Any]]): Documentos a insertar.
+
+        Returns:
+            Iterator[Tuple[List[Dict[str, Any]], int]]: Cada lote con su tamanio estimado en bytes.
+        """
+        lote: List[Dict[str, Any]] = []
+        bytes_lote = 0
+        objetivo = self.objetivo
+        for documento in documentos:
+            tamanio = self.estimate_size(documento)
+            if lote and (len(lote) >= objetivo or bytes_lote + tamanio > self.max_bytes):
+                yield lote, bytes_lote
+                lote, bytes_lote = [], 0
+                objetivo = self.objetivo
+            lote.append(documento)
+            bytes_lote += tamanio
+        if lote:
+            yield lote, bytes_lote
+
+    def record(self, num_documentos: int, latencia: float) -> int:
+        """
+        Registra la latencia de una insercion y ajusta el objetivo de documentos por lote.
+
+        Parameters:
+            num_documentos (int): Documentos del lote insertado.
+            latencia (float): Segundos que tardo la insercion.
+
+        Returns:
+            int: El nuevo objetivo de documentos por lote.
+        """
+        with self._bloqueo:
+            if not self.adaptativo or self.latencia_objetivo <= 0:
+                return self.objetivo
+            if latencia > self.latencia_objetivo:
+                self.objetivo = max(self.min_docs, self.objetivo // 2)
+            elif latencia < self.latencia_objetivo / 2 and num_documentos >= self.objetivo:
+                self.objetivo = min(self.max_docs, self.objetivo * 2)
+            return self.objetivo
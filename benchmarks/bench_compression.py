@@ -0,0 +1,129 @@
+"""
+Benchmark del formato de guardado de 'contenido' en JSON_PROCESADOS (COMPRESION_CONTENIDO) con el
+corpus sintetico de 'corpus.py' y MongoDB en memoria ('fake_mongo.py') o un mongod ('--mongo-uri').
+
+Para cada formato ('sin_comprimir', 'zlib', 'lzma' o los de '--formatos') informa:
+    - procesamiento: 'DocumentProcessor.process' de todos los .DATA (incluye la compresion)
+    - bytes: tamanio BSON total de los documentos y relacion contra el formato sin comprimir
+    - insercion: 'MongoDBHandler.save_documents' por lotes de '--lote' documentos
+    - red: tiempo de enviar los bytes con un ancho de banda de '--ancho-banda-mbps' (0 = no se suma)
+    - docs/s escritura: documentos por segundo de insercion + red
+    - docs/s total: documentos por segundo de procesamiento + insercion + red (la compresion se paga
+      en el procesamiento y se recupera en la escritura)
+Al final se decodifica el primer documento de cada formato con 'content_codec.decode_document' (lo
+que usa 'MongoDBHandler.find_documents') y se verifica que 'contenido' sea igual al sin comprimir.
+
+Uso:
+    python benchmarks/bench_compression.py [--archivos N] [--vuelos V] [--profundidad P] [--formatos sin_comprimir,zlib,lzma]
+                                           [--nivel N] [--lote L] [--ancho-banda-mbps MBPS] [--mongo-uri URI]
+"""
+from pathlib import Path
+from typing import Any, Dict, List
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import time
+import bson
+
+DIR_BENCH = Path(__file__).resolve().parent
+sys.path.insert(0, str(DIR_BENCH.parent))
+sys.path.insert(0, str(DIR_BENCH))
+
+import mongo_connection
+from mongo_db import MongoDBHandler
+from decompress import TarDecompressor
+from document_processor import DocumentProcessor
+from content_codec import decode_document
+from file_reader import FileProcessor
+from xml_to_dict import XMLConverter
+from corpus import generate_corpus
+from fake_mongo import FakeMongoClient
+
+SIN_COMPRIMIR = "sin_comprimir"
+
+def load_items(corpus: Path) -> List[Any]:
+    """Miembros .DATA (y pares a fusionar) de todos los TAR del corpus, leidos en memoria."""
+    convertidor = XMLConverter()
+    items: List[Any] = []
+    for archivo_tar in sorted((corpus / "COMPRIMIDOS").glob("*.tar.gz")):
+        miembros = TarDecompressor(corpus / "DESCOMPRIMIDOS").iter_tar_gz_members(archivo_tar)
+        for resultado in convertidor.build_list_from_members(miembros):
+            if resultado.success and resultado.data is not None and not resultado.data.nombre.endswith(".manifest"):
+                items.append(resultado.data)
+    return items
+
+def measure_format(formato: str, items: List[Any], dict_codigos: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Procesa, mide e inserta los documentos en el formato indicado."""
+    procesador = DocumentProcessor(dict_codigos, compresion="" if formato == SIN_COMPRIMIR else formato, nivel_compresion=args.nivel)
+    inicio = time.perf_counter()
+    documentos: List[Dict[str, Any]] = [resultado.data for resultado in map(procesador.process, items) if resultado.success and resultado.data]
+    procesamiento = time.perf_counter() - inicio
+    num_bytes = sum(len(bson.encode(documento)) for documento in documentos)
+
+    mongo = MongoDBHandler(args.mongo_uri or "mongodb://fake", f"BENCH_{time.time_ns()}", "TAR_PROCESADOS", "JSON_PROCESADOS")
+    inicio = time.perf_counter()
+    for i in range(0, len(documentos), args.lote):
+        resultado = mongo.save_documents(documentos[i:i + args.lote])
+        if not resultado.success:
+            raise RuntimeError(f"{resultado.message} {resultado.error_details}")
+    insercion = time.perf_counter() - inicio
+    red = num_bytes * 8 / (args.ancho_banda_mbps * 1_000_000) if args.ancho_banda_mbps else 0.0
+
+    if args.mongo_uri and mongo.client is not None:
+        mongo.client.drop_database(mongo.db_name.name)
+    mongo.disconnect()
+    return {
+        "documentos": len(documentos),
+        "procesamiento": procesamiento,
+        "bytes": num_bytes,
+        "insercion": insercion,
+        "red": red,
+        "docs_por_segundo_escritura": len(documentos) / (insercion + red) if insercion + red else 0.0,
+        "docs_por_segundo": len(documentos) / (procesamiento + insercion + red) if procesamiento + insercion + red else 0.0,
+        "muestra": decode_document(documentos[0])["contenido"]
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archivos", type=int, default=5000)
+    parser.add_argument("--vuelos", type=int, default=5)
+    parser.add_argument("--profundidad", type=int, default=0)
+    parser.add_argument("--codigos", type=int, default=2000)
+    parser.add_argument("--formatos", default=f"{SIN_COMPRIMIR},zlib,lzma")
+    parser.add_argument("--nivel", type=int, default=-1)
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--ancho-banda-mbps", type=float, default=100.0)
+    parser.add_argument("--mongo-uri", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    if not args.mongo_uri:
+        # 'MongoClient' es una clase; mypy no permite reemplazarla por asignacion
+        setattr(mongo_connection, "MongoClient", FakeMongoClient)
+
+    corpus = Path(tempfile.mkdtemp(prefix="bench_compression_"))
+    try:
+        print(f"Corpus: {generate_corpus(corpus, args.archivos, 1, args.vuelos, args.profundidad, args.codigos)}")
+        items = load_items(corpus)
+        dict_codigos = FileProcessor().merge_dictionaries(sorted((corpus / "COMPLEMENTOS").iterdir())).data or {}
+
+        print(f"{'formato':<14} {'docs':>7} {'proceso':>9} {'MB':>9} {'relacion':>9} {'insercion':>10} {'red':>8} {'escr. d/s':>10} {'total d/s':>10}")
+        resultados: Dict[str, Dict[str, Any]] = {}
+        for formato in args.formatos.split(","):
+            datos = resultados[formato] = measure_format(formato, items, dict_codigos, args)
+            base = resultados.get(SIN_COMPRIMIR, datos)
+            print(
+                f"{formato:<14} {datos['documentos']:>7} {datos['procesamiento']:>8.3f}s {datos['bytes'] / 1024 / 1024:>9.2f} "
+                f"{base['bytes'] / datos['bytes']:>8.2f}x {datos['insercion']:>9.3f}s {datos['red']:>7.3f}s {datos['docs_por_segundo_escritura']:>10.1f} {datos['docs_por_segundo']:>10.1f}"
+            )
+
+        if SIN_COMPRIMIR in resultados:
+            distintos = [formato for formato, datos in resultados.items() if datos["muestra"] != resultados[SIN_COMPRIMIR]["muestra"]]
+            print("Lectura con 'decode_document': " + (f"contenido distinto en {', '.join(distintos)}" if distintos else "contenido igual en todos los formatos."))
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Benchmark de la ingesta con un corpus sintetico ('corpus.py') y MongoDB en memoria ('fake_mongo.py')
+o un mongod local ('--mongo-uri').
+
+Para cada tamanio de corpus mide por separado:
+    - descompresion: 'TarDecompressor.decompress_tar_gz'
+    - clasificacion: 'XMLConverter.build_list'
+    - parseo / fusion: 'XMLConverter.parse_xml_file' y 'XMLConverter.fuse'
+    - enriquecimiento: 'CompiledJsonMatcher.add_description' (el que usa 'DocumentProcessor')
+    - insercion: 'AutomationProcess.save_documents_in_batch'
+y de extremo a extremo ('AutomationProcess.ejecutar') en cada modo de '--modos'. Con '--repeticiones'
+se guarda el mejor tiempo de cada medicion.
+
+Los resultados se comparan con el baseline ('baseline_ingestion.json' o '--baseline'): una medicion
+mas lenta que el baseline en mas de '--tolerancia' se marca como REGRESION y el script termina con
+codigo 1. Si el baseline no existe, o no tiene alguno de los tamanios medidos, el script termina con
+codigo 2 sin compararlo; el baseline solo se escribe con '--guardar-baseline' (reemplaza los tamanios
+medidos y conserva los demas).
+El baseline del repositorio se genero con los valores por defecto en una maquina de desarrollo; los
+tiempos dependen de la maquina, por lo que conviene regenerarlo (con '--guardar-baseline') en la
+misma donde se compara.
+
+Uso:
+    python benchmarks/bench_ingestion.py [--archivos 1000,10000,100000] [--modos serie,streaming,pipeline,workers4]
+                                         [--tars T] [--vuelos V] [--profundidad P] [--codigos C]
+                                         [--mongo-uri URI] [--latencia-mongo-ms MS] [--repeticiones R]
+                                         [--baseline ARCHIVO.json] [--guardar-baseline] [--tolerancia 0.2]
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+import argparse
+import gc
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+DIR_BENCH = Path(__file__).resolve().parent
+TRABAJO = Path(os.getenv("DIR_BENCH_INGESTA", Path(tempfile.gettempdir()) / "bench_ingestion"))
+# --- antes de importar 'automation_process', para que la cache y los reportes no queden en el repositorio ---
+os.environ.setdefault("DIR_CACHE", str(TRABAJO / "CACHE"))
+os.environ.setdefault("DIR_REPORTES", str(TRABAJO / "REPORTES"))
+
+sys.path.insert(0, str(DIR_BENCH.parent))
+sys.path.insert(0, str(DIR_BENCH))
+
+import mongo_connection
+from automation_process import AutomationProcess
+from mongo_db import MongoDBHandler
+from decompress import TarDecompressor
+from xml_to_dict import XMLConverter, FusionItem
+from file_reader import FileProcessor
+from json_matcher import CompiledJsonMatcher
+from corpus import generate_corpus
+from fake_mongo import FakeMongoClient
+
+BASELINE = DIR_BENCH / "baseline_ingestion.json"
+TAMANIO_BLOQUE = 1000
+MODOS: Dict[str, Dict[str, Any]] = {
+    "serie": {},
+    "streaming": {"streaming": True},
+    "pipeline": {"pipeline": True, "streaming": True},
+}
+
+def parse_mode(nombre: str) -> Dict[str, Any]:
+    """Parametros de 'AutomationProcess' de un modo ('serie', 'streaming', 'pipeline' o 'workersN')."""
+    if nombre.startswith("workers"):
+        return {"workers": int(nombre[len("workers"):] or 2)}
+    return MODOS[nombre]
+
+def prepare_corpus(num_archivos: int, args: argparse.Namespace) -> Tuple[Path, Dict[str, int]]:
+    """Genera el corpus (o reutiliza uno generado antes con los mismos parametros)."""
+    destino = TRABAJO / f"corpus_{num_archivos}_{args.tars}_{args.vuelos}_{args.profundidad}_{args.codigos}"
+    marca = destino / "corpus.json"
+    if marca.exists():
+        return destino, json.loads(marca.read_text(encoding="utf-8"))
+    shutil.rmtree(destino, ignore_errors=True)
+    inicio = time.perf_counter()
+    resumen = generate_corpus(destino, num_archivos, args.tars, args.vuelos, args.profundidad, args.codigos)
+    print(f"  corpus generado en {time.perf_counter() - inicio:.1f}s: {resumen}")
+    marca.write_text(json.dumps(resumen), encoding="utf-8")
+    return destino, resumen
+
+def new_process(corpus: Path, destino: Path, args: argparse.Namespace, **parametros: Any) -> AutomationProcess:
+    """Proceso apuntando al corpus, con una base de datos vacia."""
+    return AutomationProcess(
+        corpus / "COMPRIMIDOS", destino, corpus / "COMPLEMENTOS",
+        mongo_uri=args.mongo_uri or "mongodb://fake", db_name=f"BENCH_{time.time_ns()}", **parametros
+    )
+
+def _blocks(items: List[Any]) -> Iterator[List[Any]]:
+    for i in range(0, len(items), TAMANIO_BLOQUE):
+        yield items[i:i + TAMANIO_BLOQUE]
+
+def time_stages(corpus: Path, args: argparse.Namespace) -> Dict[str, float]:
+    """Tiempo (segundos) de cada etapa por separado, procesando los .DATA por bloques para acotar la memoria."""
+    tiempos = {"descompresion": 0.0, "clasificacion": 0.0, "parseo": 0.0, "fusion": 0.0, "enriquecimiento": 0.0, "insercion": 0.0}
+    destino = TRABAJO / "DESCOMPRIMIDOS"
+    shutil.rmtree(destino, ignore_errors=True)
+    convertidor = XMLConverter()
+
+    archivos_tar = sorted((corpus / "COMPRIMIDOS").glob("*.tar.gz"))
+    inicio = time.perf_counter()
+    for archivo_tar in archivos_tar:
+        TarDecompressor(destino).decompress_tar_gz(archivo_tar)
+    tiempos["descompresion"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    items = [item for archivo_tar in archivos_tar for item in convertidor.build_list(destino / archivo_tar.name).data or []]
+    tiempos["clasificacion"] = time.perf_counter() - inicio
+    items = [item for item in items if item.suffix.lower() == ".data"]
+
+    dict_codigos = FileProcessor().merge_dictionaries(sorted((corpus / "COMPLEMENTOS").iterdir())).data or {}
+    matcher = CompiledJsonMatcher(dict_codigos)
+    proceso = new_process(corpus, destino, args)
+    proceso._mongo_client = MongoDBHandler(args.mongo_uri or "mongodb://fake", f"BENCH_{time.time_ns()}", "TAR_PROCESADOS", "JSON_PROCESADOS")
+
+    for bloque in _blocks(items):
+        parseados = []
+        for etapa in ("parseo", "fusion"):
+            inicio = time.perf_counter()
+            for item in bloque:
+                if isinstance(item, FusionItem) == (etapa == "fusion"):
+                    resultado = convertidor.fuse(item) if etapa == "fusion" else convertidor.parse_xml_file(item)
+                    parseados.append((item, resultado.data))
+            tiempos[etapa] += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        documentos = [{"nombre_archivo": item.name if isinstance(item, Path) else item.nombre, "contenido": matcher.add_description(datos)} for item, datos in parseados]
+        tiempos["enriquecimiento"] += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        proceso.save_documents_in_batch(documentos)
+        tiempos["insercion"] += time.perf_counter() - inicio
+
+    proceso._mongo_client.disconnect()
+    shutil.rmtree(destino, ignore_errors=True)
+    return tiempos
+
+def time_end_to_end(corpus: Path, modo: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Tiempo de 'AutomationProcess.ejecutar' sobre todo el corpus."""
+    destino = TRABAJO / f"DESCOMPRIMIDOS_{modo}"
+    shutil.rmtree(destino, ignore_errors=True)
+    proceso = new_process(corpus, destino, args, **parse_mode(modo))
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = proceso.ejecutar()
+    segundos = time.perf_counter() - inicio
+    shutil.rmtree(destino, ignore_errors=True)
+    return {"segundos": round(segundos, 4), "documentos": resultado["num_dict"]}
+
+def compare(actual: Dict[str, Any], baseline: Dict[str, Any], tolerancia: float, minimo: float) -> List[str]:
+    """Compara cada medicion con el baseline; devuelve las regresiones."""
+    regresiones = []
+    for tamanio, resultados in actual.items():
+        base = baseline.get(tamanio)
+        if not base:
+            continue
+        mediciones = [(f"etapa {etapa}", segundos, base["etapas"].get(etapa)) for etapa, segundos in resultados["etapas"].items()]
+        mediciones += [
+            (f"modo {modo}", datos["segundos"], base["extremo_a_extremo"].get(modo, {}).get("segundos"))
+            for modo, datos in resultados["extremo_a_extremo"].items()
+        ]
+        for nombre, segundos, segundos_base in mediciones:
+            if segundos_base is None or max(segundos, segundos_base) < minimo:
+                continue
+            cambio = segundos / segundos_base - 1 if segundos_base else 0.0
+            marca = "REGRESION" if cambio > tolerancia else "mejora" if cambio < -tolerancia else ""
+            print(f"  {tamanio:>7} {nombre:<28} {segundos_base:10.3f}s -> {segundos:10.3f}s ({cambio:+.1%}) {marca}")
+            if marca == "REGRESION":
+                regresiones.append(f"{tamanio} {nombre}")
+    return regresiones
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archivos", default="1000,10000,100000")
+    parser.add_argument("--modos", default="serie,streaming,pipeline")
+    parser.add_argument("--tars", type=int, default=4)
+    parser.add_argument("--vuelos", type=int, default=5)
+    parser.add_argument("--profundidad", type=int, default=0)
+    parser.add_argument("--codigos", type=int, default=2000)
+    parser.add_argument("--mongo-uri", default=None)
+    parser.add_argument("--latencia-mongo-ms", type=float, default=0.0)
+    parser.add_argument("--repeticiones", type=int, default=1)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--guardar-baseline", action="store_true")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--minimo", type=float, default=0.05, help="segundos por debajo de los cuales no se compara")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    if not args.mongo_uri:
+        FakeMongoClient.latencia = args.latencia_mongo_ms / 1000
+        # 'MongoClient' es una clase; mypy no permite reemplazarla por asignacion
+        setattr(mongo_connection, "MongoClient", FakeMongoClient)
+    # sin baseline para comparar se termina antes de medir
+    tamanios = [str(int(valor)) for valor in args.archivos.split(",")]
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+    faltantes = [tamanio for tamanio in tamanios if tamanio not in baseline]
+    if faltantes and not args.guardar_baseline:
+        print(f"ERROR: '{args.baseline}' no tiene resultados de {', '.join(faltantes)} archivos; generarlos con '--guardar-baseline'.")
+        sys.exit(2)
+    TRABAJO.mkdir(parents=True, exist_ok=True)
+
+    resultados: Dict[str, Any] = {}
+    for num_archivos in (int(valor) for valor in tamanios):
+        print(f"{num_archivos} archivos:")
+        corpus, resumen = prepare_corpus(num_archivos, args)
+        etapas: Dict[str, float] = {}
+        for _ in range(max(1, args.repeticiones)):
+            for etapa, segundos in time_stages(corpus, args).items():
+                etapas[etapa] = min(segundos, etapas.get(etapa, segundos))
+        for etapa, segundos in etapas.items():
+            print(f"  {etapa:<28} {segundos:10.3f}s")
+        extremo: Dict[str, Any] = {}
+        for modo in args.modos.split(","):
+            extremo[modo] = min((time_end_to_end(corpus, modo, args) for _ in range(max(1, args.repeticiones))), key=lambda datos: datos["segundos"])
+            print(f"  {'extremo a extremo ' + modo:<28} {extremo[modo]['segundos']:10.3f}s  {extremo[modo]['documentos'] / extremo[modo]['segundos']:10.1f} docs/s")
+        resultados[str(num_archivos)] = {
+            "corpus": resumen,
+            "etapas": {etapa: round(segundos, 4) for etapa, segundos in etapas.items()},
+            "extremo_a_extremo": extremo
+        }
+
+    if args.guardar_baseline:
+        baseline.update(resultados)
+        args.baseline.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+        print(f"Baseline de {', '.join(resultados)} archivos guardado en '{args.baseline}'.")
+        sys.exit(0)
+
+    print(f"Comparacion con '{args.baseline}' (tolerancia {args.tolerancia:.0%}):")
+    regresiones = compare(resultados, baseline, args.tolerancia, args.minimo)
+    print(f"{len(regresiones)} regresiones." + (f" {', '.join(regresiones)}" if regresiones else ""))
+    sys.exit(1 if regresiones else 0)
+
+if __name__ == "__main__":
+    main()
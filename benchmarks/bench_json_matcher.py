@@ -0,0 +1,102 @@
+"""
+Micro-benchmark de JsonMatcher (recursivo, copia) contra CompiledJsonMatcher (pila explicita,
+copia e 'in_place').
+
+Uso:
+    python benchmarks/bench_json_matcher.py [--documentos N] [--repeticiones R] [--codigos C] [--profundidad P]
+"""
+from pathlib import Path
+from typing import Any, Dict, List
+import argparse
+import copy
+import gc
+import json
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from json_matcher import JsonMatcher, CompiledJsonMatcher
+
+def build_descriptions(num_codigos: int) -> Dict[str, str]:
+    """Diccionario de codigos sintetico."""
+    return {f"C{i:05d}": f"Descripcion del codigo {i}" for i in range(num_codigos)}
+
+def build_document(rng: random.Random, num_codigos: int, num_vuelos: int = 40) -> Dict[str, Any]:
+    """Documento con la forma de un .DATA parseado: listas de vuelos con segmentos y codigos."""
+    vuelos: List[Dict[str, Any]] = []
+    for v in range(num_vuelos):
+        vuelos.append({
+            "@id": str(v),
+            "numero": f"OB{rng.randint(100, 999)}",
+            "estado": f"C{rng.randrange(num_codigos):05d}",
+            "aeronave": {"tipo": f"C{rng.randrange(num_codigos):05d}", "matricula": f"CP-{rng.randint(1000, 9999)}"},
+            "segmentos": {"segmento": [
+                {"origen": "VVI", "destino": "LPB", "codigo": f"C{rng.randrange(num_codigos * 2):05d}", "hora": "12:00"}
+                for _ in range(5)
+            ]}
+        })
+    return {"Mensaje": {"Cabecera": {"tipo": "C00001", "version": "1.0"}, "Vuelos": {"Vuelo": vuelos}}}
+
+def build_deep_document(profundidad: int) -> Dict[str, Any]:
+    """Documento anidado a 'profundidad' niveles."""
+    documento: Dict[str, Any] = {"codigo": "C00001"}
+    for _ in range(profundidad):
+        documento = {"nodo": documento, "codigo": "C00002"}
+    return documento
+
+def measure(nombre: str, funcion: Any, documentos: List[Any], repeticiones: int, copiar: bool = False) -> float:
+    """Mejor tiempo (segundos) de 'repeticiones' pasadas sobre todos los documentos."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        entradas = [copy.deepcopy(d) for d in documentos] if copiar else documentos
+        gc.disable()
+        try:
+            inicio = time.perf_counter()
+            for documento in entradas:
+                funcion(documento)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        finally:
+            gc.enable()
+    print(f"{nombre:<40} {mejor * 1000:10.2f} ms")
+    return mejor
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documentos", type=int, default=200)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--codigos", type=int, default=5000)
+    parser.add_argument("--profundidad", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    descriptions = build_descriptions(args.codigos)
+    documentos = [build_document(rng, args.codigos) for _ in range(args.documentos)]
+
+    original = JsonMatcher()
+    compilado = CompiledJsonMatcher(descriptions)
+
+    # --- el resultado (incluido el orden de las claves) debe ser identico ---
+    esperado = json.dumps(original.add_description_json(documentos[0], descriptions))
+    assert json.dumps(compilado.add_description(documentos[0])) == esperado
+    assert json.dumps(compilado.add_description(copy.deepcopy(documentos[0]), in_place=True)) == esperado
+
+    print(f"{args.documentos} documentos, {args.codigos} codigos, mejor de {args.repeticiones}")
+    base = measure("JsonMatcher.add_description_json", lambda d: original.add_description_json(d, descriptions), documentos, args.repeticiones)
+    copia = measure("CompiledJsonMatcher (copia)", compilado.add_description, documentos, args.repeticiones)
+    en_sitio = measure("CompiledJsonMatcher (in_place)", lambda d: compilado.add_description(d, in_place=True), documentos, args.repeticiones, copiar=True)
+    print(f"speedup copia: {base / copia:.2f}x  in_place: {base / en_sitio:.2f}x")
+
+    # --- documentos muy anidados ---
+    profundo = build_deep_document(args.profundidad)
+    try:
+        original.add_description_json(profundo, descriptions)
+        print(f"profundidad {args.profundidad}: JsonMatcher OK")
+    except RecursionError:
+        print(f"profundidad {args.profundidad}: JsonMatcher RecursionError")
+    compilado.add_description(profundo)
+    print(f"profundidad {args.profundidad}: CompiledJsonMatcher OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark del costo por archivo de los logs en MongoLoggingDBHandler, sin conexion a MongoDB
+(el buffer se descarta en lugar de insertarse).
+
+Compara:
+    - 'asctime + strptime': el documento de log anterior, que necesita el formatter y vuelve a
+      parsear 'record.asctime' (cinco logs por archivo).
+    - 'record.created': el documento de log actual (cinco logs por archivo).
+    - 'estructurado': un unico log por archivo con los campos tipados en 'datos' (LOGS_ESTRUCTURADOS).
+
+Uso:
+    python benchmarks/bench_log_handler.py [--archivos N] [--repeticiones R]
+"""
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from log_db_handler import MongoLoggingDBHandler
+
+FORMATO = '%(asctime)s - %(levelname)s - %(module)s - %(message)s'
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+
+class _NullFlushHandler(MongoLoggingDBHandler):
+    """Handler que descarta el buffer en lugar de insertarlo."""
+
+    def flush(self) -> None:
+        self.buffer.clear()
+
+class _LegacyHandler(_NullFlushHandler):
+    """Handler con la construccion del documento anterior (fecha desde 'asctime')."""
+
+    def _build_log_data(self, record: logging.LogRecord) -> Dict[str, Any]:
+        return {
+            "timestamp": datetime.strptime(record.asctime, FORMATO_FECHA),
+            "level": record.levelname,
+            "module": record.module,
+            "message": record.getMessage(),
+            "function": record.funcName,
+            "line": record.lineno
+        }
+
+def build_logger(nombre: str, handler: MongoLoggingDBHandler) -> logging.Logger:
+    """Logger con un handler de texto (que calcula 'asctime', como en 'configuracion_logging') y el handler a medir."""
+    texto = logging.StreamHandler(open(os.devnull, "w"))
+    texto.setFormatter(logging.Formatter(FORMATO, FORMATO_FECHA))
+    logger = logging.getLogger(nombre)
+    logger.handlers = [texto, handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+def log_per_line(logger: logging.Logger, i: int) -> None:
+    """Los cinco logs por archivo de '_iter_data_files'."""
+    fecha = datetime.now()
+    logger.info(f"Procesando archivo 'archivo_{i}.DATA'")
+    logger.info(f"Tamanio: {1000 + i} bytes")
+    logger.info(f"Fecha de creacion: {fecha}")
+    logger.info(f"Fecha de ultima modificacion: {fecha}")
+    logger.info(f"Fecha de ultimo acceso: {fecha}")
+
+def log_structured(logger: logging.Logger, i: int) -> None:
+    """El log unico por archivo de '_log_file' con LOGS_ESTRUCTURADOS."""
+    fecha = datetime.now()
+    logger.info(
+        f"Procesando archivo 'archivo_{i}.DATA' ({1000 + i} bytes)",
+        extra={"datos": {"tar": "bench.tar.gz", "archivo": f"archivo_{i}.DATA", "tamanio": 1000 + i,
+                         "fecha_creacion": fecha, "fecha_modificacion": fecha, "fecha_acceso": fecha}}
+    )
+
+def measure(etiqueta: str, logger: logging.Logger, funcion: Any, archivos: int, repeticiones: int) -> float:
+    """Mejor tiempo (segundos) de 'repeticiones' pasadas registrando 'archivos' archivos."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for i in range(archivos):
+            funcion(logger, i)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"{etiqueta:<28} {mejor * 1000:10.2f} ms  {mejor / archivos * 1e6:8.2f} us/archivo")
+    return mejor
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archivos", type=int, default=5000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    parametros: Dict[str, Any] = dict(mongo_uri="mongodb://localhost:1", db_name="BENCH", collection_logs="LOGS", buffer_size=40)
+    anterior = measure("asctime + strptime", build_logger("bench.anterior", _LegacyHandler(**parametros)), log_per_line, args.archivos, args.repeticiones)
+    actual = measure("record.created", build_logger("bench.actual", _NullFlushHandler(**parametros)), log_per_line, args.archivos, args.repeticiones)
+    estructurado = measure("estructurado", build_logger("bench.estructurado", _NullFlushHandler(**parametros)), log_structured, args.archivos, args.repeticiones)
+    print(f"speedup record.created: {anterior / actual:.2f}x  estructurado: {anterior / estructurado:.2f}x")
+
+if __name__ == "__main__":
+    main()
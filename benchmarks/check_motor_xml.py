@@ -0,0 +1,127 @@
+"""
+Comparacion contra archivo golden del motor XML fusionado ('parse_xml_described') y el motor
+actual ('parse_xml' + 'JsonMatcher.add_description_json'), con tiempos de ambos.
+
+La salida de los dos motores (incluido el orden de las claves) debe ser identica para cada XML.
+La salida del motor actual para los casos borde y los primeros XML sinteticos tambien se compara
+contra el archivo golden ('motor_xml_golden.json' o '--golden'); si el archivo no existe la
+comparacion falla. El golden solo se (re)genera con '--actualizar', despues de revisar los cambios.
+
+Uso:
+    python benchmarks/check_motor_xml.py [--dir CARPETA_CON_DATA] [--golden ARCHIVO.json] [--actualizar] [--repeticiones R]
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import argparse
+import json
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from xml_to_dict import parse_xml, parse_xml_described
+from json_matcher import JsonMatcher, CompiledJsonMatcher
+
+GOLDEN = Path(__file__).resolve().parent / "motor_xml_golden.json"
+NUM_SINTETICOS_GOLDEN = 3
+DESCRIPCIONES = {"LPB": "La Paz", "VVI": "Viru Viru", "CBB": "Cochabamba", "A1": "Activo", "X": "Equis", "1": "Uno"}
+
+# --- casos borde del formato de xmltodict ---
+CASOS = {
+    "hoja": "<a>LPB</a>",
+    "vacio": "<a/>",
+    "atributos": '<a x="1" y="LPB"><b z="A1">VVI</b></a>',
+    "repetidos": "<a><b>LPB</b><b>VVI</b><c>CBB</c></a>",
+    "mixto": "<a>LPB<b>VVI</b> resto <c/>fin</a>",
+    "espacios": "<a>\n  <b>  LPB  </b>\n  <c>\n  </c>\n</a>",
+    "cdata": "<a><![CDATA[LPB]]><b><![CDATA[ <x> ]]></b></a>",
+    "entidades": "<a><b>&lt;LPB&gt;</b><c>&amp;</c><d>&#76;PB</d></a>",
+    "comentarios": "<a><!-- c --><b>LPB</b><?pi x?></a>",
+    "prefijos": '<ns:a xmlns:ns="urn:x"><ns:b>LPB</ns:b><b ns:t="A1"/></ns:a>',
+    "sufijo_existente": "<a><b_description>previo</b_description><b>LPB</b><c>VVI</c><c_description>real</c_description></a>",
+    "texto_y_atributo": '<a><b k="v">LPB</b><b>LPB</b></a>',
+    "unicode": "<a><b>Año ñandú</b><c>A1</c></a>",
+}
+
+def build_flight(rng: random.Random, vuelos: int = 60) -> str:
+    """XML sintetico con la forma de un .DATA de vuelos."""
+    partes = ['<?xml version="1.0" encoding="UTF-8"?>', '<Mensaje version="1"><Cabecera><tipo>A1</tipo></Cabecera><Vuelos>']
+    codigos = list(DESCRIPCIONES) + ["ZZZ", "OTRO"]
+    for v in range(vuelos):
+        partes.append(f'<Vuelo id="{v}"><numero>OB{rng.randint(100, 999)}</numero><estado>{rng.choice(codigos)}</estado>')
+        partes.append(f'<aeronave tipo="{rng.choice(codigos)}">CP-{rng.randint(1000, 9999)}</aeronave><Segmentos>')
+        for _ in range(rng.randint(1, 4)):
+            partes.append(f"<Segmento><origen>{rng.choice(codigos)}</origen><destino>{rng.choice(codigos)}</destino><hora>12:00</hora></Segmento>")
+        partes.append("</Segmentos></Vuelo>")
+    partes.append("</Vuelos></Mensaje>")
+    return "".join(partes)
+
+def load_corpus(directorio: Path) -> List[Tuple[str, str]]:
+    """Casos borde, XML sinteticos y, si se indica, los .DATA de 'directorio' (leidos como lo hace XMLConverter)."""
+    rng = random.Random(7)
+    corpus = list(CASOS.items()) + [(f"sintetico_{i}", build_flight(rng)) for i in range(20)]
+    if directorio:
+        for archivo in sorted(directorio.rglob("*.DATA")):
+            with open(archivo, "r", encoding="utf-8") as archivo_xml:
+                corpus.append((archivo.name, archivo_xml.read()))
+    return corpus
+
+def run_current(contenido: str) -> Any:
+    return JsonMatcher().add_description_json(parse_xml(contenido), DESCRIPCIONES)
+
+def run_fused(contenido: str, matcher: CompiledJsonMatcher) -> Any:
+    return parse_xml_described(contenido, matcher.describe_dict)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, default=None)
+    parser.add_argument("--golden", type=Path, default=GOLDEN)
+    parser.add_argument("--actualizar", action="store_true", help="regenera el golden con la salida actual")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.dir)
+    matcher = CompiledJsonMatcher(DESCRIPCIONES)
+
+    # --- comparacion de salidas ---
+    salidas: Dict[str, str] = {}
+    diferencias = []
+    for nombre, contenido in corpus:
+        actual = json.dumps(run_current(contenido), ensure_ascii=False)
+        fusionado = json.dumps(run_fused(contenido, matcher), ensure_ascii=False)
+        if nombre in CASOS or nombre in [f"sintetico_{i}" for i in range(NUM_SINTETICOS_GOLDEN)]:
+            salidas[nombre] = actual
+        if actual != fusionado:
+            diferencias.append(nombre)
+            print(f"DIFERENTE '{nombre}':\n  actual:    {actual}\n  fusionado: {fusionado}")
+
+    if args.actualizar:
+        args.golden.write_text(json.dumps(salidas, ensure_ascii=False, indent=0), encoding="utf-8")
+        print(f"Golden guardado en '{args.golden}'.")
+    elif not args.golden.exists():
+        diferencias.append("golden")
+        print(f"ERROR: no existe el golden '{args.golden}'; generarlo con '--actualizar'.")
+    else:
+        golden = json.loads(args.golden.read_text(encoding="utf-8"))
+        for nombre, esperado in golden.items():
+            if nombre in salidas and salidas[nombre] != esperado:
+                diferencias.append(f"golden:{nombre}")
+                print(f"DIFERENTE del golden '{nombre}'")
+
+    print(f"{len(corpus)} XML comparados, {len(diferencias)} diferencias.")
+
+    # --- tiempos ---
+    for etiqueta, funcion in (("parse_xml + JsonMatcher", run_current), ("parse_xml_described", lambda c: run_fused(c, matcher))):
+        mejor = float("inf")
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            for _, contenido in corpus:
+                funcion(contenido)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        print(f"{etiqueta:<28} {mejor * 1000:10.2f} ms")
+
+    sys.exit(1 if diferencias else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Comparacion del parseo por bloques ('XMLConverter.iter_xml_chunks') contra 'parse_xml'.
+
+Para cada XML (casos borde de 'check_motor_xml.py', casos propios de los niveles superiores y XML
+sinteticos de vuelos) y cada combinacion de '--profundidades' y '--tamanios' se unen los bloques
+continuando en cada uno la ruta abierta del anterior (el primer elemento de cada nivel superior del
+bloque es la continuacion del ultimo del bloque anterior) y el resultado debe ser igual al de
+'parse_xml'. El XML se parsea desde bytes y desde un archivo con partes de '--parte' bytes.
+
+Uso:
+    python benchmarks/check_xml_chunks.py [--dir CARPETA_CON_DATA] [--profundidades 1,2,3,4] [--tamanios 1,2,3,1000] [--parte BYTES]
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+import argparse
+import copy
+import json
+import random
+import sys
+import tempfile
+
+DIR_BENCH = Path(__file__).resolve().parent
+sys.path.insert(0, str(DIR_BENCH.parent))
+sys.path.insert(0, str(DIR_BENCH))
+
+import xml_to_dict
+from xml_to_dict import XMLConverter, parse_xml
+from check_motor_xml import CASOS, build_flight
+
+# --- casos del texto y de los elementos por encima de 'item_depth' ---
+CASOS_BLOQUES = {
+    "revision": '<M v="1"><H>hdr</H><V id="1"><n>OB1</n></V><V id="2">texto</V><V>plain</V>tail</M>',
+    "texto_raiz_antes": "<M>  cabecera <V>a</V><V>b</V>  pie  </M>",
+    "grupos": '<M><G k="1"><V>a</V><V>b</V><V>c</V>g1</G><H/><G k="2"><V>d</V></G><G/>fin</M>',
+    "niveles": '<M a="x"><A><B><C>1</C><C i="2">2</C></B><B/><B t="y">solo</B></A><A>texto</A></M>',
+    "raiz_vacia": '<M r="1"/>',
+    "raiz_texto": "<M>solo texto</M>",
+}
+
+def merge_chunks(bloques: Iterable[Any], item_depth: int) -> Dict[str, Any]:
+    """Une los bloques de 'iter_xml_chunks' en un solo diccionario."""
+    resultado: Dict[str, Any] = {}
+    for numero, bloque in enumerate(bloques):
+        _merge(resultado, copy.deepcopy(bloque), 1, item_depth, numero > 0)
+    return resultado
+
+def _as_list(valor: Any) -> List[Any]:
+    return valor if isinstance(valor, list) else [valor]
+
+def _merge(destino: Dict[str, Any], origen: Dict[str, Any], profundidad: int, item_depth: int, continua: bool) -> None:
+    """Agrega 'origen' a 'destino' (nodos cuyos hijos estan a 'profundidad')."""
+    continuacion = next((clave for clave in origen if not clave.startswith("@")), None) if continua and profundidad < item_depth else None
+    for clave, valor in origen.items():
+        if clave not in destino:
+            destino[clave] = valor
+        elif clave.startswith("@"):
+            continue
+        elif clave == continuacion:
+            previos, nuevos = _as_list(destino[clave]), _as_list(valor)
+            _merge(previos[-1], nuevos[0], profundidad + 1, item_depth, True)
+            previos.extend(nuevos[1:])
+            destino[clave] = previos if len(previos) > 1 else previos[0]
+        else:
+            destino[clave] = _as_list(destino[clave]) + _as_list(valor)
+
+def load_corpus(directorio: Path) -> List[Tuple[str, bytes]]:
+    """Casos borde, XML sinteticos y, si se indica, los .DATA de 'directorio'."""
+    rng = random.Random(11)
+    casos = {**CASOS, **CASOS_BLOQUES}
+    corpus = [(nombre, contenido.encode("utf-8")) for nombre, contenido in casos.items()]
+    corpus += [(f"sintetico_{i}", build_flight(rng, rng.randint(1, 30)).encode("utf-8")) for i in range(10)]
+    if directorio:
+        corpus += [(archivo.name, archivo.read_bytes()) for archivo in sorted(directorio.rglob("*.DATA"))]
+    return corpus
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, default=None)
+    parser.add_argument("--profundidades", default="1,2,3,4")
+    parser.add_argument("--tamanios", default="1,2,3,1000")
+    parser.add_argument("--parte", type=int, default=7)
+    args = parser.parse_args()
+
+    # partes pequenias para que los textos y etiquetas queden cortados entre llamadas a expat
+    xml_to_dict.TAMANIO_PARTE_XML = args.parte
+    convertidor = XMLConverter()
+    corpus = load_corpus(args.dir)
+    diferencias = 0
+    comparaciones = 0
+    with tempfile.TemporaryDirectory(prefix="check_xml_chunks_") as temporal:
+        for nombre, contenido in corpus:
+            archivo = Path(temporal) / f"{nombre}.xml"
+            archivo.write_bytes(contenido)
+            esperado = parse_xml(contenido)
+            for item_depth in (int(valor) for valor in args.profundidades.split(",")):
+                for chunk_size in (int(valor) for valor in args.tamanios.split(",")):
+                    for origen in (contenido, archivo):
+                        respuestas = list(convertidor.iter_xml_chunks(nombre, origen, item_depth, chunk_size))
+                        comparaciones += 1
+                        fallidas = [respuesta.message for respuesta in respuestas if not respuesta.success]
+                        unido = merge_chunks((respuesta.data for respuesta in respuestas), item_depth) if not fallidas else None
+                        if unido != esperado:
+                            diferencias += 1
+                            print(
+                                f"DIFERENTE '{nombre}' (item_depth={item_depth}, chunk_size={chunk_size}, {type(origen).__name__}):\n"
+                                f"  parse_xml: {json.dumps(esperado, ensure_ascii=False)}\n"
+                                f"  bloques:   {fallidas or json.dumps(unido, ensure_ascii=False)}"
+                            )
+
+    print(f"{len(corpus)} XML, {comparaciones} comparaciones, {diferencias} diferencias.")
+    sys.exit(1 if diferencias else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Generador de un corpus sintetico con la forma de los datos reales: archivos TAR.GZ con .DATA
+originales (.1.) y complementos (.P.) a fusionar, .DATA sueltos y un .manifest por TAR, mas los
+archivos de codigos de COMPLEMENTOS (.json, .csv y .txt) que usan esos .DATA.
+
+El corpus es determinista para una misma semilla y los mismos parametros.
+
+Uso:
+    python benchmarks/corpus.py DESTINO [--archivos N] [--tars T] [--vuelos V] [--profundidad P] [--codigos C]
+"""
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import csv
+import io
+import json
+import random
+import tarfile
+
+FRACCION_PARES = 0.3
+FECHA_MIEMBROS = 1700000000
+
+def build_codes(num_codigos: int) -> Dict[str, Dict[str, str]]:
+    """Codigos y descripciones repartidos en los tres formatos de COMPLEMENTOS."""
+    return {
+        "aeropuertos.json": {f"A{i:04d}": f"Aeropuerto {i}" for i in range(num_codigos)},
+        "estados.csv": {f"E{i:03d}": f"Estado {i}" for i in range(max(1, num_codigos // 10))},
+        "aeronaves.txt": {f"T{i:03d}": f"Tipo de aeronave {i}" for i in range(max(1, num_codigos // 10))},
+    }
+
+def write_codes(directorio: Path, codigos: Dict[str, Dict[str, str]]) -> None:
+    """Escribe los archivos de codigos en 'directorio'."""
+    directorio.mkdir(parents=True, exist_ok=True)
+    for nombre, valores in codigos.items():
+        archivo = directorio / nombre
+        if archivo.suffix == ".json":
+            archivo.write_text(json.dumps(valores, ensure_ascii=False), encoding="utf-8")
+        elif archivo.suffix == ".csv":
+            with open(archivo, "w", encoding="utf-8", newline="") as archivo_csv:
+                escritor = csv.writer(archivo_csv)
+                escritor.writerow(["codigo", "descripcion"])
+                escritor.writerows(valores.items())
+        else:
+            archivo.write_text("".join(f"{codigo}={descripcion}\n" for codigo, descripcion in valores.items()), encoding="utf-8")
+
+def build_data(rng: random.Random, codigos: Dict[str, List[str]], vuelos: int, profundidad: int, complemento: bool = False) -> str:
+    """XML de un .DATA de vuelos; 'profundidad' agrega niveles de anidamiento a cada vuelo."""
+    partes = ['<?xml version="1.0" encoding="UTF-8"?>', f'<Mensaje version="1"><Cabecera><tipo>{rng.choice(codigos["estados"])}</tipo></Cabecera><Vuelos>']
+    for v in range(vuelos):
+        partes.append(f'<Vuelo id="{v}"><numero>OB{rng.randint(100, 999)}</numero>')
+        if complemento:
+            partes.append(f'<estado>{rng.choice(codigos["estados"])}</estado><observacion>complemento</observacion>')
+        else:
+            partes.append(f'<estado>{rng.choice(codigos["estados"])}</estado>')
+            partes.append(f'<aeronave tipo="{rng.choice(codigos["aeronaves"])}">CP-{rng.randint(1000, 9999)}</aeronave>')
+        partes.append("<Detalle>" * profundidad)
+        partes.append("<Segmentos>")
+        for _ in range(rng.randint(1, 4)):
+            partes.append(
+                f'<Segmento><origen>{rng.choice(codigos["aeropuertos"])}</origen><destino>{rng.choice(codigos["aeropuertos"])}</destino>'
+                f"<hora>{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}</hora><otro>X{rng.randint(0, 99)}</otro></Segmento>"
+            )
+        partes.append("</Segmentos>")
+        partes.append("</Detalle>" * profundidad)
+        partes.append("</Vuelo>")
+    partes.append("</Vuelos></Mensaje>")
+    return "".join(partes)
+
+def _add_member(archivo_tar: tarfile.TarFile, nombre: str, contenido: str) -> int:
+    datos = contenido.encode("utf-8")
+    info = tarfile.TarInfo(nombre)
+    info.size = len(datos)
+    info.mtime = FECHA_MIEMBROS
+    archivo_tar.addfile(info, io.BytesIO(datos))
+    return len(datos)
+
+def generate_corpus(destino: Path,
+                    num_archivos: int,
+                    num_tars: int = 1,
+                    vuelos: int = 5,
+                    profundidad: int = 0,
+                    num_codigos: int = 2000,
+                    semilla: int = 42
+                    ) -> Dict[str, int]:
+    """
+    Genera el corpus en 'destino/COMPRIMIDOS' y 'destino/COMPLEMENTOS'.
+
+    Parameters:
+        destino (Path): Carpeta del corpus.
+        num_archivos (int): Numero total de .DATA (cada par original/complemento cuenta como dos).
+        num_tars (int): Numero de archivos TAR.GZ entre los que se reparten los .DATA.
+        vuelos (int): Vuelos por .DATA (tamanio de cada documento).
+        profundidad (int): Niveles de anidamiento extra dentro de cada vuelo.
+        num_codigos (int): Numero de codigos de aeropuerto (los de estado y aeronave son la decima parte).
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        Dict[str, int]: Numero de TAR, .DATA, pares a fusionar y bytes sin comprimir generados.
+    """
+    rng = random.Random(semilla)
+    codigos = build_codes(num_codigos)
+    write_codes(destino / "COMPLEMENTOS", codigos)
+    listas = {Path(nombre).stem: list(valores) + ["SIN_CODIGO"] for nombre, valores in codigos.items()}
+
+    dir_comprimidos = destino / "COMPRIMIDOS"
+    dir_comprimidos.mkdir(parents=True, exist_ok=True)
+    resumen = {"tars": num_tars, "archivos": 0, "pares": 0, "bytes": 0}
+    por_tar = [num_archivos // num_tars + (1 if i < num_archivos % num_tars else 0) for i in range(num_tars)]
+    for t, cantidad in enumerate(por_tar):
+        with tarfile.open(dir_comprimidos / f"lote_{t:04d}.tar.gz", "w:gz", compresslevel=6) as archivo_tar:
+            i = 0
+            while i < cantidad:
+                base = f"./VUELOS_{t:04d}_{i:06d}"
+                if i + 1 < cantidad and rng.random() < FRACCION_PARES:
+                    resumen["bytes"] += _add_member(archivo_tar, f"{base}.1.X.DATA", build_data(rng, listas, vuelos, profundidad))
+                    resumen["bytes"] += _add_member(archivo_tar, f"{base}.P.X.DATA", build_data(rng, listas, vuelos, profundidad, complemento=True))
+                    resumen["pares"] += 1
+                    i += 2
+                else:
+                    resumen["bytes"] += _add_member(archivo_tar, f"{base}.1.X.DATA", build_data(rng, listas, vuelos, profundidad))
+                    i += 1
+            resumen["archivos"] += cantidad
+            _add_member(archivo_tar, f"./lote_{t:04d}.manifest", f"lote {t} archivos {cantidad} generado sinteticamente")
+    return resumen
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("destino", type=Path)
+    parser.add_argument("--archivos", type=int, default=1000)
+    parser.add_argument("--tars", type=int, default=1)
+    parser.add_argument("--vuelos", type=int, default=5)
+    parser.add_argument("--profundidad", type=int, default=0)
+    parser.add_argument("--codigos", type=int, default=2000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    resumen = generate_corpus(args.destino, args.archivos, args.tars, args.vuelos, args.profundidad, args.codigos, args.semilla)
+    print(f"Corpus generado en '{args.destino}': {resumen}")
+
+if __name__ == "__main__":
+    main()
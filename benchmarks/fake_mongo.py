@@ -0,0 +1,148 @@
+"""
+Cliente de MongoDB en memoria para los benchmarks, con las operaciones que usa 'MongoDBHandler'
+('insert_many', 'insert_one', 'find', 'find_one', 'create_index', 'admin.command("ping")').
+
+Cada documento se codifica a BSON al insertarse (como lo hace pymongo antes de enviarlo), pero solo
+se guardan '_id' y los campos consultados, para que un corpus de 100k archivos quepa en memoria.
+Opcionalmente se agrega una latencia fija por llamada para simular la red.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set
+from types import SimpleNamespace
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+import bson
+import time
+
+CAMPOS_GUARDADOS = ("_id", "nombre", "hash", "nombre_archivo", "parte", "tar", "miembro")
+
+class FakeCollection:
+    """Coleccion en memoria con indices unicos y consultas por igualdad o '$in' sobre un campo."""
+
+    def __init__(self, name: str, latencia: float = 0.0) -> None:
+        self.name = name
+        self.latencia = latencia
+        self.bytes_insertados = 0
+        self._documentos: List[Dict[str, Any]] = []
+        self._unicos: Dict[str, Set[Any]] = {"_id": set()}
+
+    def create_index(self, campo: str, unique: bool = False, **kwargs: Any) -> str:
+        if unique and campo not in self._unicos:
+            self._unicos[campo] = {documento[campo] for documento in self._documentos if campo in documento}
+        return kwargs.get("name", campo)
+
+    def _insert(self, documento: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Inserta un documento; devuelve el error de clave duplicada, si lo hay."""
+        documento.setdefault("_id", ObjectId())
+        for campo, valores in self._unicos.items():
+            if campo in documento and documento[campo] in valores:
+                return {
+                    "code": 11000,
+                    "errmsg": f"E11000 duplicate key error collection: {self.name} index: {campo}",
+                    "keyPattern": {campo: 1},
+                    "keyValue": {campo: documento[campo]}
+                }
+        self.bytes_insertados += len(bson.encode(documento))
+        for campo, valores in self._unicos.items():
+            if campo in documento:
+                valores.add(documento[campo])
+        self._documentos.append({campo: documento[campo] for campo in CAMPOS_GUARDADOS if campo in documento})
+        return None
+
+    def insert_many(self, documentos: Iterable[Dict[str, Any]], ordered: bool = True) -> Any:
+        if self.latencia:
+            time.sleep(self.latencia)
+        insertados, errores = [], []
+        for indice, documento in enumerate(documentos):
+            error = self._insert(documento)
+            if error is None:
+                insertados.append(documento["_id"])
+                continue
+            errores.append(dict(error, index=indice))
+            if ordered:
+                break
+        if errores:
+            raise BulkWriteError({"writeErrors": errores, "nInserted": len(insertados)})
+        return SimpleNamespace(inserted_ids=insertados)
+
+    def insert_one(self, documento: Dict[str, Any]) -> Any:
+        if self.latencia:
+            time.sleep(self.latencia)
+        error = self._insert(documento)
+        if error is not None:
+            raise DuplicateKeyError(error["errmsg"], 11000, error)
+        return SimpleNamespace(inserted_id=documento["_id"])
+
+    @staticmethod
+    def _prepare(filtro: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convierte las condiciones '$in' en conjuntos."""
+        return {
+            campo: set(condicion["$in"]) if isinstance(condicion, dict) and "$in" in condicion else condicion
+            for campo, condicion in (filtro or {}).items()
+        }
+
+    @staticmethod
+    def _matches(documento: Dict[str, Any], filtro: Dict[str, Any]) -> bool:
+        for campo, condicion in filtro.items():
+            if isinstance(condicion, set):
+                if documento.get(campo) not in condicion:
+                    return False
+            elif documento.get(campo) != condicion:
+                return False
+        return True
+
+    def find(self, filtro: Optional[Dict[str, Any]] = None, proyeccion: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        filtro = self._prepare(filtro)
+        resultado = []
+        for documento in self._documentos:
+            if self._matches(documento, filtro):
+                if proyeccion:
+                    documento = {campo: valor for campo, valor in documento.items() if proyeccion.get(campo, 0)}
+                resultado.append(documento)
+        return resultado
+
+    def find_one(self, filtro: Optional[Dict[str, Any]] = None, proyeccion: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        encontrados = self.find(filtro, proyeccion)
+        return encontrados[0] if encontrados else None
+
+    def delete_many(self, filtro: Dict[str, Any]) -> Any:
+        restantes = [documento for documento in self._documentos if not self._matches(documento, self._prepare(filtro))]
+        borrados = len(self._documentos) - len(restantes)
+        self._documentos = restantes
+        for campo, valores in self._unicos.items():
+            valores.intersection_update(documento[campo] for documento in restantes if campo in documento)
+        return SimpleNamespace(deleted_count=borrados)
+
+    def count_documents(self, filtro: Dict[str, Any]) -> int:
+        return len(self.find(filtro))
+
+class FakeDatabase:
+    """Base de datos en memoria."""
+
+    def __init__(self, latencia: float = 0.0) -> None:
+        self.latencia = latencia
+        self._colecciones: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, nombre: str) -> FakeCollection:
+        if nombre not in self._colecciones:
+            self._colecciones[nombre] = FakeCollection(nombre, self.latencia)
+        return self._colecciones[nombre]
+
+class FakeMongoClient:
+    """
+    Cliente en memoria con la misma firma que 'MongoClient'. 'FakeMongoClient.latencia' (segundos)
+    se aplica a cada insercion de los clientes creados despues de asignarla.
+    """
+
+    latencia = 0.0
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self._bases: Dict[str, FakeDatabase] = {}
+        self.admin = SimpleNamespace(command=lambda *a, **k: {"ok": 1.0})
+
+    def __getitem__(self, nombre: str) -> FakeDatabase:
+        if nombre not in self._bases:
+            self._bases[nombre] = FakeDatabase(self.latencia)
+        return self._bases[nombre]
+
+    def close(self) -> None:
+        pass
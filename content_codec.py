@@ -0,0 +1,79 @@
+from typing import Any, Dict
+from bson import Binary
+import bson
+import lzma
+import zlib
+
+CODEC_ZLIB = "zlib"
+CODEC_LZMA = "lzma"
+CODECS = (CODEC_ZLIB, CODEC_LZMA)
+CAMPO_CODEC = "contenido_codec"
+CAMPO_TAMANIO = "contenido_bytes"
+
+def encode_content(contenido: Any, codec: str, nivel: int = -1) -> Dict[str, Any]:
+    """
+    Codifica 'contenido' a BSON y lo comprime con 'codec'. El BSON conserva los tipos del
+    diccionario (fechas, enteros...), por lo que 'decode_content' devuelve el mismo valor.
+
+    Parameters:
+        contenido (Any): Diccionario enriquecido del archivo .DATA.
+        codec (str): 'zlib' o 'lzma'.
+        nivel (int): Nivel de compresion de zlib (0-9) o preset de lzma (0-9); -1 = el del codec.
+
+    Returns:
+        Dict[str, Any]: Campos a guardar en el documento: 'contenido' (binario comprimido),
+        'contenido_codec' y 'contenido_bytes' (tamanio del BSON sin comprimir).
+
+    Raises:
+        ValueError: Si el codec no es valido.
+    """
+    datos = bson.encode({"contenido": contenido})
+    if codec == CODEC_ZLIB:
+        comprimido = zlib.compress(datos, nivel)
+    elif codec == CODEC_LZMA:
+        comprimido = lzma.compress(datos, preset=None if nivel < 0 else nivel)
+    else:
+        raise ValueError(f"Codec de compresion no valido: '{codec}'.")
+    return {"contenido": Binary(comprimido), CAMPO_CODEC: codec, CAMPO_TAMANIO: len(datos)}
+
+def decode_content(documento: Dict[str, Any]) -> Any:
+    """
+    Devuelve el 'contenido' de un documento de JSON_PROCESADOS, descomprimiendolo si se guardo comprimido.
+
+    Parameters:
+        documento (Dict[str, Any]): Documento leido de MongoDB.
+
+    Returns:
+        Any: El diccionario enriquecido del archivo .DATA.
+
+    Raises:
+        ValueError: Si el codec del documento no es valido.
+    """
+    codec = documento.get(CAMPO_CODEC)
+    if codec is None:
+        return documento.get("contenido")
+    if codec == CODEC_ZLIB:
+        datos = zlib.decompress(documento["contenido"])
+    elif codec == CODEC_LZMA:
+        datos = lzma.decompress(documento["contenido"])
+    else:
+        raise ValueError(f"Codec de compresion no valido: '{codec}'.")
+    return bson.decode(datos)["contenido"]
+
+def decode_document(documento: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Devuelve el documento con 'contenido' descomprimido y sin los campos de la compresion
+    (los documentos guardados sin comprimir se devuelven sin cambios).
+
+    Parameters:
+        documento (Dict[str, Any]): Documento leido de MongoDB.
+
+    Returns:
+        Dict[str, Any]: Documento con la misma forma que el formato sin comprimir.
+    """
+    if CAMPO_CODEC not in documento:
+        return documento
+    decodificado = {campo: valor for campo, valor in documento.items() if campo not in (CAMPO_CODEC, CAMPO_TAMANIO)}
+    if "contenido" in documento:
+        decodificado["contenido"] = decode_content(documento)
+    return decodificado
@@ -1,14 +1,49 @@
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+from dataclasses import dataclass
+from typing import IO, Any, Iterator, Optional, Tuple, cast
 from standard_response import StandardResponse
+import gzip
+import hashlib
 import tarfile
 import logging
 
+EXTENSIONES_STREAMING = (".DATA", ".manifest")
+ALGORITMO_HASH = "sha256"
+TAMANIO_BLOQUE_HASH = 1024 * 1024
+
+@dataclass
+class TarMember:
+    """
+    Miembro de un archivo TAR leido en modo streaming.
+
+    Attributes:
+        nombre (str): Nombre del archivo dentro del TAR (sin directorios).
+        contenido (bytes): Contenido del archivo.
+        tarinfo (tarfile.TarInfo): Cabecera del miembro dentro del TAR.
+        hash (str): Hash del contenido, calculado al leerlo del TAR.
+    """
+    nombre: str
+    contenido: bytes
+    tarinfo: tarfile.TarInfo
+    hash: str = ""
+
+    @property
+    def suffix(self) -> str:
+        """Extension del miembro, equivalente a 'Path.suffix'."""
+        return PurePosixPath(self.nombre).suffix
+
+    @property
+    def stem(self) -> str:
+        """Nombre del miembro sin extension, equivalente a 'Path.stem'."""
+        return PurePosixPath(self.nombre).stem
+
 class TarDecompressor:
     """
     Clase para descomprimir un archivo TAR en un directorio especifico.
 
     Attributes:
         directorio_destino (Path): Directorio para almacenar el contenido del archivo TAR.
+        hash_tar (Optional[str]): Hash del ultimo TAR recorrido con 'iter_tar_gz_members' (None hasta terminar de leerlo).
     """
 
     def __init__(self, directorio_destino: Path) -> None:
@@ -19,16 +54,19 @@ class TarDecompressor:
             directorio_destino (Path): Directorio para almacenar el contenido del archivo TAR.
         """
         self.directorio_destino = directorio_destino
+        self.hash_tar: Optional[str] = None
 
     def decompress_tar_gz(self, archivo_tar_gz: Path) -> StandardResponse:
         """
-        Descomprime un archivo TAR en un directorio especifico.
+        Descomprime un archivo TAR en un directorio especifico. El TAR se lee una sola vez, en modo
+        streaming, y mientras se extrae se calcula el hash de su contenido descomprimido.
 
         Parameters:
             archivo_tar_gz (Path): Archivo TAR para descomprimir.
 
         Returns:
             StandardResponse: Clase estandar para encapsular respuestas de funciones.
+            En 'data' se devuelve {"hash": hash del TAR descomprimido}.
 
         Raises:
             FileNotFoundError: Si el archivo no existe.
@@ -51,11 +89,15 @@ class TarDecompressor:
             directorio_descompresion = Path(self.directorio_destino / archivo_tar_gz.name)
             directorio_descompresion.mkdir(parents=True, exist_ok=True)
 
-            with tarfile.open(archivo_tar_gz, "r:gz") as archivo_tar:
-                archivo_tar.extractall(path=directorio_descompresion)
+            with _HashingReader(gzip.open(archivo_tar_gz, "rb")) as lector:
+                with tarfile.open(fileobj=cast(IO[bytes], lector), mode="r|") as archivo_tar:
+                    for tarinfo in archivo_tar:
+                        archivo_tar.extract(tarinfo, path=directorio_descompresion)
+                tar_hash = lector.hexdigest()
 
             return StandardResponse(
                 success=True,
+                data={"hash": tar_hash},
                 message=f"El archivo '{archivo_tar_gz.name}' se descomprimio correctamente en {directorio_descompresion}"
             )
         except (FileNotFoundError, tarfile.TarError, Exception) as e:
@@ -64,3 +106,85 @@ class TarDecompressor:
                 message=f"Error al descomprimir '{archivo_tar_gz.name}'.",
                 error_details=str(e)
             )
+
+    def iter_tar_gz_members(self,
+                            archivo_tar_gz: Path,
+                            extensiones: Tuple[str, ...] = EXTENSIONES_STREAMING,
+                            hash_miembros: bool = True
+                            ) -> Iterator[TarMember]:
+        """
+        Recorre los miembros de un archivo TAR.GZ en modo streaming, sin extraerlos a disco.
+
+        Solo se consideran los archivos del primer nivel del TAR (igual que el 'glob' sobre
+        la carpeta descomprimida) cuyo nombre termina en alguna de las extensiones indicadas.
+        En la misma lectura se calcula el hash del TAR descomprimido (el mismo que 'decompress_tar_gz'),
+        disponible en 'hash_tar' al terminar de recorrerlo.
+
+        Parameters:
+            archivo_tar_gz (Path): Archivo TAR para recorrer.
+            extensiones (Tuple[str, ...]): Extensiones de los miembros a leer.
+            hash_miembros (bool): Si se calcula el hash del contenido de cada miembro ('TarMember.hash').
+
+        Returns:
+            Iterator[TarMember]: Miembros del TAR con su contenido en memoria.
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+            TarError: Si el archivo no es un archivo TAR valido.
+        """
+        self.hash_tar = None
+        with _HashingReader(gzip.open(archivo_tar_gz, "rb")) as lector:
+            with tarfile.open(fileobj=cast(IO[bytes], lector), mode="r|") as archivo_tar:
+                for tarinfo in archivo_tar:
+                    nombre = _member_name(tarinfo, extensiones)
+                    if nombre is None:
+                        continue
+
+                    contenido_miembro = archivo_tar.extractfile(tarinfo)
+                    if contenido_miembro is None:
+                        continue
+
+                    contenido = contenido_miembro.read()
+                    yield TarMember(
+                        nombre=nombre,
+                        contenido=contenido,
+                        tarinfo=tarinfo,
+                        hash=hashlib.new(ALGORITMO_HASH, contenido).hexdigest() if hash_miembros else ""
+                    )
+            self.hash_tar = lector.hexdigest()
+
+class _HashingReader:
+    """
+    Envoltorio de lectura que calcula el hash de los bytes leidos. 'tarfile' en modo streaming
+    lee el archivo de principio a fin, por lo que el hash se obtiene sin una lectura adicional.
+    """
+
+    def __init__(self, archivo: Any) -> None:
+        self._archivo = archivo
+        self._hash = hashlib.new(ALGORITMO_HASH)
+
+    def read(self, tamanio: int = -1) -> bytes:
+        bloque = self._archivo.read(tamanio)
+        self._hash.update(bloque)
+        return bloque
+
+    def hexdigest(self) -> str:
+        """Hash de todo el archivo: lee lo que 'tarfile' no consumio (relleno despues del fin del TAR)."""
+        while self.read(TAMANIO_BLOQUE_HASH):
+            pass
+        return self._hash.hexdigest()
+
+    def __enter__(self) -> "_HashingReader":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self._archivo.close()
+
+def _member_name(tarinfo: tarfile.TarInfo, extensiones: Tuple[str, ...]) -> Optional[str]:
+    """Nombre de un archivo del primer nivel del TAR con alguna de las extensiones (None para los demas miembros)."""
+    if not tarinfo.isfile():
+        return None
+    partes = [parte for parte in PurePosixPath(tarinfo.name).parts if parte != "."]
+    if len(partes) != 1 or not partes[0].endswith(extensiones):
+        return None
+    return partes[0]
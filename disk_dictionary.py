@@ -0,0 +1,232 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+from collections.abc import Mapping
+from standard_response import StandardResponse
+from file_reader import FileProcessor, FORMATOS_SOPORTADOS
+import sqlite3
+import threading
+import time
+
+TAMANIO_LOTE_INSERCION = 10000
+CONTADORES = ("consultas", "aciertos_cache", "encontrados_disco", "no_encontrados_disco")
+_NO_EXISTE = object()
+_SIN_CACHE = object()
+
+class DiskCodeDictionary(Mapping):
+    """
+    Clase para consultar los codigos y descripciones desde un indice sqlite en disco, con una cache
+    LRU acotada delante, de modo que la memoria no crece con el numero de codigos.
+
+    Se comporta como un diccionario de solo lectura ('in', '[]', 'get', 'len'), por lo que
+    'JsonMatcher' y sus variantes lo aceptan como 'descriptions'. Tambien guarda en cache las
+    consultas sin resultado, que son la mayoria al recorrer un documento. Al enviarse a otro proceso
+    solo viaja la ruta del indice; cada proceso abre su propia conexion y tiene su propia cache.
+
+    Attributes:
+        archivo_indice (Path): Archivo sqlite con los codigos.
+        tamanio_cache (int): Numero maximo de consultas guardadas en la cache LRU.
+        consultas (int): Consultas realizadas.
+        aciertos_cache (int): Consultas resueltas por la cache LRU.
+        encontrados_disco (int): Consultas resueltas en disco con resultado.
+        no_encontrados_disco (int): Consultas resueltas en disco sin resultado.
+    """
+
+    def __init__(self, archivo_indice: Path, tamanio_cache: int = 100000) -> None:
+        """
+        Constructor para la clase DiskCodeDictionary.
+
+        Parameters:
+            archivo_indice (Path): Archivo sqlite con los codigos (creado con 'build').
+            tamanio_cache (int): Numero maximo de consultas guardadas en la cache LRU.
+        """
+        self.archivo_indice = archivo_indice
+        self.tamanio_cache = max(1, tamanio_cache)
+        self.consultas = 0
+        self.aciertos_cache = 0
+        self.encontrados_disco = 0
+        self.no_encontrados_disco = 0
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._bloqueo = threading.Lock()
+        self._conexion = sqlite3.connect(f"file:{archivo_indice}?mode=ro", uri=True, check_same_thread=False)
+
+    @classmethod
+    def build(cls, archivo_indice: Path, file_list: List[Path], tamanio_cache: int = 100000) -> StandardResponse:
+        """
+        Crea (o reutiliza, si los archivos no cambiaron) el indice sqlite a partir de los archivos
+        de codigos, cargando un archivo a la vez. Como en 'merge_dictionaries', si un codigo se repite
+        gana el ultimo archivo.
+
+        Parameters:
+            archivo_indice (Path): Archivo sqlite a crear.
+            file_list (List[Path]): Lista de archivos complementarios.
+            tamanio_cache (int): Numero maximo de consultas guardadas en la cache LRU.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones (el diccionario en 'data').
+        """
+        inicio = time.perf_counter()
+        file_processor = FileProcessor()
+        archivos = [
+            archivo for archivo in file_list
+            if isinstance(archivo, Path) and archivo.suffix.lower() in FORMATOS_SOPORTADOS and not file_processor.is_rules_file(archivo)
+        ]
+        clave = repr([(archivo.name, archivo.stat().st_size, archivo.stat().st_mtime_ns) for archivo in archivos])
+
+        try:
+            archivo_indice.parent.mkdir(parents=True, exist_ok=True)
+            if cls._read_key(archivo_indice) == clave:
+                return StandardResponse(
+                    success=True,
+                    data=cls(archivo_indice, tamanio_cache),
+                    message=f"Indice de codigos en disco sin cambios: '{archivo_indice.name}' ({time.perf_counter() - inicio:.2f}s)."
+                )
+
+            temporal = archivo_indice.with_name(f"{archivo_indice.name}.tmp")
+            temporal.unlink(missing_ok=True)
+            errores: List[str] = []
+            conexion = sqlite3.connect(temporal)
+            try:
+                conexion.execute("PRAGMA journal_mode = OFF")
+                conexion.execute("PRAGMA synchronous = OFF")
+                conexion.execute("CREATE TABLE codigos (codigo TEXT PRIMARY KEY, descripcion) WITHOUT ROWID")
+                conexion.execute("CREATE TABLE meta (clave TEXT)")
+                for archivo in archivos:
+                    contenido = file_processor._load_file_content(archivo)
+                    if not contenido.success or contenido.data is None:
+                        errores.append(f"'{archivo.name}': {contenido.error_details or contenido.message}")
+                        continue
+                    filas = list(contenido.data.items())
+                    for i in range(0, len(filas), TAMANIO_LOTE_INSERCION):
+                        conexion.executemany("INSERT OR REPLACE INTO codigos VALUES (?, ?)", filas[i:i + TAMANIO_LOTE_INSERCION])
+                conexion.execute("INSERT INTO meta VALUES (?)", (clave if not errores else "",))
+                conexion.commit()
+            finally:
+                conexion.close()
+            temporal.replace(archivo_indice)
+
+            return StandardResponse(
+                success=True,
+                data=cls(archivo_indice, tamanio_cache),
+                message=f"Indice de codigos en disco creado: '{archivo_indice.name}' con {len(archivos)} archivos ({time.perf_counter() - inicio:.2f}s).",
+                error_details="; ".join(errores) or None
+            )
+        except (OSError, sqlite3.Error) as e:
+            return StandardResponse(
+                success=False,
+                message=f"Error al crear el indice de codigos en disco '{archivo_indice}'.",
+                error_details=str(e)
+            )
+
+    @staticmethod
+    def _read_key(archivo_indice: Path) -> Optional[str]:
+        """Lee la clave (archivos, tamanios y fechas) con la que se creo el indice, si existe."""
+        if not archivo_indice.exists():
+            return None
+        try:
+            conexion = sqlite3.connect(f"file:{archivo_indice}?mode=ro", uri=True)
+            try:
+                fila = conexion.execute("SELECT clave FROM meta").fetchone()
+            finally:
+                conexion.close()
+            return fila[0] if fila else None
+        except sqlite3.Error:
+            return None
+
+    def _lookup(self, codigo: Any) -> Any:
+        """Busca un codigo en la cache LRU y, si no esta, en disco."""
+        if not isinstance(codigo, str):
+            return _NO_EXISTE
+        with self._bloqueo:
+            self.consultas += 1
+            valor = self._cache.get(codigo, _SIN_CACHE)
+            if valor is not _SIN_CACHE:
+                self._cache.move_to_end(codigo)
+                self.aciertos_cache += 1
+                return valor
+
+            fila = self._conexion.execute("SELECT descripcion FROM codigos WHERE codigo = ?", (codigo,)).fetchone()
+            if fila is None:
+                valor = _NO_EXISTE
+                self.no_encontrados_disco += 1
+            else:
+                valor = fila[0]
+                self.encontrados_disco += 1
+            self._cache[codigo] = valor
+            if len(self._cache) > self.tamanio_cache:
+                self._cache.popitem(last=False)
+            return valor
+
+    def __getitem__(self, codigo: Any) -> Any:
+        valor = self._lookup(codigo)
+        if valor is _NO_EXISTE:
+            raise KeyError(codigo)
+        return valor
+
+    def __contains__(self, codigo: Any) -> bool:
+        return self._lookup(codigo) is not _NO_EXISTE
+
+    def get(self, codigo: Any, default: Any = None) -> Any:
+        """Busca un codigo con una sola consulta (contada una vez en las estadisticas); 'default' si no existe."""
+        valor = self._lookup(codigo)
+        return default if valor is _NO_EXISTE else valor
+
+    def __iter__(self) -> Iterator[str]:
+        with self._bloqueo:
+            filas = self._conexion.execute("SELECT codigo FROM codigos").fetchall()
+        return (fila[0] for fila in filas)
+
+    def __len__(self) -> int:
+        with self._bloqueo:
+            return self._conexion.execute("SELECT COUNT(*) FROM codigos").fetchone()[0]
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Path, int]]:
+        # a otro proceso solo viaja la ruta del indice (la conexion y la cache no se copian)
+        return (self.__class__, (self.archivo_indice, self.tamanio_cache))
+
+    def drain_counters(self) -> Dict[str, int]:
+        """
+        Devuelve los contadores de consultas acumulados desde la llamada anterior y los reinicia
+        (un proceso del pool los envia con cada resultado para sumarlos en el proceso principal).
+
+        Returns:
+            Dict[str, int]: Consultas, aciertos de la cache LRU y resultados en disco.
+        """
+        with self._bloqueo:
+            contadores = {campo: getattr(self, campo) for campo in CONTADORES}
+            for campo in CONTADORES:
+                setattr(self, campo, 0)
+        return contadores
+
+    def add_counters(self, contadores: Dict[str, int]) -> None:
+        """
+        Suma a las estadisticas los contadores de otro proceso (obtenidos con 'drain_counters').
+
+        Parameters:
+            contadores (Dict[str, int]): Contadores de consultas de otro proceso.
+        """
+        with self._bloqueo:
+            for campo in CONTADORES:
+                setattr(self, campo, getattr(self, campo) + contadores.get(campo, 0))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve las estadisticas de consultas de este proceso, sumadas las de otros procesos
+        agregadas con 'add_counters' ('tamanio_cache' es el de la cache de este proceso).
+
+        Returns:
+            Dict[str, Any]: Consultas, aciertos de la cache LRU, resultados en disco y tasa de aciertos.
+        """
+        return {
+            "consultas": self.consultas,
+            "aciertos_cache": self.aciertos_cache,
+            "encontrados_disco": self.encontrados_disco,
+            "no_encontrados_disco": self.no_encontrados_disco,
+            "tasa_aciertos_cache": round(self.aciertos_cache / self.consultas, 4) if self.consultas else 0.0,
+            "tamanio_cache": len(self._cache)
+        }
+
+    def close(self) -> None:
+        """Cierra la conexion al indice."""
+        with self._bloqueo:
+            self._conexion.close()
@@ -0,0 +1,239 @@
+from pathlib import Path
+from typing import Dict, Any, Union, Iterator, List, Optional, Tuple
+from standard_response import StandardResponse
+from decompress import TarMember
+from xml_to_dict import XMLConverter, FusionItem
+from json_matcher import CompiledJsonMatcher, PathScopedJsonMatcher
+from metadata_extractor import MetadataExtractor
+from stage_metrics import StageMetrics, Medicion
+from content_codec import encode_content, CAMPO_TAMANIO
+from disk_dictionary import DiskCodeDictionary
+import time
+
+MOTOR_XMLTODICT = "xmltodict"
+MOTOR_FUSIONADO = "fusionado"
+
+class DocumentProcessor:
+    """
+    Clase para convertir un archivo .DATA en el documento final a guardar en MongoDB
+    (XML -> diccionario -> descripciones de codigos -> metadatos).
+
+    No escribe logs ni mantiene conexiones, por lo que puede ejecutarse dentro de los
+    procesos de un 'ProcessPoolExecutor'.
+
+    Attributes:
+        dict_codigos (Dict[str, Any]): Diccionario de codigos y descripciones.
+        umbral_streaming (int): Tamanio en bytes a partir del cual un .DATA se parsea por bloques (0 = nunca).
+        item_depth (int): Profundidad de los elementos que se emiten por separado al parsear por bloques.
+        chunk_size (int): Numero maximo de elementos por documento al parsear por bloques.
+        reglas (List[Dict[str, Any]]): Reglas de enriquecimiento por ruta; si hay alguna, solo se
+            buscan codigos en las rutas configuradas.
+        motor_xml (str): 'xmltodict' (parseo y enriquecimiento por separado) o 'fusionado' (una sola
+            pasada de expat; los pares a fusionar, los archivos por bloques y las reglas por ruta
+            siguen usando 'xmltodict').
+        metrics (StageMetrics): Tiempos de parseo y enriquecimiento de cada archivo.
+        compresion (str): Codec con el que se guarda 'contenido' comprimido ('zlib' o 'lzma'; '' = sin comprimir).
+        nivel_compresion (int): Nivel del codec (-1 = el nivel por defecto del codec).
+    """
+
+    def __init__(self,
+                dict_codigos: Dict[str, Any],
+                umbral_streaming: int = 0,
+                item_depth: int = 2,
+                chunk_size: int = 1000,
+                reglas: Optional[List[Dict[str, Any]]] = None,
+                motor_xml: str = MOTOR_XMLTODICT,
+                metrics: Optional[StageMetrics] = None,
+                compresion: str = "",
+                nivel_compresion: int = -1
+                ) -> None:
+        """
+        Constructor para la clase DocumentProcessor.
+
+        Parameters:
+            dict_codigos (Dict[str, Any]): Diccionario de codigos y descripciones.
+            umbral_streaming (int): Tamanio en bytes a partir del cual un .DATA se parsea por bloques (0 = nunca).
+            item_depth (int): Profundidad de los elementos que se emiten por separado al parsear por bloques.
+            chunk_size (int): Numero maximo de elementos por documento al parsear por bloques.
+            reglas (Optional[List[Dict[str, Any]]]): Reglas de enriquecimiento por ruta; si hay alguna,
+                solo se buscan codigos en las rutas configuradas.
+            motor_xml (str): 'xmltodict' o 'fusionado' (parseo y enriquecimiento en una sola pasada).
+            metrics (Optional[StageMetrics]): Donde registrar los tiempos (si no se indica, se crea uno propio).
+            compresion (str): Codec con el que se guarda 'contenido' comprimido ('zlib' o 'lzma'; '' = sin comprimir).
+            nivel_compresion (int): Nivel del codec (-1 = el nivel por defecto del codec).
+        """
+        self.dict_codigos = dict_codigos
+        self.umbral_streaming = umbral_streaming
+        self.item_depth = item_depth
+        self.chunk_size = chunk_size
+        self.reglas = reglas or []
+        self.motor_xml = motor_xml
+        self._xml_converter = XMLConverter()
+        # con reglas se recorren solo las rutas configuradas, modificando el diccionario recien parseado
+        self._json_matcher: Any = PathScopedJsonMatcher(self.reglas) if self.reglas else CompiledJsonMatcher(dict_codigos)
+        self._in_place = bool(self.reglas)
+        self._describe = self._json_matcher.describe_dict if motor_xml == MOTOR_FUSIONADO and not self.reglas else None
+        self._metadata_extractor = MetadataExtractor()
+        self.metrics = metrics if metrics is not None else StageMetrics()
+        self.compresion = compresion
+        self.nivel_compresion = nivel_compresion
+
+    def process(self, item: Union[Path, TarMember, FusionItem]) -> StandardResponse:
+        """
+        Convierte un archivo .DATA (en disco, leido en streaming o un par a fusionar) y lo combina
+        con los codigos - descripciones.
+
+        Parameters:
+            item (Union[Path, TarMember, FusionItem]): Archivo .DATA a procesar.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Raises:
+            Exception: Si ocurre un error al enriquecer el documento o extraer sus metadatos.
+        """
+        # los pares se enriquecen despues de fusionarse: cada mitad por separado podria dejar descripciones viejas
+        describe = None if isinstance(item, FusionItem) else self._describe
+        etapa = "fusion" if isinstance(item, FusionItem) else "parseo_enriquecimiento" if describe else "parseo"
+        with self.metrics.measure(etapa, _item_size(item)):
+            if isinstance(item, FusionItem):
+                resultado: Any = self._xml_converter.fuse(item)
+            elif isinstance(item, TarMember):
+                resultado = self._xml_converter.parse_xml_content(item.nombre, item.contenido, describe)
+            else:
+                resultado = self._xml_converter.parse_xml_file(item, describe)
+
+        if not resultado.success:
+            return resultado
+
+        try:
+            if describe is None:
+                with self.metrics.measure("enriquecimiento"):
+                    dict_combinado = self._json_matcher.add_description(resultado.data, in_place=self._in_place)
+            else:
+                dict_combinado = resultado.data
+            metadata = self._extract_metadata(item)
+            if metadata.success:
+                metadata.data.update(self._content_fields(dict_combinado))
+            return StandardResponse(
+                success=bool(metadata.data),
+                data=metadata.data,
+                message=resultado.message if metadata.success else metadata.message
+            )
+        except Exception as e:
+            nombre = item.name if isinstance(item, Path) else item.nombre
+            return StandardResponse(
+                success=False,
+                message=f"Error al procesar el archivo '{nombre}': {e}",
+                error_details=str(e)
+            )
+
+    def _content_fields(self, contenido: Any) -> Dict[str, Any]:
+        """Campo 'contenido' del documento, comprimido con 'compresion' si esta configurada (ver 'content_codec')."""
+        if not self.compresion:
+            return {"contenido": contenido}
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        campos = encode_content(contenido, self.compresion, self.nivel_compresion)
+        # los bytes de la etapa son los del BSON sin comprimir
+        self.metrics.record("compresion", time.perf_counter() - inicio, time.thread_time() - inicio_cpu, campos[CAMPO_TAMANIO])
+        return campos
+
+    def _extract_metadata(self, item: Union[Path, TarMember, FusionItem]) -> Any:
+        """Extrae los metadatos segun el tipo de elemento."""
+        if isinstance(item, FusionItem):
+            return self._metadata_extractor.metadata_from_fusion(item)
+        if isinstance(item, TarMember):
+            return self._metadata_extractor.metadata_from_member(item)
+        return self._metadata_extractor.metadata_extractor(item)
+
+    def is_large(self, item: Union[Path, TarMember, FusionItem]) -> bool:
+        """Indica si el archivo supera el umbral para parsearse por bloques (los pares a fusionar nunca)."""
+        if self.umbral_streaming <= 0 or isinstance(item, FusionItem):
+            return False
+        if isinstance(item, TarMember):
+            return len(item.contenido) > self.umbral_streaming
+        return item.stat().st_size > self.umbral_streaming
+
+    def process_chunks(self, item: Union[Path, TarMember]) -> Iterator[StandardResponse]:
+        """
+        Convierte un archivo .DATA muy grande en varios documentos, uno por bloque de elementos,
+        sin cargar el arbol XML completo en memoria.
+
+        Cada documento lleva los metadatos del archivo y el numero de 'parte' del bloque.
+        Un .DATA en disco se lee por partes; un miembro leido en streaming del TAR ya tiene todo su
+        contenido en memoria ('TarMember.contenido'), por lo que en ese caso solo se evita construir
+        el arbol completo.
+
+        Parameters:
+            item (Union[Path, TarMember]): Archivo .DATA a procesar.
+
+        Returns:
+            Iterator[StandardResponse]: Una respuesta por bloque, con el documento en 'data'.
+        """
+        origen: Union[bytes, Path]
+        if isinstance(item, TarMember):
+            nombre, origen = item.nombre, item.contenido
+            metadata: Any = self._metadata_extractor.metadata_from_member(item)
+        else:
+            nombre, origen = item.name, item
+            metadata = self._metadata_extractor.metadata_extractor(item)
+
+        if not metadata.success:
+            yield metadata
+            return
+
+        bloques = self.metrics.iter_measured("parseo_bloques", self._xml_converter.iter_xml_chunks(nombre, origen, self.item_depth, self.chunk_size))
+        for parte, resultado in enumerate(bloques, start=1):
+            if not resultado.success:
+                yield resultado
+                return
+            try:
+                documento = dict(metadata.data)
+                documento["parte"] = parte
+                with self.metrics.measure("enriquecimiento"):
+                    contenido = self._json_matcher.add_description(resultado.data, in_place=self._in_place)
+                documento.update(self._content_fields(contenido))
+                yield StandardResponse(success=True, data=documento, message=resultado.message)
+            except Exception as e:
+                yield StandardResponse(
+                    success=False,
+                    message=f"Error al procesar el bloque {parte} del archivo '{nombre}': {e}",
+                    error_details=str(e)
+                )
+
+
+def _item_size(item: Union[Path, TarMember, FusionItem]) -> int:
+    """Tamanio en bytes de un archivo .DATA (o de los dos de un par a fusionar)."""
+    if isinstance(item, FusionItem):
+        return _item_size(item.original) + _item_size(item.complemento)
+    if isinstance(item, TarMember):
+        return len(item.contenido)
+    try:
+        return item.stat().st_size
+    except OSError:
+        return 0
+
+_worker_processor: Any = None
+
+def init_worker(dict_codigos: Dict[str, Any],
+                reglas: Optional[List[Dict[str, Any]]] = None,
+                motor_xml: str = MOTOR_XMLTODICT,
+                compresion: str = "",
+                nivel_compresion: int = -1
+                ) -> None:
+    """Inicializa el 'DocumentProcessor' de un proceso del pool (el diccionario y las reglas se envian una sola vez por proceso)."""
+    global _worker_processor
+    _worker_processor = DocumentProcessor(
+        dict_codigos, reglas=reglas, motor_xml=motor_xml, compresion=compresion, nivel_compresion=nivel_compresion
+    )
+
+def process_in_worker(item: Union[Path, TarMember, FusionItem]) -> Tuple[StandardResponse, List[Medicion], Optional[Dict[str, int]]]:
+    """
+    Procesa un archivo .DATA con el 'DocumentProcessor' del proceso actual del pool y devuelve el
+    resultado junto con los tiempos medidos en el proceso y, si los codigos estan en disco, los
+    contadores de consultas de su cache LRU (para agregarlos en el proceso principal).
+    """
+    resultado = _worker_processor.process(item)
+    dict_codigos = _worker_processor.dict_codigos
+    contadores = dict_codigos.drain_counters() if isinstance(dict_codigos, DiskCodeDictionary) else None
+    return resultado, _worker_processor.metrics.drain(), contadores
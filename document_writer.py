@@ -0,0 +1,118 @@
+from typing import Any, Callable, Dict, List, Optional, Union
+import logging
+import queue
+import threading
+
+class DocumentWriter:
+    """
+    Clase para escribir documentos en MongoDB a medida que se producen, por lotes de 'buffer_size'.
+
+    La memoria usada es proporcional al tamanio del lote y no al del TAR. Opcionalmente los lotes
+    se insertan desde un hilo en segundo plano con una cola acotada: si MongoDB se atrasa, 'append'
+    se bloquea hasta que haya espacio en la cola.
+
+    Attributes:
+        guardar_lote (Callable[[List[Dict[str, Any]], int], List[Any]]): Funcion que inserta un lote y devuelve los ids guardados.
+        buffer_size (Union[int, Callable[[], int]]): Numero de documentos por lote (o funcion que lo devuelve, para lotes adaptativos).
+        en_segundo_plano (bool): Inserta los lotes desde un hilo en segundo plano.
+        tamanio_cola (int): Numero maximo de lotes esperando en la cola del hilo.
+        num_documentos (int): Documentos recibidos.
+        num_guardados (int): Documentos guardados en MongoDB.
+    """
+
+    def __init__(self,
+                guardar_lote: Callable[[List[Dict[str, Any]], int], List[Any]],
+                buffer_size: Union[int, Callable[[], int]],
+                en_segundo_plano: bool = False,
+                tamanio_cola: int = 4
+                ) -> None:
+        """
+        Constructor para la clase DocumentWriter.
+
+        Parameters:
+            guardar_lote (Callable[[List[Dict[str, Any]], int], List[Any]]): Funcion que inserta un lote (y su numero) y devuelve los ids guardados.
+            buffer_size (Union[int, Callable[[], int]]): Numero de documentos por lote (o funcion que lo devuelve, para lotes adaptativos).
+            en_segundo_plano (bool): Inserta los lotes desde un hilo en segundo plano.
+            tamanio_cola (int): Numero maximo de lotes esperando en la cola del hilo.
+        """
+        self.guardar_lote = guardar_lote
+        self.buffer_size = buffer_size
+        self.en_segundo_plano = en_segundo_plano
+        self.num_documentos = 0
+        self.num_guardados = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._num_lote = 0
+        self._error: Optional[BaseException] = None
+        self._cola: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(maxsize=max(1, tamanio_cola))
+        self._hilo: Optional[threading.Thread] = None
+        if en_segundo_plano:
+            self._hilo = threading.Thread(target=self._run, name="document-writer", daemon=True)
+            self._hilo.start()
+
+    def append(self, documento: Dict[str, Any]) -> None:
+        """
+        Agrega un documento y envia el lote cuando alcanza 'buffer_size'.
+
+        Parameters:
+            documento (Dict[str, Any]): Documento a guardar.
+        """
+        self._buffer.append(documento)
+        self.num_documentos += 1
+        buffer_size = self.buffer_size() if callable(self.buffer_size) else self.buffer_size
+        if len(self._buffer) >= max(1, buffer_size):
+            self.flush()
+
+    def flush(self) -> None:
+        """Envia el lote pendiente (en linea o a la cola del hilo en segundo plano)."""
+        if not self._buffer:
+            return
+        lote, self._buffer = self._buffer, []
+        if self._hilo is not None:
+            self._raise_error()
+            self._cola.put(lote)
+        else:
+            self._save(lote)
+
+    def close(self) -> int:
+        """
+        Envia el ultimo lote, espera a que se inserten todos y detiene el hilo en segundo plano.
+
+        Returns:
+            int: Numero de documentos guardados en MongoDB.
+
+        Raises:
+            Exception: El error producido al insertar un lote en segundo plano.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._hilo is not None:
+                self._cola.put(None)
+                self._hilo.join()
+                self._hilo = None
+        self._raise_error()
+        return self.num_guardados
+
+    def _save(self, lote: List[Dict[str, Any]]) -> None:
+        """Inserta un lote y acumula los documentos guardados."""
+        self._num_lote += 1
+        self.num_guardados += len(self.guardar_lote(lote, self._num_lote))
+
+    def _run(self) -> None:
+        """Hilo en segundo plano: inserta los lotes de la cola hasta recibir la marca de fin."""
+        while True:
+            lote = self._cola.get()
+            if lote is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._save(lote)
+            except BaseException as e:
+                logging.error(f"Error al guardar un lote en segundo plano: {e}")
+                self._error = e
+
+    def _raise_error(self) -> None:
+        """Vuelve a lanzar en el hilo llamador el error del hilo en segundo plano."""
+        if self._error is not None:
+            raise self._error
@@ -1,11 +1,20 @@
 from pathlib import Path
-from typing import List
+from typing import List, Dict, Optional
 from standard_response import StandardResponse
 from typing import Any
 import csv
 import json
+import hashlib
+import os
+import pickle
+import time
 
 FORMATOS_SOPORTADOS = [".json", ".txt", ".csv"]
+SUFIJO_REGLAS = ".reglas.json"
+VERSION_CACHE = 1
+INDICE_CACHE = "indice.pickle"
+COMBINADO_CACHE = "combinado.pickle"
+TODOS_LOS_CODIGOS = "*"
 
 class FileProcessor:
     """
@@ -97,12 +106,15 @@ class FileProcessor:
                 error_details=str(e)
             )
 
-    def merge_dictionaries(self, file_list: List[Path]) -> StandardResponse:
+    def merge_dictionaries(self, file_list: List[Path], por_nombre: Optional[Dict[str, Dict[str, Any]]] = None) -> StandardResponse:
         """
         Combina el contenido de todos los archivos soportados en un solo diccionario.
 
         Parameters:
             file_list (Path): Lista de archivos a combinar.
+            por_nombre (Optional[Dict[str, Dict[str, Any]]]): Si se indica, recibe el diccionario de cada
+                archivo por su nombre sin extension (ver 'load_dictionaries_by_name'); el combinado
+                comparte con ellos las claves y descripciones, sin copiarlas.
 
         Returns:
             StandardResponse: Clase estandar para encapsular respuestas de funciones.
@@ -114,14 +126,253 @@ class FileProcessor:
             if not isinstance(archivo, Path):
                 continue
 
-            if archivo.suffix.lower() not in FORMATOS_SOPORTADOS:
+            if archivo.suffix.lower() not in FORMATOS_SOPORTADOS or self.is_rules_file(archivo):
                 continue
 
             diccionario_archivo: Any = self._load_file_content(archivo).data
             diccionarios_combinados.update(diccionario_archivo)
+            if por_nombre is not None and isinstance(diccionario_archivo, dict):
+                por_nombre[archivo.stem] = diccionario_archivo
 
         return StandardResponse(
             success=True,
             data=diccionarios_combinados,
             message="Codigos de archivos combinados correctamente."
         )
+
+    @staticmethod
+    def is_rules_file(file: Path) -> bool:
+        """Indica si el archivo es un archivo de reglas de enriquecimiento ('*.reglas.json')."""
+        return file.name.lower().endswith(SUFIJO_REGLAS)
+
+    def load_dictionaries_by_name(self, file_list: List[Path]) -> StandardResponse:
+        """
+        Carga cada archivo de codigos soportado en su propio diccionario, con el nombre del archivo
+        (sin extension) como espacio de nombres.
+
+        Parameters:
+            file_list (List[Path]): Lista de archivos a cargar.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+        """
+        diccionarios: Dict[str, Dict[str, Any]] = {}
+        for archivo in file_list:
+            if not isinstance(archivo, Path):
+                continue
+            if archivo.suffix.lower() not in FORMATOS_SOPORTADOS or self.is_rules_file(archivo):
+                continue
+            contenido = self._load_file_content(archivo)
+            if contenido.success and contenido.data is not None:
+                diccionarios[archivo.stem] = contenido.data
+
+        return StandardResponse(
+            success=True,
+            data=diccionarios,
+            message=f"Se cargaron {len(diccionarios)} espacios de nombres de codigos."
+        )
+
+    def load_enrichment_rules(self,
+                              file_list: List[Path],
+                              dict_codigos: Dict[str, Any],
+                              diccionarios: Optional[Dict[str, Dict[str, Any]]] = None
+                              ) -> StandardResponse:
+        """
+        Carga las reglas de enriquecimiento de los archivos '*.reglas.json'.
+
+        Cada archivo tiene la forma {"reglas": [{"ruta": "...", "codigos": ..., "sufijo": "..."}]}, donde
+        'ruta' es la ruta de claves separadas por '/' ('*' = una clave cualquiera, '**' = cualquier
+        numero de claves; las listas no cuentan como nivel), 'codigos' es el nombre de un archivo de
+        codigos sin extension, '*' para todos los codigos combinados o un diccionario en linea, y
+        'sufijo' es opcional (default '_description').
+
+        Parameters:
+            file_list (List[Path]): Lista de archivos complementarios.
+            dict_codigos (Dict[str, Any]): Diccionario con todos los codigos combinados.
+            diccionarios (Optional[Dict[str, Dict[str, Any]]]): Codigos de cada archivo por nombre, ya
+                cargados junto con 'dict_codigos' (si no se indican, se cargan con 'load_dictionaries_by_name').
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones (las reglas con
+            su diccionario ya resuelto en 'data').
+        """
+        archivos_reglas = [archivo for archivo in file_list if isinstance(archivo, Path) and self.is_rules_file(archivo)]
+        if not archivos_reglas:
+            return StandardResponse(
+                success=True,
+                data=[],
+                message="No hay archivos de reglas de enriquecimiento."
+            )
+
+        if diccionarios is None:
+            diccionarios = self.load_dictionaries_by_name(file_list).data or {}
+        reglas: List[Dict[str, Any]] = []
+        errores: List[str] = []
+        for archivo in sorted(archivos_reglas):
+            contenido = self._load_file_content(archivo)
+            if not contenido.success or contenido.data is None:
+                errores.append(f"'{archivo.name}': {contenido.error_details or contenido.message}")
+                continue
+
+            for regla in contenido.data.get("reglas", []):
+                codigos = regla.get("codigos", TODOS_LOS_CODIGOS)
+                if isinstance(codigos, dict):
+                    diccionario = codigos
+                elif codigos == TODOS_LOS_CODIGOS:
+                    diccionario = dict_codigos
+                elif codigos in diccionarios:
+                    diccionario = diccionarios[codigos]
+                else:
+                    errores.append(f"'{archivo.name}': no existe el archivo de codigos '{codigos}' de la ruta '{regla.get('ruta')}'")
+                    continue
+                if not regla.get("ruta"):
+                    errores.append(f"'{archivo.name}': regla sin 'ruta'")
+                    continue
+                reglas.append({
+                    "ruta": regla["ruta"],
+                    "codigos": diccionario,
+                    "sufijo": regla.get("sufijo", "_description")
+                })
+
+        return StandardResponse(
+            success=not errores,
+            data=reglas,
+            message=f"Se cargaron {len(reglas)} reglas de enriquecimiento de {len(archivos_reglas)} archivos.",
+            error_details="; ".join(errores) or None
+        )
+
+    def merge_dictionaries_cached(self,
+                                  file_list: List[Path],
+                                  directorio_cache: Path,
+                                  por_nombre: Optional[Dict[str, Dict[str, Any]]] = None
+                                  ) -> StandardResponse:
+        """
+        Combina los archivos de codigos como 'merge_dictionaries', usando una cache binaria (pickle)
+        en 'directorio_cache'.
+
+        Cada archivo se guarda en cache por el hash de su contenido y se identifica por nombre, tamanio
+        y fecha de modificacion (el hash solo se recalcula si cambian). Si ningun archivo cambio se
+        carga el diccionario combinado guardado; si no, solo se vuelven a leer los archivos cambiados
+        y el combinado se reconstruye a partir de la cache de los demas. Con 'por_nombre' el combinado
+        siempre se reconstruye desde la cache de cada archivo, para que comparta sus datos con los
+        diccionarios por nombre.
+
+        Parameters:
+            file_list (List[Path]): Lista de archivos a combinar.
+            directorio_cache (Path): Directorio de la cache.
+            por_nombre (Optional[Dict[str, Dict[str, Any]]]): Como en 'merge_dictionaries'.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+        """
+        inicio = time.perf_counter()
+        archivos = [
+            archivo for archivo in file_list
+            if isinstance(archivo, Path) and archivo.suffix.lower() in FORMATOS_SOPORTADOS and not self.is_rules_file(archivo)
+        ]
+
+        try:
+            directorio_cache.mkdir(parents=True, exist_ok=True)
+            indice = self._read_pickle(directorio_cache / INDICE_CACHE)
+            if not isinstance(indice, dict) or indice.get("version") != VERSION_CACHE:
+                indice = {"version": VERSION_CACHE, "archivos": {}, "combinado": None}
+
+            # --- identificar archivos sin cambios (tamanio y fecha, o mismo hash) ---
+            entradas: List[Dict[str, Any]] = []
+            cambiados: List[Path] = []
+            for archivo in archivos:
+                estado = archivo.stat()
+                previa = indice["archivos"].get(archivo.name)
+                if previa and previa["tamanio"] == estado.st_size and previa["mtime_ns"] == estado.st_mtime_ns:
+                    entradas.append(previa)
+                    continue
+                entrada = {"tamanio": estado.st_size, "mtime_ns": estado.st_mtime_ns, "hash": self._hash_file(archivo)}
+                if not (directorio_cache / f"{entrada['hash']}.pickle").exists():
+                    cambiados.append(archivo)
+                entradas.append(entrada)
+
+            clave = [(archivo.name, entrada["hash"]) for archivo, entrada in zip(archivos, entradas)]
+            if not cambiados and indice["combinado"] == clave and por_nombre is None:
+                combinado = self._read_pickle(directorio_cache / COMBINADO_CACHE)
+                if isinstance(combinado, dict):
+                    return StandardResponse(
+                        success=True,
+                        data=combinado,
+                        message=f"Cache de complementos: HIT ({len(archivos)} archivos, {time.perf_counter() - inicio:.2f}s)."
+                    )
+
+            # --- leer solo los archivos cambiados y reconstruir el combinado ---
+            combinado = {}
+            for archivo, entrada in zip(archivos, entradas):
+                ruta_archivo = directorio_cache / f"{entrada['hash']}.pickle"
+                diccionario_archivo = None if archivo in cambiados else self._read_pickle(ruta_archivo)
+                if not isinstance(diccionario_archivo, dict):
+                    contenido = self._load_file_content(archivo)
+                    diccionario_archivo = contenido.data
+                    if contenido.success:
+                        self._write_pickle(ruta_archivo, diccionario_archivo)
+                    else:
+                        entrada = dict(entrada, hash=None)
+                indice["archivos"][archivo.name] = entrada
+                combinado.update(diccionario_archivo)
+                if por_nombre is not None and isinstance(diccionario_archivo, dict):
+                    por_nombre[archivo.stem] = diccionario_archivo
+
+            # con 'por_nombre' el combinado guardado no se usa (ni se reescribe en cada inicio)
+            if por_nombre is None:
+                self._write_pickle(directorio_cache / COMBINADO_CACHE, combinado)
+                indice["combinado"] = clave
+            indice["archivos"] = {archivo.name: indice["archivos"][archivo.name] for archivo in archivos if indice["archivos"][archivo.name]["hash"]}
+            self._write_pickle(directorio_cache / INDICE_CACHE, indice)
+            self._remove_stale_entries(directorio_cache, {entrada["hash"] for entrada in indice["archivos"].values()})
+
+            return StandardResponse(
+                success=True,
+                data=combinado,
+                message=(
+                    f"Cache de complementos: MISS ({len(cambiados)} de {len(archivos)} archivos leidos de nuevo, "
+                    f"{time.perf_counter() - inicio:.2f}s)."
+                )
+            )
+        except (OSError, pickle.PickleError) as e:
+            if por_nombre is not None:
+                por_nombre.clear()
+            resultado = self.merge_dictionaries(archivos, por_nombre)
+            resultado.message = f"No se pudo usar la cache de complementos ({e}); se leyeron todos los archivos."
+            resultado.error_details = str(e)
+            return resultado
+
+    @staticmethod
+    def _hash_file(file: Path) -> str:
+        """Calcula el hash sha256 del contenido de un archivo leyendolo por bloques."""
+        hash_archivo = hashlib.sha256()
+        with open(file, "rb") as archivo:
+            for bloque in iter(lambda: archivo.read(1024 * 1024), b""):
+                hash_archivo.update(bloque)
+        return hash_archivo.hexdigest()
+
+    @staticmethod
+    def _read_pickle(file: Path) -> Any:
+        """Lee un archivo de la cache (None si no existe o esta danado)."""
+        try:
+            with open(file, "rb") as archivo:
+                return pickle.load(archivo)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_pickle(file: Path, data: Any) -> None:
+        """Escribe un archivo de la cache de forma atomica (archivo temporal y reemplazo)."""
+        temporal = file.with_name(f"{file.name}.tmp")
+        with open(temporal, "wb") as archivo:
+            pickle.dump(data, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, file)
+
+    @staticmethod
+    def _remove_stale_entries(directorio_cache: Path, hashes: Any) -> None:
+        """Elimina de la cache los archivos cuyo contenido ya no esta en COMPLEMENTOS."""
+        for archivo in directorio_cache.glob("*.pickle"):
+            if archivo.name in (INDICE_CACHE, COMBINADO_CACHE):
+                continue
+            if archivo.stem not in hashes:
+                archivo.unlink(missing_ok=True)
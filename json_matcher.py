@@ -1,4 +1,9 @@
-from typing import Dict, Any
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+import copy
+
+# 'descriptions.get(valor, _SIN_DESCRIPCION)' resuelve cada valor con una sola consulta
+# (con 'in' seguido de '[]' un diccionario en disco contaria dos consultas por valor)
+_SIN_DESCRIPCION = object()
 
 class JsonMatcher:
     """
@@ -52,3 +57,284 @@ class JsonMatcher:
             return [self.add_description_json(item, descriptions, suffix) for item in data_json]
         else:
             return data_json
+
+
+class CompiledJsonMatcher:
+    """
+    Clase para agregar descripciones a documentos JSON, creada una sola vez a partir del diccionario
+    de descripciones y reutilizable para todos los documentos.
+
+    Recorre el documento con una pila explicita (sin recursion, por lo que no depende del limite de
+    recursion de Python) y guarda en cache las claves con sufijo. El resultado es el mismo que el de
+    'JsonMatcher.add_description_json', incluido el orden de las claves.
+
+    Attributes:
+        descriptions (Dict[str, str]): Diccionario de descripciones.
+        suffix (str): Sufijo que se agregara a las nuevas claves que contienen las descripciones.
+    """
+
+    def __init__(self, descriptions: Dict[str, str], suffix: str = "_description") -> None:
+        """
+        Constructor para la clase CompiledJsonMatcher.
+
+        Parameters:
+            descriptions (Dict[str, str]): Diccionario de descripciones.
+            suffix (str): Sufijo que se agregara a las nuevas claves que contienen las descripciones.
+        """
+        self.descriptions = descriptions
+        self.suffix = suffix
+        self._claves: Dict[str, str] = {}
+
+    def _suffixed(self, key: str) -> str:
+        """Devuelve la clave con sufijo, creandola solo la primera vez."""
+        nueva_key = self._claves.get(key)
+        if nueva_key is None:
+            nueva_key = self._claves[key] = f"{key}{self.suffix}"
+        return nueva_key
+
+    def add_description(self, data_json: Any, in_place: bool = False) -> Any:
+        """
+        Agrega descripciones a un JSON basado en el diccionario de descripciones.
+
+        Parameters:
+            data_json (Any): JSON al que le agregaran las descripciones.
+            in_place (bool): Modifica 'data_json' en lugar de copiarlo; solo se reconstruyen los
+                diccionarios que reciben alguna descripcion. No duplica el documento en memoria, pero
+                es mas lento que la copia cuando la mayoria de los diccionarios tienen codigos.
+
+        Returns:
+            Any: JSON con las descripciones agregadas ('data_json' si 'in_place' es True).
+        """
+        if in_place:
+            return self._add_in_place(data_json)
+        return self._add_copy(data_json)
+
+    def _add_copy(self, data_json: Any) -> Any:
+        """Copia el JSON agregando las descripciones."""
+        if not isinstance(data_json, (dict, list)):
+            return data_json
+
+        descriptions = self.descriptions
+        suffixed = self._suffixed
+        raiz: Any = {} if isinstance(data_json, dict) else []
+        pila = [(data_json, raiz)]
+        while pila:
+            origen, destino = pila.pop()
+            if isinstance(origen, dict):
+                for key, value in origen.items():
+                    if isinstance(value, dict):
+                        copia: Any = {}
+                        pila.append((value, copia))
+                        destino[key] = copia
+                    elif isinstance(value, list):
+                        copia = []
+                        pila.append((value, copia))
+                        destino[key] = copia
+                    else:
+                        destino[key] = value
+                        if isinstance(value, str):
+                            descripcion = descriptions.get(value, _SIN_DESCRIPCION)
+                            if descripcion is not _SIN_DESCRIPCION:
+                                destino[suffixed(key)] = descripcion
+            else:
+                for value in origen:
+                    if isinstance(value, dict):
+                        copia = {}
+                        pila.append((value, copia))
+                        destino.append(copia)
+                    elif isinstance(value, list):
+                        copia = []
+                        pila.append((value, copia))
+                        destino.append(copia)
+                    else:
+                        destino.append(value)
+        return raiz
+
+    def _add_in_place(self, data_json: Any) -> Any:
+        """Agrega las descripciones modificando el JSON recibido."""
+        descriptions = self.descriptions
+        pila = [data_json]
+        while pila:
+            nodo = pila.pop()
+            if isinstance(nodo, list):
+                pila.extend(value for value in nodo if isinstance(value, (dict, list)))
+                continue
+            if not isinstance(nodo, dict):
+                continue
+
+            descripciones: Dict[str, Any] = {}
+            for key, value in nodo.items():
+                if isinstance(value, (dict, list)):
+                    pila.append(value)
+                elif isinstance(value, str):
+                    descripcion = descriptions.get(value, _SIN_DESCRIPCION)
+                    if descripcion is not _SIN_DESCRIPCION:
+                        descripciones[key] = descripcion
+
+            if descripciones:
+                self._rebuild_with_descriptions(nodo, descripciones)
+        return data_json
+
+    def describe_dict(self, nodo: Dict[str, Any]) -> None:
+        """
+        Agrega las descripciones de los valores directos de un diccionario, sin bajar a sus hijos
+        (lo usa el parseo fusionado, que lo llama al cerrar cada elemento).
+
+        Parameters:
+            nodo (Dict[str, Any]): Diccionario a modificar.
+        """
+        descriptions = self.descriptions
+        descripciones: Dict[str, Any] = {}
+        for key, value in nodo.items():
+            if isinstance(value, str):
+                descripcion = descriptions.get(value, _SIN_DESCRIPCION)
+                if descripcion is not _SIN_DESCRIPCION:
+                    descripciones[key] = descripcion
+        if descripciones:
+            self._rebuild_with_descriptions(nodo, descripciones)
+
+    def _rebuild_with_descriptions(self, nodo: Dict[str, Any], descripciones: Dict[str, Any]) -> None:
+        """Reconstruye el diccionario para dejar cada descripcion (ya consultada, por clave) junto a su clave."""
+        suffixed = self._suffixed
+        items = list(nodo.items())
+        nodo.clear()
+        for key, value in items:
+            nodo[key] = value
+            if key in descripciones:
+                nodo[suffixed(key)] = descripciones[key]
+
+
+class _NodoRuta:
+    """Nodo del arbol de rutas compilado a partir de las reglas de enriquecimiento."""
+    __slots__ = ("hijos", "comodin", "recursivo", "es_recursivo", "terminales")
+
+    def __init__(self, es_recursivo: bool = False) -> None:
+        self.hijos: Dict[str, "_NodoRuta"] = {}
+        self.comodin: Optional["_NodoRuta"] = None
+        self.recursivo: Optional["_NodoRuta"] = None
+        self.es_recursivo = es_recursivo
+        self.terminales: List[Tuple[Dict[str, str], str]] = []
+
+    def has_transitions(self) -> bool:
+        """Indica si desde este nodo se puede seguir bajando en el documento."""
+        return bool(self.hijos) or self.comodin is not None or self.recursivo is not None or self.es_recursivo
+
+
+class PathScopedJsonMatcher:
+    """
+    Clase para agregar descripciones solo en las rutas configuradas por reglas de enriquecimiento,
+    cada una con su propio diccionario de codigos.
+
+    Las rutas son claves separadas por '/', donde '*' es una clave cualquiera y '**' cualquier numero
+    de claves; las listas no cuentan como nivel. Solo se recorren los subarboles que pueden coincidir
+    con alguna regla, por lo que el costo depende de las reglas y no del tamanio del documento.
+    Las transiciones entre estados se guardan en cache por (estado, clave).
+
+    Attributes:
+        reglas (List[Dict[str, Any]]): Reglas con 'ruta', 'codigos' (diccionario) y 'sufijo'.
+    """
+
+    def __init__(self, reglas: List[Dict[str, Any]]) -> None:
+        """
+        Constructor para la clase PathScopedJsonMatcher.
+
+        Parameters:
+            reglas (List[Dict[str, Any]]): Reglas con 'ruta', 'codigos' (diccionario) y 'sufijo' (opcional).
+        """
+        self.reglas = reglas
+        raiz = _NodoRuta()
+        for regla in reglas:
+            nodo = raiz
+            for segmento in regla["ruta"].strip("/").split("/"):
+                if segmento == "**":
+                    if nodo.recursivo is None:
+                        nodo.recursivo = _NodoRuta(es_recursivo=True)
+                    nodo = nodo.recursivo
+                elif segmento == "*":
+                    if nodo.comodin is None:
+                        nodo.comodin = _NodoRuta()
+                    nodo = nodo.comodin
+                else:
+                    nodo = nodo.hijos.setdefault(segmento, _NodoRuta())
+            nodo.terminales.append((regla["codigos"], regla.get("sufijo", "_description")))
+        self._inicial = self._closure({raiz})
+        self._transiciones: Dict[Tuple[FrozenSet[_NodoRuta], str], Tuple[FrozenSet[_NodoRuta], List[Tuple[Dict[str, str], str]], bool]] = {}
+
+    @staticmethod
+    def _closure(nodos: Any) -> FrozenSet[_NodoRuta]:
+        """Agrega los nodos alcanzables sin consumir claves ('**' puede no consumir ninguna)."""
+        pendientes = list(nodos)
+        resultado = set(pendientes)
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo.recursivo is not None and nodo.recursivo not in resultado:
+                resultado.add(nodo.recursivo)
+                pendientes.append(nodo.recursivo)
+        return frozenset(resultado)
+
+    def _step(self, estado: FrozenSet[_NodoRuta], key: str) -> Tuple[FrozenSet[_NodoRuta], List[Tuple[Dict[str, str], str]], bool]:
+        """Devuelve el estado tras consumir 'key', sus diccionarios terminales y si se puede seguir bajando."""
+        transicion = self._transiciones.get((estado, key))
+        if transicion is None:
+            siguientes = set()
+            for nodo in estado:
+                hijo = nodo.hijos.get(key)
+                if hijo is not None:
+                    siguientes.add(hijo)
+                if nodo.comodin is not None:
+                    siguientes.add(nodo.comodin)
+                if nodo.es_recursivo:
+                    siguientes.add(nodo)
+            nuevo_estado = self._closure(siguientes)
+            terminales = [terminal for nodo in nuevo_estado for terminal in nodo.terminales]
+            transicion = (nuevo_estado, terminales, any(nodo.has_transitions() for nodo in nuevo_estado))
+            self._transiciones[(estado, key)] = transicion
+        return transicion
+
+    def add_description(self, data_json: Any, in_place: bool = False) -> Any:
+        """
+        Agrega descripciones en las rutas configuradas.
+
+        Parameters:
+            data_json (Any): JSON al que le agregaran las descripciones.
+            in_place (bool): Modifica 'data_json' en lugar de copiarlo (la copia recorre todo el documento).
+
+        Returns:
+            Any: JSON con las descripciones agregadas ('data_json' si 'in_place' es True).
+        """
+        if not in_place:
+            data_json = copy.deepcopy(data_json)
+
+        step = self._step
+        pila: List[Tuple[Any, FrozenSet[_NodoRuta]]] = [(data_json, self._inicial)]
+        while pila:
+            nodo, estado = pila.pop()
+            if isinstance(nodo, list):
+                pila.extend((value, estado) for value in nodo if isinstance(value, (dict, list)))
+                continue
+            if not isinstance(nodo, dict):
+                continue
+
+            descripciones: Dict[str, Tuple[str, Any]] = {}
+            for key, value in nodo.items():
+                siguiente, terminales, vivo = step(estado, key)
+                if isinstance(value, (dict, list)):
+                    if vivo:
+                        pila.append((value, siguiente))
+                elif terminales and isinstance(value, str):
+                    for codigos, sufijo in terminales:
+                        descripcion = codigos.get(value, _SIN_DESCRIPCION)
+                        if descripcion is not _SIN_DESCRIPCION:
+                            descripciones[key] = (f"{key}{sufijo}", descripcion)
+                            break
+
+            if descripciones:
+                # se reconstruye el diccionario para dejar cada descripcion junto a su clave
+                items = list(nodo.items())
+                nodo.clear()
+                for key, value in items:
+                    nodo[key] = value
+                    if key in descripciones:
+                        nueva_key, descripcion = descripciones[key]
+                        nodo[nueva_key] = descripcion
+        return data_json
@@ -1,22 +1,33 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from mongo_connection import get_client, release_client
 from pymongo import MongoClient
-from pymongo.errors import PyMongoError, OperationFailure, BulkWriteError
+from pymongo.errors import PyMongoError, OperationFailure, BulkWriteError, ConnectionFailure
+from bson import json_util
 from datetime import datetime
+from pathlib import Path
 import logging
+import os
+import queue
+import threading
 import time
 
+TAMANIO_LOTE_REPLAY = 5000
+
 class MongoLoggingDBHandler(logging.Handler):
     """
     Clase handler personalizada para enviar logs a MongoDB.
 
     Attributes:
-        client (MongoClient): Cliente de conexion a conexion a MongoDB.
+        client (Optional[MongoClient]): Cliente de conexion a conexion a MongoDB (compartido con MongoDBHandler, ver 'mongo_connection'; None despues de 'close').
+        mongo_uri (str): Direccion URL para la conexion a MongoDB.
         db_name (str): Nombre de la base de datos en MongoDB.
         collection_logs (str): Nombre de la coleccion para guardar logs.
         buffer (List[Dict[str, Any]]): Buffer para almacenar logs.
         buffer_size (int): Tamanio del buffer (default=40).
         waiting_time (float): Tiempo en segundos de espera entre intentos (default=1).
         max_attempts (int): Numero de veces que se intenta guardar un buffer de logs en caso de error (default=3).
+        archivo_spool (Optional[Path]): Archivo NDJSON donde se guardan los logs mientras MongoDB no esta disponible (None = sin spool).
+        intervalo_reconexion (float): Segundos entre intentos de reconexion mientras se escribe en el spool (default=30).
     """
 
     def __init__(self,
@@ -25,7 +36,9 @@ class MongoLoggingDBHandler(logging.Handler):
                 collection_logs: str,
                 buffer_size: int=40,
                 waiting_time: float=1.0,
-                max_attempts: int=3
+                max_attempts: int=3,
+                archivo_spool: Optional[Path]=None,
+                intervalo_reconexion: float=30.0
                 ) -> None:
         """
         El constructor para la clase MongoLoggingDBHandler.
@@ -37,15 +50,23 @@ class MongoLoggingDBHandler(logging.Handler):
             buffer_size (int): Tamanio del buffer.
             waiting_time (float): Tiempo en segundos de espera entre intentos (default=1).
             max_attempts (int): Numero de veces que se intenta guardar un buffer de logs en caso de error (default=3).
+            archivo_spool (Optional[Path]): Archivo NDJSON donde se guardan los logs mientras MongoDB no esta disponible (None = sin spool).
+            intervalo_reconexion (float): Segundos entre intentos de reconexion mientras se escribe en el spool (default=30).
         """
         super().__init__()
-        self.client: MongoClient=MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
-        self.db_name = self.client[db_name]
+        self.mongo_uri = mongo_uri
+        cliente = get_client(mongo_uri)
+        self.client: Optional[MongoClient] = cliente
+        self.db_name = cliente[db_name]
         self.collection_logs = self.db_name[collection_logs]
         self.buffer: List[Dict[str, Any]]=[]
         self.buffer_size = buffer_size
         self.waiting_time = waiting_time
         self.max_attempts = max_attempts
+        self.archivo_spool = Path(archivo_spool) if archivo_spool else None
+        self.intervalo_reconexion = intervalo_reconexion
+        self._sin_conexion = False
+        self._reconectar_en = 0.0
 
     def emit(self, record: logging.LogRecord) -> None:
         """
@@ -60,16 +81,7 @@ class MongoLoggingDBHandler(logging.Handler):
             Exception: En caso de cualquier otro error.
         """
         try:
-            log_data = {
-                "timestamp": datetime.strptime(record.asctime, '%Y-%m-%d %H:%M:%S'),
-                "level": record.levelname,
-                "module": record.module,
-                "message": record.getMessage(),
-                "function": record.funcName,
-                "line": record.lineno
-            }
-
-            self.buffer.append(log_data)
+            self.buffer.append(self._build_log_data(record))
 
             if len(self.buffer) >= self.buffer_size:
                 self.flush()
@@ -78,6 +90,25 @@ class MongoLoggingDBHandler(logging.Handler):
         except Exception as e:
             print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - ERROR - {__name__} - Error inesperado al procesar el log: {e}")
 
+    def _build_log_data(self, record: logging.LogRecord) -> Dict[str, Any]:
+        """
+        Convierte un registro de log en el documento a guardar. La fecha se toma de 'record.created',
+        por lo que no depende de que un formatter haya calculado 'asctime'; los campos tipados
+        pasados con 'extra={"datos": {...}}' se guardan en 'datos'.
+        """
+        log_data = {
+            "timestamp": datetime.fromtimestamp(record.created),
+            "level": record.levelname,
+            "module": record.module,
+            "message": record.getMessage(),
+            "function": record.funcName,
+            "line": record.lineno
+        }
+        datos = getattr(record, "datos", None)
+        if datos is not None:
+            log_data["datos"] = datos
+        return log_data
+
     def flush(self) -> None:
         """
         Vacia el buffer e inserta estos logs en MongoDB.
@@ -91,11 +122,18 @@ class MongoLoggingDBHandler(logging.Handler):
         if not self.buffer:
             return
 
+        # --- sin conexion: solo se escribe en el spool local hasta el proximo intento de reconexion ---
+        if self._sin_conexion and time.monotonic() < self._reconectar_en:
+            self._write_spool(self.buffer)
+            self.buffer.clear()
+            return
+
         for attempt in range(self.max_attempts + 1):
             try:
                 self.collection_logs.insert_many(self.buffer, ordered=False)
                 print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - INFO - {__name__} - Buffer de {len(self.buffer)} logs guardados correctamente.")
                 self.buffer.clear()
+                self._connection_restored()
                 return
             except (BulkWriteError) as e:
                 indices_fallidos = [error["index"] for error in e.details.get("writeErrors", [])]
@@ -112,6 +150,14 @@ class MongoLoggingDBHandler(logging.Handler):
                     self.buffer.clear()
                     break
 
+            except ConnectionFailure as e:
+                if self.archivo_spool is None:
+                    print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - ERROR - {__name__} - No se pudo guardar el buffer de logs: {e}")
+                    break
+                self._connection_lost(e)
+                self._write_spool(self.buffer)
+                self.buffer.clear()
+                return
             except (OperationFailure, PyMongoError) as e:
                 print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - ERROR - {__name__} - No se pudo guardar el buffer de logs: {e}")
                 break
@@ -119,10 +165,253 @@ class MongoLoggingDBHandler(logging.Handler):
                 print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - ERROR - {__name__} - Error inesperado al procesar el log: {e}")
                 break
 
+    def _connection_lost(self, error: Exception) -> None:
+        """Pasa a escribir en el spool local hasta el proximo intento de reconexion."""
+        if not self._sin_conexion:
+            print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - WARNING - {__name__} - MongoDB no disponible, los logs se guardan en '{self.archivo_spool}': {error}")
+        self._sin_conexion = True
+        self._reconectar_en = time.monotonic() + self.intervalo_reconexion
+
+    def _connection_restored(self) -> None:
+        """Sale del modo sin conexion y reenvia el spool pendiente, si existe."""
+        if self._sin_conexion:
+            print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - INFO - {__name__} - Conexion con MongoDB recuperada.")
+            self._sin_conexion = False
+        if self.archivo_spool is not None and (self.archivo_spool.exists() or self._replay_file().exists()):
+            self._replay_spool()
+
+    def _replay_file(self) -> Path:
+        """Archivo con el spool que se esta reenviando."""
+        return Path(f"{self.archivo_spool}.replay")
+
+    def _write_spool(self, documentos: List[Dict[str, Any]]) -> None:
+        """Agrega los logs al final del spool local, uno por linea (NDJSON extendido de MongoDB)."""
+        try:
+            with open(self.archivo_spool, "a", encoding="utf-8") as spool:  # type: ignore[arg-type]
+                spool.write("".join(f"{json_util.dumps(documento)}\n" for documento in documentos))
+        except OSError as e:
+            print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - ERROR - {__name__} - No se pudo escribir el spool de logs: {e}")
+
+    def _replay_spool(self) -> None:
+        """
+        Reenvia a MongoDB los logs del spool en lotes de 'TAMANIO_LOTE_REPLAY'. Los logs que ya
+        tenian '_id' y llegaron antes se ignoran como duplicados; si la conexion vuelve a fallar,
+        lo que falta reenviar vuelve al spool.
+        """
+        pendiente = self._replay_file()
+        try:
+            if not pendiente.exists():
+                os.replace(self.archivo_spool, pendiente)  # type: ignore[arg-type]
+        except OSError:
+            return
+
+        reenviados = 0
+        with open(pendiente, "r", encoding="utf-8") as archivo:
+            lote: List[str] = []
+            for linea in archivo:
+                if linea.strip():
+                    lote.append(linea)
+                if len(lote) >= TAMANIO_LOTE_REPLAY:
+                    if not self._insert_replay_batch(lote):
+                        self._requeue_spool(lote, archivo)
+                        break
+                    reenviados += len(lote)
+                    lote = []
+            else:
+                if lote and not self._insert_replay_batch(lote):
+                    self._requeue_spool(lote, archivo)
+                else:
+                    reenviados += len(lote)
+        pendiente.unlink(missing_ok=True)
+        print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - INFO - {__name__} - Se reenviaron {reenviados} logs del spool a MongoDB.")
+
+    def _insert_replay_batch(self, lineas: List[str]) -> bool:
+        """Inserta un lote del spool; devuelve False si se perdio la conexion."""
+        documentos = []
+        for linea in lineas:
+            try:
+                documentos.append(json_util.loads(linea))
+            except ValueError:
+                continue
+        try:
+            self.collection_logs.insert_many(documentos, ordered=False)
+        except BulkWriteError as e:
+            errores = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+            if errores:
+                print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - ERROR - {__name__} - No se pudieron reenviar {len(errores)} logs del spool.")
+        except ConnectionFailure as e:
+            self._connection_lost(e)
+            return False
+        except PyMongoError as e:
+            print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - ERROR - {__name__} - No se pudo reenviar el spool de logs: {e}")
+            return False
+        return True
+
+    def _requeue_spool(self, lote: List[str], resto: Any) -> None:
+        """Devuelve al spool el lote que no se pudo reenviar y las lineas que faltaban."""
+        with open(self.archivo_spool, "a", encoding="utf-8") as spool:  # type: ignore[arg-type]
+            spool.writelines(lote)
+            spool.writelines(resto)
+
     def close(self) -> None:
         """
-        Vacia el buffer antes de cerrar el handler.
+        Vacia el buffer antes de cerrar el handler y liberar la conexion.
         """
         self.flush()
-        self.client.close()
+        self._release_client()
         super().close()
+
+    def _release_client(self) -> None:
+        """Libera el cliente compartido (una sola vez, aunque el handler se cierre varias veces)."""
+        if self.client is not None:
+            release_client(self.mongo_uri)
+            self.client = None
+
+
+class AsyncMongoLoggingDBHandler(MongoLoggingDBHandler):
+    """
+    Clase handler para enviar logs a MongoDB sin bloquear a quien escribe el log.
+
+    'emit' solo encola el documento del log; un hilo en segundo plano arma los lotes y los inserta
+    cuando se juntan 'buffer_size' logs o cuando el log mas antiguo del lote espero 'latencia_maxima'
+    segundos. Si la cola esta llena, los logs de nivel menor a WARNING se descartan (y se cuentan) y
+    los de nivel WARNING o mayor esperan hasta 'espera_cola_llena' segundos por espacio. 'close'
+    inserta todo lo encolado antes de cerrar.
+
+    Attributes:
+        tamanio_cola (int): Numero maximo de logs esperando en la cola.
+        latencia_maxima (float): Segundos maximos que un log espera en el lote antes de insertarse.
+        espera_cola_llena (float): Segundos que un log WARNING o mayor espera por espacio en la cola llena.
+        descartados (int): Logs descartados por cola llena.
+    """
+
+    def __init__(self,
+                mongo_uri: str,
+                db_name: str,
+                collection_logs: str,
+                buffer_size: int=40,
+                waiting_time: float=1.0,
+                max_attempts: int=3,
+                archivo_spool: Optional[Path]=None,
+                intervalo_reconexion: float=30.0,
+                tamanio_cola: int=10000,
+                latencia_maxima: float=2.0,
+                espera_cola_llena: float=1.0
+                ) -> None:
+        """
+        El constructor para la clase AsyncMongoLoggingDBHandler.
+
+        Parameters:
+            mongo_uri (str): Direccion URL para la conexion a MongoDB.
+            db_name (str): Nombre de la base de datos en MongoDB.
+            collection_logs (str): Nombre de la coleccion.
+            buffer_size (int): Numero de logs por lote.
+            waiting_time (float): Tiempo en segundos de espera entre intentos (default=1).
+            max_attempts (int): Numero de veces que se intenta guardar un buffer de logs en caso de error (default=3).
+            archivo_spool (Optional[Path]): Archivo NDJSON donde se guardan los logs mientras MongoDB no esta disponible (None = sin spool).
+            intervalo_reconexion (float): Segundos entre intentos de reconexion mientras se escribe en el spool (default=30).
+            tamanio_cola (int): Numero maximo de logs esperando en la cola (default=10000).
+            latencia_maxima (float): Segundos maximos que un log espera en el lote antes de insertarse (default=2).
+            espera_cola_llena (float): Segundos que un log WARNING o mayor espera por espacio en la cola llena (default=1).
+        """
+        super().__init__(mongo_uri, db_name, collection_logs, buffer_size, waiting_time, max_attempts, archivo_spool, intervalo_reconexion)
+        self.tamanio_cola = tamanio_cola
+        self.latencia_maxima = latencia_maxima
+        self.espera_cola_llena = espera_cola_llena
+        self.descartados = 0
+        # propio y no 'self.lock': 'emit' (que ya corre con 'self.lock') puede esperar espacio en la cola
+        # mientras el hilo en segundo plano lee 'descartados'
+        self._bloqueo_descartados = threading.Lock()
+        self._cola: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, tamanio_cola))
+        self._detener = object()
+        self._hilo: Optional[threading.Thread] = threading.Thread(target=self._run, name="mongo-logging", daemon=True)
+        self._hilo.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Encola el documento del log sin esperar a MongoDB.
+
+        Parameters:
+            record (logging.LogRecord): Objeto LogRecord generado por logging.
+        """
+        try:
+            log_data = self._build_log_data(record)
+        except Exception as e:
+            print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - ERROR - {__name__} - Error inesperado al procesar el log: {e}")
+            return
+
+        try:
+            if record.levelno >= logging.WARNING:
+                self._cola.put(log_data, timeout=self.espera_cola_llena)
+            else:
+                self._cola.put_nowait(log_data)
+        except queue.Full:
+            with self._bloqueo_descartados:
+                self.descartados += 1
+
+    def _run(self) -> None:
+        """Hilo en segundo plano: arma lotes por cantidad y por latencia maxima y los inserta."""
+        limite: Optional[float] = None
+        while True:
+            espera = None if limite is None else max(0.0, limite - time.monotonic())
+            try:
+                elemento = self._cola.get(timeout=espera)
+            except queue.Empty:
+                elemento = None
+
+            if elemento is self._detener:
+                self._insert_pending()
+                return
+            if isinstance(elemento, threading.Event):
+                self._insert_pending()
+                elemento.set()
+                limite = None
+                continue
+            if elemento is not None:
+                if not self.buffer:
+                    limite = time.monotonic() + self.latencia_maxima
+                self.buffer.append(elemento)
+
+            if self.buffer and (len(self.buffer) >= self.buffer_size or time.monotonic() >= (limite or 0)):
+                self._insert_pending()
+                limite = None
+
+    def _insert_pending(self) -> None:
+        """Inserta el lote pendiente (y un aviso si se descartaron logs) desde el hilo en segundo plano."""
+        with self._bloqueo_descartados:
+            descartados, self.descartados = self.descartados, 0
+        if descartados:
+            self.buffer.append({
+                "timestamp": datetime.now(),
+                "level": "WARNING",
+                "module": __name__,
+                "message": f"Se descartaron {descartados} logs por cola llena.",
+                "function": "emit",
+                "line": 0
+            })
+        super().flush()
+
+    def flush(self) -> None:
+        """
+        Pide al hilo en segundo plano insertar lo encolado hasta ahora y espera a que termine
+        (como maximo 'latencia_maxima' mas el tiempo de los reintentos).
+        """
+        if self._hilo is None or not self._hilo.is_alive():
+            return
+        listo = threading.Event()
+        try:
+            self._cola.put(listo, timeout=self.espera_cola_llena)
+        except queue.Full:
+            return
+        listo.wait(timeout=self.latencia_maxima + self.waiting_time * (self.max_attempts + 1) + 5)
+
+    def close(self) -> None:
+        """
+        Detiene el hilo en segundo plano despues de insertar todo lo encolado y libera la conexion.
+        """
+        if self._hilo is not None:
+            self._cola.put(self._detener)
+            self._hilo.join()
+            self._hilo = None
+        self._release_client()
+        logging.Handler.close(self)
@@ -1,5 +1,6 @@
-from log_db_handler import MongoLoggingDBHandler
+from log_db_handler import MongoLoggingDBHandler, AsyncMongoLoggingDBHandler
 from dotenv import load_dotenv
+from typing import Any, Dict
 import logging
 import sys
 import os
@@ -8,15 +9,27 @@ load_dotenv(override=True)
 def configuracion_logging(level=logging.INFO) -> None:
     """Configuracion del logging para toda la aplicacion"""
 
-    mongo_handler = MongoLoggingDBHandler(
+    parametros_mongo: Dict[str, Any] = dict(
         mongo_uri=os.getenv("CONNECTION_URL_MONGO", ""),
         db_name=os.getenv("DB_NAME", "BOA_VUELOS"),
         collection_logs="LOGS_PROCESADOS",
         buffer_size=int(os.getenv("BUFFER_SIZE_LOGS", 40)),
         waiting_time=float(os.getenv("WAITING_TIME", 1)),
-        max_attempts=int(os.getenv("MAX_ATTEMPTS", 3))
+        max_attempts=int(os.getenv("MAX_ATTEMPTS", 3)),
+        archivo_spool=os.getenv("LOGS_SPOOL", "logs_spool.ndjson") or None,
+        intervalo_reconexion=float(os.getenv("LOGS_INTERVALO_RECONEXION", 30))
     )
 
+    # --- handler en segundo plano (opcional, LOGS_ASINCRONO): el log solo se encola y no espera a MongoDB ---
+    if os.getenv("LOGS_ASINCRONO", "false").strip().lower() in ("1", "true", "si"):
+        mongo_handler: MongoLoggingDBHandler = AsyncMongoLoggingDBHandler(
+            **parametros_mongo,
+            tamanio_cola=int(os.getenv("LOGS_TAMANIO_COLA", 10000)),
+            latencia_maxima=float(os.getenv("LOGS_LATENCIA_MAXIMA", 2))
+        )
+    else:
+        mongo_handler = MongoLoggingDBHandler(**parametros_mongo)
+
     logging.basicConfig(
         level=level,
         format='%(asctime)s - %(levelname)s - %(module)s - %(message)s',
@@ -1,6 +1,6 @@
 import time
 import logging
-from automation_process import AutomationProcess
+from automation_process import AutomationProcess, MODO_VIGILANCIA
 from logger_config import configuracion_logging
 
 if __name__ == "__main__":
@@ -9,7 +9,7 @@ if __name__ == "__main__":
     tiempo_inicio = time.perf_counter()
 
     procesador = AutomationProcess()
-    resultados = procesador.ejecutar()
+    resultados = procesador.vigilar() if MODO_VIGILANCIA else procesador.ejecutar()
 
     tiempo_final = time.perf_counter()
     tiempo_transcurrido = tiempo_final - tiempo_inicio
@@ -23,3 +23,6 @@ if __name__ == "__main__":
     logging.info(
         f"Tiempo total de ejecucion: {int(horas):02d}h {int(minutos):02d}m {segundos:.4f}s"
     )
+
+    # --- vacia los logs pendientes y libera la conexion compartida (el pool se cierra al final) ---
+    logging.shutdown()
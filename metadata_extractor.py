@@ -1,6 +1,8 @@
 from pathlib import Path
 from datetime import datetime
 from standard_response import StandardResponse
+from decompress import TarMember
+from xml_to_dict import FusionItem
 
 class MetadataExtractor:
     """
@@ -62,3 +64,76 @@ class MetadataExtractor:
                 message=f"Error inesperado al extraer metadatos del archivo '{file.name}'.",
                 error_details=str(e)
             )
+
+    def metadata_from_member(self, member: TarMember) -> StandardResponse:
+        """
+        Extrae los metadatos de un miembro leido en streaming desde la cabecera 'TarInfo'.
+
+        La cabecera del TAR solo guarda la fecha de modificacion, por lo que tambien se usa
+        como fecha de creacion.
+
+        Parameters:
+            member (TarMember): Miembro del archivo TAR.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Raises:
+            Exception: Si ocurre un error inesperado al extraer los metadatos.
+        """
+        try:
+            fecha_modificacion = datetime.fromtimestamp(member.tarinfo.mtime).strftime("%Y-%m-%d %H:%M:%S")
+            metadatos = {
+                "nombre_archivo": member.nombre,
+                "tamanio_archivo": len(member.contenido),
+                "fecha_creacion": fecha_modificacion,
+                "fecha_modificacion": fecha_modificacion,
+                "tipo_archivo": member.suffix
+            }
+            return StandardResponse(
+                success=True,
+                data=metadatos,
+                message=f"Metadatos extraidos de '{member.nombre}' correctamente."
+            )
+        except Exception as e:
+            return StandardResponse(
+                success=False,
+                message=f"Error inesperado al extraer metadatos del archivo '{member.nombre}'.",
+                error_details=str(e)
+            )
+
+    def metadata_from_fusion(self, fusion_item: FusionItem) -> StandardResponse:
+        """
+        Extrae los metadatos de un par original / complemento fusionado en memoria.
+
+        El tamanio es la suma de ambos archivos y las fechas son las del archivo original.
+
+        Parameters:
+            fusion_item (FusionItem): Par original / complemento.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+        """
+        if isinstance(fusion_item.original, TarMember):
+            resultado = self.metadata_from_member(fusion_item.original)
+        else:
+            resultado = self.metadata_extractor(fusion_item.original)
+        if not resultado.success or resultado.data is None:
+            return resultado
+
+        try:
+            if isinstance(fusion_item.complemento, TarMember):
+                tamanio_complemento = len(fusion_item.complemento.contenido)
+            else:
+                tamanio_complemento = fusion_item.complemento.stat().st_size
+
+            resultado.data["nombre_archivo"] = fusion_item.nombre
+            resultado.data["tamanio_archivo"] += tamanio_complemento
+            resultado.message = f"Metadatos extraidos de '{fusion_item.nombre}' correctamente."
+            return resultado
+        except OSError as e:
+            return StandardResponse(
+                success=False,
+                message=f"Error al extraer metadatos del archivo '{fusion_item.nombre}'.",
+                error_details=str(e)
+            )
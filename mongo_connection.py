@@ -0,0 +1,88 @@
+from pymongo import MongoClient
+from typing import Any, Callable, Dict, Set, Tuple
+import os
+import threading
+
+# Un solo MongoClient (un pool de conexiones y un juego de hilos de monitoreo) por URI,
+# compartido por MongoDBHandler y MongoLoggingDBHandler
+_clientes: Dict[str, MongoClient] = {}
+_referencias: Dict[str, int] = {}
+# tareas ya ejecutadas con cada cliente ('run_once') y el bloqueo de cada una
+_ejecutadas: Dict[str, Set[str]] = {}
+_bloqueos_tareas: Dict[Tuple[str, str], threading.Lock] = {}
+_bloqueo = threading.Lock()
+
+def get_client(mongo_uri: str) -> MongoClient:
+    """
+    Devuelve el cliente compartido para 'mongo_uri' y lo crea si todavia no existe.
+
+    El cliente se crea sin conectarse ('connect=False'): la seleccion del servidor ocurre en la
+    primera operacion, por lo que crear los handlers no bloquea el inicio. El tamanio del pool se
+    toma de MONGO_MAX_POOL_SIZE y MONGO_MIN_POOL_SIZE.
+
+    Cada llamada debe tener su 'release_client'; el cliente se cierra al liberar la ultima referencia.
+
+    Parameters:
+        mongo_uri (str): Direccion URL para la conexion a MongoDB.
+
+    Returns:
+        MongoClient: Cliente de conexion a MongoDB.
+    """
+    with _bloqueo:
+        cliente = _clientes.get(mongo_uri)
+        if cliente is None:
+            cliente = MongoClient(
+                mongo_uri,
+                serverSelectionTimeoutMS=5000,
+                maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", 10)),
+                minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", 2)),
+                connect=False
+            )
+            _clientes[mongo_uri] = cliente
+            _referencias[mongo_uri] = 0
+        _referencias[mongo_uri] += 1
+        return cliente
+
+def release_client(mongo_uri: str) -> None:
+    """
+    Libera una referencia al cliente de 'mongo_uri' y lo cierra si era la ultima.
+
+    Como el handler de logs libera su referencia al cerrarse (despues de vaciar su buffer), el
+    pool sigue abierto para los ultimos logs aunque el proceso ya haya llamado a 'disconnect'.
+
+    Parameters:
+        mongo_uri (str): Direccion URL para la conexion a MongoDB.
+    """
+    with _bloqueo:
+        if mongo_uri not in _referencias:
+            return
+        _referencias[mongo_uri] -= 1
+        if _referencias[mongo_uri] > 0:
+            return
+        del _referencias[mongo_uri]
+        _ejecutadas.pop(mongo_uri, None)
+        for clave in [clave for clave in _bloqueos_tareas if clave[0] == mongo_uri]:
+            del _bloqueos_tareas[clave]
+        cliente = _clientes.pop(mongo_uri)
+    cliente.close()
+
+def run_once(mongo_uri: str, tarea: str, funcion: Callable[[], Any]) -> None:
+    """
+    Ejecuta 'funcion' una sola vez por cliente compartido de 'mongo_uri' y 'tarea' (por ejemplo,
+    verificar los indices de una base de datos). Las llamadas concurrentes con la misma tarea
+    esperan a que termine la primera; al cerrarse el cliente se olvidan las tareas ejecutadas.
+
+    Parameters:
+        mongo_uri (str): Direccion URL para la conexion a MongoDB.
+        tarea (str): Identificador de la tarea.
+        funcion (Callable[[], Any]): Tarea a ejecutar.
+    """
+    with _bloqueo:
+        bloqueo_tarea = _bloqueos_tareas.setdefault((mongo_uri, tarea), threading.Lock())
+    with bloqueo_tarea:
+        with _bloqueo:
+            if tarea in _ejecutadas.get(mongo_uri, set()):
+                return
+        funcion()
+        with _bloqueo:
+            _ejecutadas.setdefault(mongo_uri, set()).add(tarea)
@@ -1,17 +1,29 @@
 from standard_response import StandardResponse
+from mongo_connection import get_client, release_client, run_once
+from content_codec import decode_document
 from pymongo import MongoClient
-from pymongo.errors import PyMongoError, ConnectionFailure, ServerSelectionTimeoutError, OperationFailure
-from typing import Dict, List, Any
+from pymongo.errors import PyMongoError, ConnectionFailure, ServerSelectionTimeoutError, OperationFailure, BulkWriteError
+from typing import Dict, List, Any, Iterable, Optional, Set
+from datetime import datetime
+import logging
+
+MAX_NOMBRES_POR_CONSULTA = 10000
+# Errores de escritura que no se resuelven reintentando (valor invalido, validacion, documento muy grande)
+CODIGOS_NO_REINTENTABLES = {2, 121, 10334}
 
 class MongoDBHandler:
     """
     Clase handler para interactuar y operar con la base de datos MongoDB.
 
     Attributes:
-        client (MongoClient): Cliente de conexion a MongoDB.
+        client (Optional[MongoClient]): Cliente de conexion a MongoDB (compartido con el handler de logs, ver 'mongo_connection'; None despues de 'disconnect').
+        mongo_uri (str): Direccion URL para la conexion a MongoDB.
         db_name (str): Nombre de la base de datos en MongoDB.
         collection_tar (str): Nombre de la coleccion para guardar metadatos de archivos TAR.
         collection_json (str): Nombre de la coleccion para guardar metadatos de los archivos JSON.
+        collection_members (str): Nombre de la coleccion con los hashes de los miembros .DATA ya ingeridos.
+        collection_runs (str): Nombre de la coleccion con el resumen de cada ejecucion.
+        collection_checkpoints (str): Nombre de la coleccion con los archivos ya guardados de cada TAR en curso.
     """
 
     def __init__(self,
@@ -19,6 +31,9 @@ class MongoDBHandler:
                 db_name: str,
                 collection_tar: str,
                 collection_json: str,
+                collection_members: str = "MIEMBROS_PROCESADOS",
+                collection_runs: str = "EJECUCIONES",
+                collection_checkpoints: str = "PUNTOS_CONTROL"
                 ) -> None:
         """
         Constructor para la clase MongoDBHandler.
@@ -28,11 +43,19 @@ class MongoDBHandler:
             db_name (str): Nombre de la base de datos en MongoDB.
             collection_tar (str): Nombre de la coleccion para guardar metadatos de archivos TAR.
             collection_json (str): Nombre de la coleccion para guardar metadatos de los archivos JSON.
+            collection_members (str): Nombre de la coleccion con los hashes de los miembros .DATA ya ingeridos.
+            collection_runs (str): Nombre de la coleccion con el resumen de cada ejecucion.
+            collection_checkpoints (str): Nombre de la coleccion con los archivos ya guardados de cada TAR en curso.
         """
-        self.client: MongoClient=MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
-        self.db_name = self.client[db_name]
+        self.mongo_uri = mongo_uri
+        cliente = get_client(mongo_uri)
+        self.client: Optional[MongoClient] = cliente
+        self.db_name = cliente[db_name]
         self.collection_tar = self.db_name[collection_tar]
         self.collection_json = self.db_name[collection_json]
+        self.collection_members = self.db_name[collection_members]
+        self.collection_runs = self.db_name[collection_runs]
+        self.collection_checkpoints = self.db_name[collection_checkpoints]
 
     def check_connect(self) -> StandardResponse:
         """
@@ -46,6 +69,11 @@ class MongoDBHandler:
             ConnectionFailure: Si no se puede establecer una conexion con el servidor.
             PyMongoError: Para cualquier otro error relacionado con PyMongo.
         """
+        if not self.client:
+            return StandardResponse(
+                success=False,
+                message="No hay una conexion establecida con MongoDB.",
+            )
         try:
             self.client.admin.command("ping")
             return StandardResponse(
@@ -63,6 +91,12 @@ class MongoDBHandler:
         """
         Guarda los documentos en una coleccion de MongoDB.
 
+        Si la insercion falla, 'data' indica que documentos quedaron guardados y cuales fallaron:
+        {"inserted_ids": [...], "retry_indices": [...], "failed_indices": [...]}, con los indices
+        referidos a 'documents'. Un '_id' duplicado se cuenta como guardado (el documento ya llego
+        en un intento anterior); los errores en 'CODIGOS_NO_REINTENTABLES' y las demas claves
+        duplicadas van a 'failed_indices' y el resto a 'retry_indices'.
+
         Parameters:
             documents (List[Dict[str, Any]]): Lista de diccionarios a guardar.
 
@@ -70,18 +104,21 @@ class MongoDBHandler:
             StandardResponse: Clase estandar para encapsular respuestas de funciones.
 
         Raises:
+            BulkWriteError: Si fallan algunos documentos de la insercion.
             OperationFailure: Si falla la operacion con la base de datos.
             PyMongoError: Para cualquier otro error relacionado con PyMongo.
         """
         if not self.client:
             return StandardResponse(
                 success=False,
+                data={"inserted_ids": [], "retry_indices": [], "failed_indices": list(range(len(documents)))},
                 message="No hay una conexion establecida con MongoDB.",
             )
 
         if not documents:
             return StandardResponse(
                 success=True,
+                data=[],
                 message="Buffer de documentos vacio. No se realizaron inserciones."
             )
 
@@ -92,13 +129,49 @@ class MongoDBHandler:
                 data=resultado.inserted_ids,
                 message=f"Se insertaron {len(resultado.inserted_ids)} documentos en '{self.collection_json.name}'"
             )
+        except BulkWriteError as e:
+            errores = e.details.get("writeErrors", [])
+            indices_error = {error["index"] for error in errores}
+            inserted_ids = [documents[i].get("_id") for i in range(len(documents)) if i not in indices_error]
+            retry_indices: List[int] = []
+            failed_indices: List[int] = []
+            for error in errores:
+                if error.get("code") == 11000 and self._is_duplicated_id(error):
+                    inserted_ids.append(documents[error["index"]].get("_id"))
+                elif error.get("code") == 11000 or error.get("code") in CODIGOS_NO_REINTENTABLES:
+                    failed_indices.append(error["index"])
+                else:
+                    retry_indices.append(error["index"])
+            if not retry_indices and not failed_indices:
+                return StandardResponse(
+                    success=True,
+                    data=inserted_ids,
+                    message=f"Se insertaron {len(inserted_ids)} documentos en '{self.collection_json.name}' (algunos ya existian)."
+                )
+            return StandardResponse(
+                success=False,
+                data={"inserted_ids": inserted_ids, "retry_indices": sorted(retry_indices), "failed_indices": sorted(failed_indices)},
+                message=f"Se insertaron {len(inserted_ids)} de {len(documents)} documentos en '{self.collection_json.name}'.",
+                error_details="; ".join(
+                    f"[{error['index']}] {error.get('code')}: {error.get('errmsg')}"
+                    for error in errores if error["index"] in retry_indices or error["index"] in failed_indices
+                )[:2000]
+            )
         except (OperationFailure, PyMongoError) as e:
             return StandardResponse(
                 success=False,
+                data={"inserted_ids": [], "retry_indices": list(range(len(documents))), "failed_indices": []},
                 message="Error al guardar los documentos en MongoDB.",
                 error_details=str(e)
             )
 
+    @staticmethod
+    def _is_duplicated_id(error: Dict[str, Any]) -> bool:
+        """Indica si un error de clave duplicada corresponde al indice de '_id'."""
+        if error.get("keyPattern"):
+            return error["keyPattern"] == {"_id": 1}
+        return " _id_ " in error.get("errmsg", "")
+
     def check_processed_tar_file(self, file_name: str) -> StandardResponse:
         """
         Verifica en MongoDB si un archivo TAR ya fue procesado.
@@ -135,6 +208,216 @@ class MongoDBHandler:
                 error_details=str(e)
             )
 
+    def check_processed_tar_files(self, file_names: Iterable[str]) -> StandardResponse:
+        """
+        Verifica en MongoDB, con una sola consulta '$in' (por cada bloque de nombres), cuales
+        archivos TAR ya fueron procesados.
+
+        Parameters:
+            file_names (Iterable[str]): Nombres de los archivos TAR a verificar.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Exceptions:
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+        """
+        if not self.client:
+            return StandardResponse(
+                success=False,
+                message="No hay una conexion establecida con MongoDB.",
+            )
+
+        nombres = list(dict.fromkeys(file_names))
+        procesados: Set[str] = set()
+        try:
+            for i in range(0, len(nombres), MAX_NOMBRES_POR_CONSULTA):
+                bloque = nombres[i:i + MAX_NOMBRES_POR_CONSULTA]
+                cursor = self.collection_tar.find({"nombre": {"$in": bloque}}, {"nombre": 1, "_id": 0})
+                procesados.update(documento["nombre"] for documento in cursor)
+            return StandardResponse(
+                success=True,
+                data=procesados,
+                message=f"{len(procesados)} de {len(nombres)} archivos TAR ya fueron procesados previamente."
+            )
+        except (OperationFailure, PyMongoError) as e:
+            return StandardResponse(
+                success=False,
+                message="Error al verificar los archivos TAR procesados en MongoDB.",
+                error_details=str(e)
+            )
+
+    def ensure_indexes(self) -> StandardResponse:
+        """
+        Crea (si no existe) el indice unico sobre 'nombre' en la coleccion de archivos TAR.
+        Si la coleccion ya tiene nombres duplicados, crea el indice sin la restriccion de unicidad.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Exceptions:
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+        """
+        try:
+            try:
+                self.collection_tar.create_index("nombre", unique=True, name="nombre_unico")
+                mensaje = f"Indice unico sobre 'nombre' verificado en '{self.collection_tar.name}'."
+            except OperationFailure as e:
+                if e.code not in (11000, 85, 86):
+                    raise
+                self.collection_tar.create_index("nombre", name="nombre")
+                mensaje = f"'{self.collection_tar.name}' tiene nombres duplicados o un indice previo; se verifico un indice no unico sobre 'nombre'."
+            self.collection_tar.create_index("hash", name="hash", sparse=True)
+            self.collection_members.create_index("hash", unique=True, name="hash_unico")
+            self.collection_checkpoints.create_index("tar", name="tar")
+            return StandardResponse(
+                success=True,
+                message=mensaje
+            )
+        except (OperationFailure, PyMongoError) as e:
+            return StandardResponse(
+                success=False,
+                message=f"Error al crear los indices de '{self.collection_tar.name}'.",
+                error_details=str(e)
+            )
+
+    def _ensure_indexes_once(self) -> None:
+        """
+        Verifica los indices ('ensure_indexes') antes de la primera escritura que los usa, una sola vez
+        por cliente compartido y coleccion de archivos TAR, para no hacerlo al iniciar cada proceso.
+        """
+        def _crear() -> None:
+            indices = self.ensure_indexes()
+            if indices.success:
+                logging.info(indices.message)
+            else:
+                logging.warning(f"{indices.message} {indices.error_details}")
+
+        run_once(self.mongo_uri, f"indices:{self.db_name.name}.{self.collection_tar.name}", _crear)
+
+    def check_processed_tar_hash(self, tar_hash: str) -> StandardResponse:
+        """
+        Verifica en MongoDB si ya se proceso un archivo TAR con el mismo contenido (hash), aunque tenga otro nombre.
+
+        Parameters:
+            tar_hash (str): Hash del contenido del archivo TAR.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Exceptions:
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+        """
+        if not self.client:
+            return StandardResponse(
+                success=False,
+                message="No hay una conexion establecida con MongoDB.",
+            )
+
+        try:
+            resultado = self.collection_tar.find_one({"hash": tar_hash}, {"nombre": 1, "_id": 0})
+            return StandardResponse(
+                success=True,
+                data=resultado,
+                message=f"Ya se proceso un archivo con el mismo contenido: '{resultado['nombre']}'." if resultado else "No se proceso ningun archivo con el mismo contenido."
+            )
+        except (OperationFailure, PyMongoError) as e:
+            return StandardResponse(
+                success=False,
+                message="Error al verificar el hash del archivo TAR en MongoDB.",
+                error_details=str(e)
+            )
+
+    def check_processed_member_hashes(self, member_hashes: Iterable[str]) -> StandardResponse:
+        """
+        Verifica en MongoDB cuales miembros .DATA (por hash de contenido) ya fueron ingeridos.
+
+        Parameters:
+            member_hashes (Iterable[str]): Hashes de los miembros a verificar.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Exceptions:
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+        """
+        if not self.client:
+            return StandardResponse(
+                success=False,
+                message="No hay una conexion establecida con MongoDB.",
+            )
+
+        hashes = list(dict.fromkeys(member_hashes))
+        ingeridos: Set[str] = set()
+        try:
+            for i in range(0, len(hashes), MAX_NOMBRES_POR_CONSULTA):
+                bloque = hashes[i:i + MAX_NOMBRES_POR_CONSULTA]
+                cursor = self.collection_members.find({"hash": {"$in": bloque}}, {"hash": 1, "_id": 0})
+                ingeridos.update(documento["hash"] for documento in cursor)
+            return StandardResponse(
+                success=True,
+                data=ingeridos,
+                message=f"{len(ingeridos)} de {len(hashes)} miembros ya fueron ingeridos previamente."
+            )
+        except (OperationFailure, PyMongoError) as e:
+            return StandardResponse(
+                success=False,
+                message="Error al verificar los hashes de los miembros en MongoDB.",
+                error_details=str(e)
+            )
+
+    def save_processed_members(self, members: List[Dict[str, Any]]) -> StandardResponse:
+        """
+        Guarda en MongoDB los hashes de los miembros .DATA ingeridos. Los hashes ya registrados se ignoran.
+
+        Parameters:
+            members (List[Dict[str, Any]]): Lista de diccionarios con 'hash', 'nombre' y 'tar'.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Exceptions:
+            BulkWriteError: Si algun hash ya estaba registrado (se ignora).
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+        """
+        if not members:
+            return StandardResponse(
+                success=True,
+                data=0,
+                message="No hay hashes de miembros para registrar."
+            )
+
+        self._ensure_indexes_once()
+        try:
+            resultado = self.collection_members.insert_many(members, ordered=False)
+            registrados = len(resultado.inserted_ids)
+        except BulkWriteError as e:
+            errores = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errores):
+                return StandardResponse(
+                    success=False,
+                    message="Error al registrar los hashes de los miembros en MongoDB.",
+                    error_details=str(e)
+                )
+            registrados = e.details.get("nInserted", 0)
+        except (OperationFailure, PyMongoError) as e:
+            return StandardResponse(
+                success=False,
+                message="Error al registrar los hashes de los miembros en MongoDB.",
+                error_details=str(e)
+            )
+
+        return StandardResponse(
+            success=True,
+            data=registrados,
+            message=f"Se registraron {registrados} hashes de miembros en '{self.collection_members.name}'."
+        )
+
     def save_processed_tar_file(self, diccionario_data: Dict[str, Any]) -> StandardResponse:
         """
         Guarda metadatos del archivo TAR procesado en MongoDB.
@@ -155,6 +438,7 @@ class MongoDBHandler:
                 message="No hay una conexion establecida con MongoDB.",
             )
 
+        self._ensure_indexes_once()
         try:
             resultado = self.collection_tar.insert_one(diccionario_data)
             return StandardResponse(
@@ -169,16 +453,186 @@ class MongoDBHandler:
                 error_details=str(e)
             )
 
+    def find_documents(self, filtro: Dict[str, Any], limite: int = 0) -> StandardResponse:
+        """
+        Consulta documentos de la coleccion JSON y descomprime 'contenido' de los que se guardaron
+        comprimidos (COMPRESION_CONTENIDO), de modo que todos tienen la forma del formato sin comprimir.
+        Los metadatos no se comprimen, por lo que 'filtro' puede usar cualquiera de ellos.
+
+        Parameters:
+            filtro (Dict[str, Any]): Filtro de la consulta (por ejemplo, {"nombre_archivo": ...}).
+            limite (int): Numero maximo de documentos (0 = sin limite).
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones (la lista de documentos en 'data').
+
+        Exceptions:
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+            ValueError: Si un documento tiene un codec de compresion no valido.
+        """
+        try:
+            documentos = [decode_document(documento) for documento in self.collection_json.find(filtro).limit(limite)]
+            return StandardResponse(
+                success=True,
+                data=documentos,
+                message=f"Se encontraron {len(documentos)} documentos en '{self.collection_json.name}'."
+            )
+        except (OperationFailure, PyMongoError, ValueError) as e:
+            return StandardResponse(
+                success=False,
+                data=[],
+                message=f"Error al consultar los documentos de '{self.collection_json.name}'.",
+                error_details=str(e)
+            )
+
+    def load_checkpoint(self, tar_name: str) -> StandardResponse:
+        """
+        Consulta los archivos de un TAR que ya se guardaron en una ejecucion anterior que no termino.
+
+        Parameters:
+            tar_name (str): Nombre del archivo TAR.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones (el conjunto de nombres en 'data').
+
+        Exceptions:
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+        """
+        try:
+            cursor = self.collection_checkpoints.find({"tar": tar_name}, {"miembro": 1, "_id": 0})
+            miembros = {documento["miembro"] for documento in cursor}
+            return StandardResponse(
+                success=True,
+                data=miembros,
+                message=f"TAR '{tar_name}': {len(miembros)} archivos guardados en una ejecucion anterior."
+            )
+        except (OperationFailure, PyMongoError) as e:
+            return StandardResponse(
+                success=False,
+                data=set(),
+                message=f"Error al consultar el punto de control del TAR '{tar_name}'.",
+                error_details=str(e)
+            )
+
+    def save_checkpoint(self, tar_name: str, members: List[str]) -> StandardResponse:
+        """
+        Registra archivos de un TAR cuyos documentos ya se guardaron. Los ya registrados se ignoran.
+
+        Parameters:
+            tar_name (str): Nombre del archivo TAR.
+            members (List[str]): Nombres de los archivos guardados.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Exceptions:
+            BulkWriteError: Si algun archivo ya estaba registrado (se ignora).
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+        """
+        if not members:
+            return StandardResponse(success=True, data=0, message="No hay archivos para el punto de control.")
+
+        fecha = datetime.now()
+        documentos = [{"_id": f"{tar_name}/{miembro}", "tar": tar_name, "miembro": miembro, "fecha": fecha} for miembro in members]
+        self._ensure_indexes_once()
+        try:
+            registrados = len(self.collection_checkpoints.insert_many(documentos, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                return StandardResponse(
+                    success=False,
+                    message=f"Error al guardar el punto de control del TAR '{tar_name}'.",
+                    error_details=str(e)
+                )
+            registrados = e.details.get("nInserted", 0)
+        except (OperationFailure, PyMongoError) as e:
+            return StandardResponse(
+                success=False,
+                message=f"Error al guardar el punto de control del TAR '{tar_name}'.",
+                error_details=str(e)
+            )
+        return StandardResponse(
+            success=True,
+            data=registrados,
+            message=f"TAR '{tar_name}': {registrados} archivos agregados al punto de control."
+        )
+
+    def clear_checkpoint(self, tar_name: str) -> StandardResponse:
+        """
+        Borra el punto de control de un TAR ya registrado en la coleccion de TAR procesados.
+
+        Parameters:
+            tar_name (str): Nombre del archivo TAR.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Exceptions:
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+        """
+        try:
+            resultado = self.collection_checkpoints.delete_many({"tar": tar_name})
+            return StandardResponse(
+                success=True,
+                data=resultado.deleted_count,
+                message=f"Punto de control del TAR '{tar_name}' borrado ({resultado.deleted_count} archivos)."
+            )
+        except (OperationFailure, PyMongoError) as e:
+            return StandardResponse(
+                success=False,
+                message=f"Error al borrar el punto de control del TAR '{tar_name}'.",
+                error_details=str(e)
+            )
+
+    def save_run_summary(self, resumen: Dict[str, Any]) -> StandardResponse:
+        """
+        Guarda en MongoDB el resumen de una ejecucion (conteos y tiempos por etapa).
+
+        Parameters:
+            resumen (Dict[str, Any]): Diccionario con el resumen de la ejecucion.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Exceptions:
+            OperationFailure: Si falla la operacion con la base de datos.
+            PyMongoError: Para cualquier otro error relacionado con PyMongo.
+        """
+        if not self.client:
+            return StandardResponse(
+                success=False,
+                message="No hay una conexion establecida con MongoDB.",
+            )
+
+        try:
+            resultado = self.collection_runs.insert_one(dict(resumen))
+            return StandardResponse(
+                success=True,
+                data=resultado.inserted_id,
+                message=f"Resumen de la ejecucion guardado en '{self.collection_runs.name}'."
+            )
+        except (OperationFailure, PyMongoError) as e:
+            return StandardResponse(
+                success=False,
+                message="Error al guardar el resumen de la ejecucion en MongoDB.",
+                error_details=str(e)
+            )
+
     def disconnect(self) -> StandardResponse:
         """
-        Cierra la conexion con MongoDB.
+        Libera la conexion con MongoDB. El pool se cierra cuando tambien lo libera el handler de logs.
 
         Returns:
             StandardResponse: Clase estandar para encapsular respuestas de funciones.
         """
         try:
             if self.client:
-                self.client.close()
+                release_client(self.mongo_uri)
+                self.client = None
             return StandardResponse(
                 success=True,
                 message="Conexion cerrada a MongoDB."
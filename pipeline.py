@@ -0,0 +1,132 @@
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+from functools import partial
+import threading
+import queue
+
+class _Fin:
+    """Marca de fin de una cola entre etapas."""
+
+FIN = _Fin()
+
+def _descartar(elemento: Any) -> None:
+    """'emitir' de la ultima etapa: no hay cola de salida."""
+
+class PipelineDetenido(Exception):
+    """Se lanza al emitir o consumir cuando otra etapa del pipeline fallo."""
+
+class StagedPipeline:
+    """
+    Clase para ejecutar etapas encadenadas por colas acotadas, cada una con sus propios hilos.
+
+    Cada etapa es una funcion 'etapa(entrada, emitir)' que consume los elementos de 'entrada'
+    y entrega sus resultados a la siguiente etapa con 'emitir'. Las colas acotadas dan
+    contrapresion: si una etapa se atrasa, las anteriores se bloquean al emitir. Si una etapa
+    falla, se detienen todas y 'run' vuelve a lanzar el primer error.
+
+    Attributes:
+        tamanio_cola (int): Numero maximo de elementos en cada cola entre etapas.
+    """
+
+    def __init__(self, tamanio_cola: int = 100) -> None:
+        """
+        Constructor para la clase StagedPipeline.
+
+        Parameters:
+            tamanio_cola (int): Numero maximo de elementos en cada cola entre etapas.
+        """
+        self.tamanio_cola = tamanio_cola
+        self._etapas: List[Any] = []
+        self._detener = threading.Event()
+        self._errores: List[BaseException] = []
+
+    def add_stage(self, nombre: str, etapa: Callable[[Iterator[Any], Callable[[Any], None]], None], concurrencia: int = 1) -> "StagedPipeline":
+        """
+        Agrega una etapa al final del pipeline.
+
+        Parameters:
+            nombre (str): Nombre de la etapa (se usa en el nombre de los hilos).
+            etapa (Callable): Funcion 'etapa(entrada, emitir)'.
+            concurrencia (int): Numero de hilos que ejecutan la etapa sobre la misma cola de entrada.
+
+        Returns:
+            StagedPipeline: El mismo pipeline, para encadenar llamadas.
+        """
+        self._etapas.append((nombre, etapa, max(1, concurrencia)))
+        return self
+
+    def _put(self, cola: "queue.Queue[Any]", elemento: Any) -> None:
+        """Agrega un elemento a la cola esperando espacio, salvo que el pipeline se haya detenido."""
+        while not self._detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise PipelineDetenido("Pipeline detenido.")
+
+    def _iter_queue(self, cola: "queue.Queue[Any]") -> Iterator[Any]:
+        """Recorre una cola hasta encontrar la marca de fin."""
+        while not self._detener.is_set():
+            try:
+                elemento = cola.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if elemento is FIN:
+                cola.put(FIN)
+                return
+            yield elemento
+
+    def run(self, fuente: Iterable[Any]) -> None:
+        """
+        Ejecuta el pipeline sobre los elementos de 'fuente' y espera a que terminen todas las etapas.
+
+        Parameters:
+            fuente (Iterable[Any]): Elementos de entrada de la primera etapa.
+
+        Raises:
+            Exception: El primer error producido por alguna etapa.
+        """
+        colas: List[Optional["queue.Queue[Any]"]] = [None] + [queue.Queue(maxsize=self.tamanio_cola) for _ in self._etapas[1:]] + [None]
+        fuente_iter = iter(fuente)
+        bloqueo_fuente = threading.Lock()
+
+        def _iter_fuente() -> Iterator[Any]:
+            while not self._detener.is_set():
+                with bloqueo_fuente:
+                    elemento = next(fuente_iter, FIN)
+                if elemento is FIN:
+                    return
+                yield elemento
+
+        hilos_por_etapa: List[List[threading.Thread]] = []
+        for indice, (nombre, etapa, concurrencia) in enumerate(self._etapas):
+            cola_entrada, cola_salida = colas[indice], colas[indice + 1]
+            entrada: Callable[[], Iterator[Any]] = _iter_fuente if cola_entrada is None else partial(self._iter_queue, cola_entrada)
+            emitir: Callable[[Any], None] = _descartar if cola_salida is None else partial(self._put, cola_salida)
+
+            def _ejecutar(etapa=etapa, entrada=entrada, emitir=emitir) -> None:
+                try:
+                    etapa(entrada(), emitir)
+                except PipelineDetenido:
+                    pass
+                except BaseException as e:
+                    self._errores.append(e)
+                    self._detener.set()
+
+            hilos = [threading.Thread(target=_ejecutar, name=f"pipeline-{nombre}-{n}", daemon=True) for n in range(concurrencia)]
+            for hilo in hilos:
+                hilo.start()
+            hilos_por_etapa.append(hilos)
+
+        for indice, hilos in enumerate(hilos_por_etapa):
+            for hilo in hilos:
+                hilo.join()
+            cola_salida = colas[indice + 1]
+            if cola_salida is not None:
+                try:
+                    self._put(cola_salida, FIN)
+                except PipelineDetenido:
+                    pass
+
+        if self._errores:
+            raise self._errores[0]
@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import math
+import threading
+import time
+
+# (etapa, segundos, segundos de CPU, bytes, elementos)
+Medicion = Tuple[str, float, float, int, int]
+
+class StageMetrics:
+    """
+    Clase para medir el tiempo real, el tiempo de CPU, los bytes y los elementos de cada etapa del
+    proceso (descompresion, lectura, parseo, enriquecimiento, insercion...).
+
+    Cada medicion corresponde a un archivo (o a un lote, en la insercion), por lo que ademas de los
+    totales se informan p50, p95 y maximo por medicion. El tiempo de CPU es el del hilo que mide.
+    Las mediciones hechas en otro proceso se envian con 'drain' y se agregan con 'merge'.
+    """
+
+    def __init__(self) -> None:
+        """Constructor para la clase StageMetrics."""
+        self._mediciones: List[Medicion] = []
+        self._bloqueo = threading.Lock()
+
+    def record(self, etapa: str, segundos: float, cpu: float, num_bytes: int = 0, elementos: int = 1) -> None:
+        """
+        Registra una medicion.
+
+        Parameters:
+            etapa (str): Nombre de la etapa.
+            segundos (float): Tiempo real de la medicion.
+            cpu (float): Tiempo de CPU de la medicion.
+            num_bytes (int): Bytes procesados.
+            elementos (int): Elementos procesados (archivos, documentos...).
+        """
+        with self._bloqueo:
+            self._mediciones.append((etapa, segundos, cpu, num_bytes, elementos))
+
+    @contextmanager
+    def measure(self, etapa: str, num_bytes: int = 0, elementos: int = 1) -> Iterator[None]:
+        """
+        Mide el bloque 'with' como una medicion de 'etapa' (tambien si termina con una excepcion).
+
+        Parameters:
+            etapa (str): Nombre de la etapa.
+            num_bytes (int): Bytes procesados.
+            elementos (int): Elementos procesados.
+        """
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(etapa, time.perf_counter() - inicio, time.thread_time() - inicio_cpu, num_bytes, elementos)
+
+    def iter_measured(self,
+                    etapa: str,
+                    elementos: Iterable[Any],
+                    num_bytes: Optional[Callable[[Any], int]] = None
+                    ) -> Iterator[Any]:
+        """
+        Entrega los elementos de un iterador midiendo el tiempo que tarda en producir cada uno
+        (el tiempo del consumidor entre elemento y elemento no se cuenta).
+
+        Parameters:
+            etapa (str): Nombre de la etapa.
+            elementos (Iterable[Any]): Iterador a medir (por ejemplo, los miembros de un TAR en streaming).
+            num_bytes (Optional[Callable[[Any], int]]): Funcion que devuelve los bytes de cada elemento.
+
+        Returns:
+            Iterator[Any]: Los mismos elementos.
+        """
+        iterador = iter(elementos)
+        while True:
+            inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                return
+            self.record(
+                etapa, time.perf_counter() - inicio, time.thread_time() - inicio_cpu,
+                num_bytes(elemento) if num_bytes else 0
+            )
+            yield elemento
+
+    def drain(self) -> List[Medicion]:
+        """
+        Devuelve y borra las mediciones acumuladas (para enviarlas desde un proceso del pool).
+
+        Returns:
+            List[Medicion]: Mediciones (etapa, segundos, cpu, bytes, elementos).
+        """
+        with self._bloqueo:
+            mediciones, self._mediciones = self._mediciones, []
+        return mediciones
+
+    def merge(self, mediciones: Iterable[Medicion]) -> None:
+        """
+        Agrega mediciones hechas en otro proceso.
+
+        Parameters:
+            mediciones (Iterable[Medicion]): Mediciones devueltas por 'drain'.
+        """
+        with self._bloqueo:
+            self._mediciones.extend(mediciones)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Resume las mediciones por etapa.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Por etapa: mediciones, elementos, bytes, segundos y CPU totales,
+            p50/p95/max por medicion, y elementos y MB por segundo.
+        """
+        with self._bloqueo:
+            mediciones = list(self._mediciones)
+
+        por_etapa: Dict[str, List[Medicion]] = {}
+        for medicion in mediciones:
+            por_etapa.setdefault(medicion[0], []).append(medicion)
+
+        resumen: Dict[str, Dict[str, Any]] = {}
+        for etapa, lista in por_etapa.items():
+            tiempos = sorted(medicion[1] for medicion in lista)
+            segundos = sum(tiempos)
+            elementos = sum(medicion[4] for medicion in lista)
+            num_bytes = sum(medicion[3] for medicion in lista)
+            resumen[etapa] = {
+                "mediciones": len(lista),
+                "elementos": elementos,
+                "bytes": num_bytes,
+                "segundos": round(segundos, 4),
+                "cpu_segundos": round(sum(medicion[2] for medicion in lista), 4),
+                "p50": round(self._percentile(tiempos, 0.50), 6),
+                "p95": round(self._percentile(tiempos, 0.95), 6),
+                "max": round(tiempos[-1], 6),
+                "elementos_por_segundo": round(elementos / segundos, 2) if segundos else None,
+                "mb_por_segundo": round(num_bytes / 1024 / 1024 / segundos, 2) if segundos and num_bytes else None
+            }
+        return resumen
+
+    @staticmethod
+    def _percentile(valores_ordenados: List[float], fraccion: float) -> float:
+        """Percentil por rango mas cercano de una lista ordenada."""
+        indice = max(0, math.ceil(fraccion * len(valores_ordenados)) - 1)
+        return valores_ordenados[indice]
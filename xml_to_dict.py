@@ -1,11 +1,216 @@
 import xmltodict
 import json
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, Union, List, Tuple
+from xml.parsers import expat
 from standard_response import StandardResponse
+from decompress import TarMember
 from collections.abc import Mapping
+from dataclasses import dataclass
 
 #DIRECTORIO_JSON = Path.cwd() / "JSON"
+TAMANIO_PARTE_XML = 1024 * 1024
+
+def parse_xml(xml_content: Union[str, bytes]) -> Dict[str, Any]:
+    """Parsea un XML con xmltodict construyendo directamente diccionarios 'dict' planos."""
+    return xmltodict.parse(xml_content, dict_constructor=dict)
+
+class _FusedSAXHandler:
+    """
+    Handler de expat que construye el mismo diccionario que 'parse_xml' (xmltodict con sus opciones
+    por defecto) y, al cerrar cada elemento, agrega las descripciones de sus valores directos.
+    """
+    __slots__ = ("stack", "item", "data", "describe")
+
+    def __init__(self, describe: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+        self.stack: List[Tuple[Any, List[str]]] = []
+        self.item: Any = None
+        self.data: List[str] = []
+        self.describe = describe
+
+    def start_element(self, name: str, attrs: List[str]) -> None:
+        self.stack.append((self.item, self.data))
+        self.item = {f"@{key}": value for key, value in zip(attrs[0::2], attrs[1::2])} if attrs else None
+        self.data = []
+
+    def end_element(self, name: str) -> None:
+        data: Optional[str] = ("".join(self.data).strip() or None) if self.data else None
+        item = self.item
+        self.item, self.data = self.stack.pop()
+        if item is not None:
+            if data:
+                self._push(item, "#text", data)
+            if self.describe is not None:
+                self.describe(item)
+            self.item = self._push(self.item, name, item)
+        else:
+            self.item = self._push(self.item, name, data)
+
+    def characters(self, data: str) -> None:
+        self.data.append(data)
+
+    @staticmethod
+    def _push(item: Any, key: str, data: Any) -> Dict[str, Any]:
+        if item is None:
+            item = {}
+        if key in item:
+            value = item[key]
+            if isinstance(value, list):
+                value.append(data)
+            else:
+                item[key] = [value, data]
+        else:
+            item[key] = data
+        return item
+
+def _forbid_entities(*args: Any) -> None:
+    raise ValueError("entities are disabled")
+
+def parse_xml_described(xml_content: Union[str, bytes], describe: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+    """
+    Parsea un XML con expat construyendo el arbol una sola vez y agregando las descripciones en la
+    misma pasada ('describe' se llama con cada diccionario al cerrarse su elemento).
+
+    Devuelve lo mismo que 'parse_xml' seguido de 'CompiledJsonMatcher.add_description'.
+    """
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode("utf-8")
+    handler = _FusedSAXHandler(describe)
+    parser = expat.ParserCreate()
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.StartElementHandler = handler.start_element
+    parser.EndElementHandler = handler.end_element
+    parser.CharacterDataHandler = handler.characters
+    parser.EntityDeclHandler = _forbid_entities
+    parser.Parse(xml_content, True)
+    if describe is not None and isinstance(handler.item, dict):
+        describe(handler.item)
+    return handler.item
+
+class _Ancestro:
+    """Elemento abierto por encima de 'item_depth' mientras se parsea un XML por bloques."""
+    __slots__ = ("nombre", "atributos", "datos", "nodo", "materializado")
+
+    def __init__(self, nombre: str, atributos: Dict[str, str]) -> None:
+        self.nombre = nombre
+        self.atributos = atributos
+        self.datos: List[str] = []
+        self.nodo: Optional[Dict[str, Any]] = None
+        self.materializado = False
+
+class _ChunkSAXHandler(_FusedSAXHandler):
+    """
+    Handler de expat para 'iter_xml_chunks'. Cada elemento de profundidad 'item_depth' (la raiz es 1)
+    se construye con la logica de '_FusedSAXHandler' (con su '#text' aunque tenga atributos) y se
+    agrega al bloque en curso bajo la ruta de sus niveles superiores; al llegar a 'chunk_size'
+    elementos el bloque pasa a 'listos'. Cada bloque nuevo empieza repitiendo los niveles superiores
+    abiertos (con sus atributos), y el texto de esos niveles, o el elemento completo si no contiene
+    elementos emitidos, se agrega al bloque en curso cuando se cierran.
+    """
+    __slots__ = ("item_depth", "chunk_size", "profundidad", "ancestros", "bloque", "num_elementos", "con_contenido", "listos")
+
+    def __init__(self, item_depth: int, chunk_size: int) -> None:
+        super().__init__(None)
+        self.item_depth = max(1, item_depth)
+        self.chunk_size = max(1, chunk_size)
+        self.profundidad = 0
+        self.ancestros: List[_Ancestro] = []
+        self.bloque: Dict[str, Any] = {}
+        self.num_elementos = 0
+        self.con_contenido = False
+        self.listos: List[Tuple[Dict[str, Any], int]] = []
+
+    def start_element(self, name: str, attrs: List[str]) -> None:
+        self.profundidad += 1
+        if self.profundidad < self.item_depth:
+            self.ancestros.append(_Ancestro(name, dict(zip(attrs[0::2], attrs[1::2]))))
+        else:
+            super().start_element(name, attrs)
+
+    def end_element(self, name: str) -> None:
+        self.profundidad -= 1
+        if self.profundidad >= self.item_depth:
+            super().end_element(name)
+        elif self.profundidad == self.item_depth - 1:
+            super().end_element(name)
+            elemento = self.item[name]
+            self.item, self.data = None, []
+            self._push(self._current_node(), name, elemento)
+            self.num_elementos += 1
+            if self.num_elementos >= self.chunk_size:
+                self._close_chunk()
+        else:
+            self._end_ancestor()
+
+    def characters(self, data: str) -> None:
+        if self.profundidad >= self.item_depth:
+            self.data.append(data)
+        elif self.ancestros and (self.ancestros[-1].datos or data.strip()):
+            # los espacios antes del primer texto de un nivel superior se descartan (se pierden al hacer 'strip')
+            self.ancestros[-1].datos.append(data)
+
+    def finish(self) -> None:
+        """Pasa a 'listos' el ultimo bloque si tiene contenido (o si es el unico)."""
+        if self.num_elementos or self.con_contenido or not self.listos:
+            self.listos.append((self.bloque, self.num_elementos))
+
+    def _end_ancestor(self) -> None:
+        ancestro = self.ancestros.pop()
+        texto = "".join(ancestro.datos).strip() or None
+        if ancestro.materializado:
+            if texto and ancestro.nodo is not None:
+                ancestro.nodo["#text"] = texto
+                self.con_contenido = True
+            return
+
+        valor: Any = texto
+        if ancestro.atributos:
+            valor = {f"@{clave}": dato for clave, dato in ancestro.atributos.items()}
+            if texto:
+                valor["#text"] = texto
+        self._push(self._current_node(), ancestro.nombre, valor)
+        self.con_contenido = True
+
+    def _current_node(self) -> Dict[str, Any]:
+        """Nodo del bloque en curso del nivel superior mas profundo abierto (lo crea con sus niveles si hace falta)."""
+        nodo = self.bloque
+        for ancestro in self.ancestros:
+            if ancestro.nodo is None:
+                ancestro.nodo = {f"@{clave}": dato for clave, dato in ancestro.atributos.items()}
+                ancestro.materializado = True
+                self._push(nodo, ancestro.nombre, ancestro.nodo)
+            nodo = ancestro.nodo
+        return nodo
+
+    def _close_chunk(self) -> None:
+        self.listos.append((self.bloque, self.num_elementos))
+        self.bloque, self.num_elementos, self.con_contenido = {}, 0, False
+        for ancestro in self.ancestros:
+            ancestro.nodo = None
+        self._current_node()
+
+@dataclass
+class FusionItem:
+    """
+    Par de archivos .DATA original (.1.) y complemento (.P.) pendiente de fusionar.
+
+    Attributes:
+        original (Union[Path, TarMember]): Archivo original.
+        complemento (Union[Path, TarMember]): Archivo complemento.
+    """
+    original: Union[Path, TarMember]
+    complemento: Union[Path, TarMember]
+
+    @property
+    def nombre(self) -> str:
+        """Nombre del documento fusionado."""
+        return f"{self.original.stem}_fusionado.DATA"
+
+    @property
+    def suffix(self) -> str:
+        """Extension del documento fusionado."""
+        return ".DATA"
 
 class XMLConverter:
     """
@@ -61,13 +266,7 @@ class XMLConverter:
             #with open((self.directorio_json / archivo.name), "w", encoding="utf-8") as manifest_final:
             #    manifest_final.write(self._formatear_archivo_manifest(contenido_manifest))
 
-            manifest_data = list(map(self._add_line_break, contenido_manifest.split(" ")))
-            formatted_file = "".join([str(x.data) for x in manifest_data])
-            return StandardResponse(
-                success=True,
-                data=formatted_file,
-                message="Archivo manifest formateado correctamente."
-            )
+            return self.format_manifest_content(manifest_file.name, contenido_manifest)
 
         except FileNotFoundError as e:
             return StandardResponse(
@@ -82,6 +281,35 @@ class XMLConverter:
                 error_details=str(e)
             )
 
+    def format_manifest_content(self, manifest_name: str, manifest_content: str) -> StandardResponse:
+        """
+        Formatea el texto de un archivo .manifest ya cargado en memoria.
+
+        Parameters:
+            manifest_name (str): Nombre del archivo Manifest.
+            manifest_content (str): Contenido del archivo Manifest.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Raises:
+            Exception: Si ocurre un error al formatear el contenido.
+        """
+        try:
+            manifest_data = list(map(self._add_line_break, manifest_content.split(" ")))
+            formatted_file = "".join([str(x.data) for x in manifest_data])
+            return StandardResponse(
+                success=True,
+                data=formatted_file,
+                message="Archivo manifest formateado correctamente."
+            )
+        except Exception as e:
+            return StandardResponse(
+                success=False,
+                message=f"Error al procesar el archivo '{manifest_name}'.",
+                error_details=str(e)
+            )
+
     def _merge_dicts_recursive(self, dict1, dict2):
         """
         Fusiona dos diccionarios de forma recursiva, actualizando valores existentes
@@ -133,39 +361,22 @@ class XMLConverter:
         """
         Construye la lista de archivos .DATA a procesar.
 
+        Los pares original (.1.) / complemento (.P.) no se fusionan aqui: se entregan como
+        'FusionItem' y se fusionan en memoria recien al procesarse (ver 'fuse').
+
         Parameters:
             folder_path (Path): Directorio con los archivos a clasificar.
 
         Returns:
             StandardResponse: Clase estandar para encapsular respuestas de funciones.
         """
-        resultados = []
+        resultados: List[Union[Path, FusionItem]] = []
         parejas_dict = self._data_file_matching(folder_path).data
 
         if isinstance(parejas_dict, dict):
             for par in parejas_dict.values():
                 if par["complemento"] and par["original"]:
-                    try:
-                        with open(par["original"], "r", encoding="utf-8") as original_file:
-                            original_content = xmltodict.parse(original_file.read())
-                        with open(par["complemento"], "r", encoding="utf-8") as complemento_file:
-                            complemento_content = xmltodict.parse(complemento_file.read())
-
-                        fusion_content = self._merge_dicts_recursive(original_content, complemento_content)
-
-                        fusion_xml = xmltodict.unparse(fusion_content, pretty=True)
-
-                        fusion_file = folder_path / f"{par['original'].stem}_fusionado.DATA"
-                        with open(fusion_file, "w", encoding="utf-8") as fusion_file_obj:
-                            fusion_file_obj.write(fusion_xml)
-
-                        resultados.append(fusion_file)
-                    except Exception as e:
-                        return StandardResponse(
-                            success=False,
-                            message=f"Error al fusionar archivos XML: {e}",
-                            error_details=str(e)
-                        )
+                    resultados.append(FusionItem(original=par["original"], complemento=par["complemento"]))
                 elif par["complemento"]:
                     resultados.append(par["complemento"])
                 elif par["original"]:
@@ -178,6 +389,93 @@ class XMLConverter:
             message="Lista con archivos .DATA construida correctamente."
         )
 
+    def fuse(self, fusion_item: FusionItem) -> StandardResponse:
+        """
+        Fusiona en memoria un original (.1.) con su complemento (.P.) y devuelve el diccionario fusionado.
+
+        Parameters:
+            fusion_item (FusionItem): Par original / complemento a fusionar.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Raises:
+            Exception: Si alguno de los XML no se puede leer o parsear.
+        """
+        try:
+            contenidos = []
+            for parte in (fusion_item.original, fusion_item.complemento):
+                if isinstance(parte, TarMember):
+                    contenidos.append(parse_xml(parte.contenido))
+                else:
+                    with open(parte, "r", encoding="utf-8") as archivo_xml:
+                        contenidos.append(parse_xml(archivo_xml.read()))
+
+            return StandardResponse(
+                success=True,
+                data=self._merge_dicts_recursive(contenidos[0], contenidos[1]),
+                message=f"Contenido XML del archivo '{fusion_item.nombre}' transformado a diccionario correctamente."
+            )
+        except Exception as e:
+            return StandardResponse(
+                success=False,
+                message=f"Error al fusionar archivos XML: {e}",
+                error_details=str(e)
+            )
+
+    @staticmethod
+    def _fusion_role(nombre: str) -> Optional[Tuple[str, str, str]]:
+        """Clave del par, rol y rol de la pareja de un .DATA original (.1.) o complemento (.P.); None para los demas."""
+        if ".1." in nombre:
+            return nombre.replace(".1.", ".X."), "original", "complemento"
+        if ".P." in nombre:
+            return nombre.replace(".P.", ".X."), "complemento", "original"
+        return None
+
+    def build_list_from_members(self, members: Iterable[TarMember]) -> Iterator[StandardResponse]:
+        """
+        Construye en streaming la secuencia de miembros .DATA y .manifest a procesar, en una sola
+        lectura del TAR.
+
+        Los pares original (.1.) / complemento (.P.) se emparejan en memoria: el primero que
+        llega queda pendiente hasta que aparece su pareja, y en ese momento se emite un 'FusionItem'.
+        En memoria solo quedan las mitades que aun esperan a su pareja; las que no la encuentran
+        se emiten solas al terminar de recorrer el TAR.
+
+        Parameters:
+            members (Iterable[TarMember]): Miembros leidos del archivo TAR.
+
+        Returns:
+            Iterator[StandardResponse]: Una respuesta por elemento, con el 'TarMember' o 'FusionItem' en 'data'.
+        """
+        pendientes: Dict[str, Dict[str, Optional[TarMember]]] = {}
+
+        for miembro in members:
+            if miembro.nombre.endswith(".manifest"):
+                yield StandardResponse(success=True, data=miembro, message=f"Miembro '{miembro.nombre}' listo.")
+                continue
+
+            rol_miembro = self._fusion_role(miembro.nombre)
+            if rol_miembro is None:
+                continue
+            base_nombre, rol, pareja = rol_miembro
+
+            par = pendientes.setdefault(base_nombre, {"original": None, "complemento": None})
+            par[rol] = miembro
+            if par[pareja] is None:
+                continue
+
+            del pendientes[base_nombre]
+            original, complemento = par["original"], par["complemento"]
+            assert original is not None and complemento is not None
+            fusion_item = FusionItem(original=original, complemento=complemento)
+            yield StandardResponse(success=True, data=fusion_item, message=f"Par '{fusion_item.nombre}' listo.")
+
+        for par in pendientes.values():
+            miembro_suelto = par["complemento"] or par["original"]
+            assert miembro_suelto is not None
+            yield StandardResponse(success=True, data=miembro_suelto, message=f"Miembro '{miembro_suelto.nombre}' listo.")
+
     def _data_file_matching(self, folder_path: Path) -> StandardResponse:
         """
         Empareja los archivos .DATA (originales y complementos).
@@ -212,12 +510,13 @@ class XMLConverter:
             message="Archivos .DATA emparejados correctamente."
         )
 
-    def transform_xml_to_dict(self, xml_file: Path) -> StandardResponse:
+    def parse_xml_file(self, xml_file: Path, describe: Optional[Callable[[Dict[str, Any]], None]] = None) -> StandardResponse:
         """
-        Transforma el contenido de un archivo XML a Diccionario.
+        Transforma el contenido de un archivo XML a Diccionario (sin pasar por una cadena JSON).
 
         Parameters:
             xml_file (Path): Archivo XML a transformar.
+            describe (Optional[Callable]): Si se indica, usa el parseo fusionado que agrega las descripciones en la misma pasada.
 
         Returns:
             StandardResponse: Clase estandar para encapsular respuestas de funciones.
@@ -238,35 +537,171 @@ class XMLConverter:
             with open(xml_file, 'r', encoding="utf-8") as archivo_xml:
                 xml_contenido = archivo_xml.read()
 
-            xml_dict = xmltodict.parse(xml_contenido)
-            #json_data = json.dumps(xml_dict, indent=4)
-            dict_data = json.dumps(xml_dict)
-            #archivo_json_name = archivo.with_suffix(".json").name
+        except FileNotFoundError as e:
+            return StandardResponse(
+                success=False,
+                message=f"Archivo no encontrado: '{xml_file.name}'.",
+                error_details=str(e)
+            )
+        except Exception as e:
+            return StandardResponse(
+                success=False,
+                message=f"Error al procesar el archivo '{xml_file.name}'.",
+                error_details=str(e)
+            )
+
+        return self.parse_xml_content(xml_file.name, xml_contenido, describe)
+
+    def parse_xml_content(self,
+                        xml_name: str,
+                        xml_content: Union[str, bytes],
+                        describe: Optional[Callable[[Dict[str, Any]], None]] = None
+                        ) -> StandardResponse:
+        """
+        Transforma un contenido XML ya cargado en memoria a Diccionario (sin pasar por una cadena JSON).
 
-            #with open((self.directorio_json / archivo_json_name), 'w', encoding="utf-8") as archivo_json:
-            #    archivo_json.write(json_data)
+        El resultado ya tiene los mismos tipos que tenia el ida y vuelta por JSON: diccionarios
+        'dict' planos, listas, cadenas y None.
 
+        Parameters:
+            xml_name (str): Nombre del archivo de origen (para los mensajes).
+            xml_content (Union[str, bytes]): Contenido XML a transformar.
+            describe (Optional[Callable]): Si se indica, usa el parseo fusionado que agrega las descripciones en la misma pasada.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+
+        Raises:
+            xmltodict.ParsingInterrupted: Si el arhcivo XML no tiene un formato valido.
+            Exception: Si ocurre un error al transformar el contenido.
+        """
+        try:
             return StandardResponse(
                 success=True,
-                data=dict_data,
-                message=f"Contenido XML del archivo '{xml_file.name}' transformado a diccionario correctamente."
+                data=parse_xml(xml_content) if describe is None else parse_xml_described(xml_content, describe),
+                message=f"Contenido XML del archivo '{xml_name}' transformado a diccionario correctamente."
             )
 
-        except FileNotFoundError as e:
+        except xmltodict.ParsingInterrupted as e:
             return StandardResponse(
                 success=False,
-                message=f"Archivo no encontrado: '{xml_file.name}'.",
+                message=f"Error al parsear XML en '{xml_name}': {e}.",
                 error_details=str(e)
             )
-        except xmltodict.ParsingInterrupted as e:
+        except Exception as e:
             return StandardResponse(
                 success=False,
-                message=f"Error al parsear XML en '{xml_file.name}': {e}.",
+                message=f"Error al procesar el archivo '{xml_name}'.",
                 error_details=str(e)
             )
+
+    def transform_xml_to_dict(self, xml_file: Path) -> StandardResponse:
+        """
+        Transforma el contenido de un archivo XML a una cadena JSON.
+
+        Parameters:
+            xml_file (Path): Archivo XML a transformar.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+        """
+        return self._dump_json(self.parse_xml_file(xml_file))
+
+    def transform_xml_content(self, xml_name: str, xml_content: Union[str, bytes]) -> StandardResponse:
+        """
+        Transforma un contenido XML ya cargado en memoria a una cadena JSON.
+
+        Parameters:
+            xml_name (str): Nombre del archivo de origen (para los mensajes).
+            xml_content (Union[str, bytes]): Contenido XML a transformar.
+
+        Returns:
+            StandardResponse: Clase estandar para encapsular respuestas de funciones.
+        """
+        return self._dump_json(self.parse_xml_content(xml_name, xml_content))
+
+    def _dump_json(self, resultado: StandardResponse) -> StandardResponse:
+        """Serializa a JSON el diccionario de una respuesta exitosa de 'parse_xml_*'."""
+        if resultado.success:
+            resultado.data = json.dumps(resultado.data)
+        return resultado
+
+    def iter_xml_chunks(self,
+                        xml_name: str,
+                        xml_source: Union[Path, bytes],
+                        item_depth: int = 2,
+                        chunk_size: int = 1000
+                        ) -> Iterator[StandardResponse]:
+        """
+        Transforma un XML muy grande en bloques de diccionarios sin construir el arbol completo.
+
+        Los elementos que se encuentran a la profundidad 'item_depth' (la raiz es 1) se construyen con
+        la misma forma que en 'parse_xml' (incluido su '#text') y se agrupan hasta 'chunk_size' elementos
+        por bloque. Cada bloque conserva la ruta de etiquetas (y atributos) desde la raiz hasta los
+        elementos; el texto de los niveles superiores y sus elementos sin elementos emitidos se agregan
+        al bloque en curso cuando se cierran. Al unir los bloques (continuando en cada uno la ruta abierta
+        del anterior) se obtiene el mismo diccionario que 'parse_xml' (ver 'benchmarks/check_xml_chunks.py').
+
+        El XML se entrega a expat en partes de 'TAMANIO_PARTE_XML' bytes y cada bloque se devuelve en
+        cuanto se completa. Si 'xml_source' es un archivo, la memoria no depende de su tamanio; si es el
+        contenido en memoria (un miembro leido en streaming del TAR), el contenido completo ya esta en
+        memoria y solo se evita construir el arbol.
+
+        Parameters:
+            xml_name (str): Nombre del archivo de origen (para los mensajes).
+            xml_source (Union[Path, bytes]): Archivo XML o su contenido en memoria.
+            item_depth (int): Profundidad de los elementos que se agrupan en bloques.
+            chunk_size (int): Numero maximo de elementos por bloque.
+
+        Returns:
+            Iterator[StandardResponse]: Una respuesta por bloque, con el diccionario en 'data'.
+        """
+        handler = _ChunkSAXHandler(item_depth, chunk_size)
+        parser = expat.ParserCreate()
+        parser.ordered_attributes = True
+        parser.buffer_text = True
+        parser.StartElementHandler = handler.start_element
+        parser.EndElementHandler = handler.end_element
+        parser.CharacterDataHandler = handler.characters
+        parser.EntityDeclHandler = _forbid_entities
+
+        partes: Iterable[bytes]
+        if isinstance(xml_source, Path):
+            archivo_xml = open(xml_source, "rb")
+            partes = iter(lambda: archivo_xml.read(TAMANIO_PARTE_XML), b"")
+        else:
+            archivo_xml = None
+            partes = (xml_source[i:i + TAMANIO_PARTE_XML] for i in range(0, len(xml_source), TAMANIO_PARTE_XML))
+
+        parte = 0
+        try:
+            for datos in partes:
+                parser.Parse(datos, False)
+                for bloque, num_elementos in handler.listos:
+                    parte += 1
+                    yield self._chunk_response(xml_name, bloque, num_elementos, parte)
+                handler.listos.clear()
+            parser.Parse(b"", True)
         except Exception as e:
-            return StandardResponse(
+            yield StandardResponse(
                 success=False,
-                message=f"Error al procesar el archivo '{xml_file.name}'.",
+                message=f"Error al parsear XML en '{xml_name}': {e}.",
                 error_details=str(e)
             )
+            return
+        finally:
+            if archivo_xml is not None:
+                archivo_xml.close()
+
+        handler.finish()
+        for bloque, num_elementos in handler.listos:
+            parte += 1
+            yield self._chunk_response(xml_name, bloque, num_elementos, parte)
+
+    @staticmethod
+    def _chunk_response(xml_name: str, bloque: Dict[str, Any], num_elementos: int, parte: int) -> StandardResponse:
+        return StandardResponse(
+            success=True,
+            data=bloque,
+            message=f"Bloque {parte} ({num_elementos} elementos) del archivo '{xml_name}' transformado a diccionario correctamente."
+        )